@@ -0,0 +1,40 @@
+"""Transaction access path indexes
+
+Revision ID: 3c9e5a7f1b24
+Revises: 91f1db05da00
+Create Date: 2026-10-18 10:12:41.517203
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9e5a7f1b24'
+down_revision: Union[str, None] = '91f1db05da00'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The initial migration predates Transaction.status, which the pending index filters on
+    op.add_column('transactions', sa.Column('status', sa.Enum('PENDING', 'COMPLETED'), nullable=True, server_default='PENDING'))
+    op.create_index('ix_transactions_account_id_date', 'transactions', ['account_id', 'date'], unique=False)
+    op.create_index('ix_transactions_category_id_date', 'transactions', ['category_id', 'date'], unique=False)
+    op.create_index('ix_transactions_store_id_date', 'transactions', ['store_id', 'date'], unique=False)
+    op.create_index(
+        'ix_transactions_pending_date', 'transactions', ['date'], unique=False,
+        sqlite_where=sa.text("status = 'PENDING'"),
+        postgresql_where=sa.text("status = 'PENDING'"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_transactions_pending_date', table_name='transactions')
+    op.drop_index('ix_transactions_store_id_date', table_name='transactions')
+    op.drop_index('ix_transactions_category_id_date', table_name='transactions')
+    op.drop_index('ix_transactions_account_id_date', table_name='transactions')
+    with op.batch_alter_table('transactions') as batch_op:
+        batch_op.drop_column('status')
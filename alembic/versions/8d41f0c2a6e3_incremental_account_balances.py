@@ -0,0 +1,37 @@
+"""Incremental account balances
+
+Revision ID: 8d41f0c2a6e3
+Revises: 3c9e5a7f1b24
+Create Date: 2026-10-18 13:47:05.208114
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d41f0c2a6e3'
+down_revision: Union[str, None] = '3c9e5a7f1b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('accounts', sa.Column('cleared_balance', sa.Float(), nullable=True, server_default='0'))
+    op.add_column('accounts', sa.Column('pending_balance', sa.Float(), nullable=True, server_default='0'))
+    # Existing balances are taken as current; only the cleared/pending split is backfilled
+    op.execute("""
+        UPDATE accounts SET
+            cleared_balance = (SELECT COALESCE(SUM(amount), 0) FROM transactions
+                               WHERE transactions.account_id = accounts.id AND status = 'COMPLETED'),
+            pending_balance = (SELECT COALESCE(SUM(amount), 0) FROM transactions
+                               WHERE transactions.account_id = accounts.id AND (status IS NULL OR status != 'COMPLETED'))
+    """)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('accounts') as batch_op:
+        batch_op.drop_column('pending_balance')
+        batch_op.drop_column('cleared_balance')
@@ -0,0 +1,52 @@
+"""Category monthly spend rollups
+
+Revision ID: b57e2d9a0c18
+Revises: 8d41f0c2a6e3
+Create Date: 2026-10-18 15:02:33.941870
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b57e2d9a0c18'
+down_revision: Union[str, None] = '8d41f0c2a6e3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table('category_monthly_spend',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('year', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Integer(), nullable=False),
+    sa.Column('total', sa.Float(), nullable=False),
+    sa.Column('count', sa.Integer(), nullable=False),
+    sa.Column('category_id', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['category_id'], ['categories.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('category_id', 'year', 'month', name='uq_category_monthly_spend')
+    )
+    op.create_index(op.f('ix_category_monthly_spend_id'), 'category_monthly_spend', ['id'], unique=False)
+    op.create_index('ix_category_monthly_spend_year_month', 'category_monthly_spend', ['year', 'month'], unique=False)
+
+    # Backfill from the existing ledger
+    transactions = sa.table('transactions', sa.column('date', sa.Date()), sa.column('amount', sa.Float()), sa.column('category_id', sa.Integer()))
+    spend = sa.table('category_monthly_spend', sa.column('category_id'), sa.column('year'), sa.column('month'), sa.column('total'), sa.column('count'))
+    year = sa.extract('year', transactions.c.date)
+    month = sa.extract('month', transactions.c.date)
+    op.execute(spend.insert().from_select(
+        ['category_id', 'year', 'month', 'total', 'count'],
+        sa.select(transactions.c.category_id, year, month, sa.func.coalesce(sa.func.sum(transactions.c.amount), 0), sa.func.count())
+        .where(transactions.c.category_id.is_not(None), transactions.c.date.is_not(None))
+        .group_by(transactions.c.category_id, year, month),
+    ))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_category_monthly_spend_year_month', table_name='category_monthly_spend')
+    op.drop_index(op.f('ix_category_monthly_spend_id'), table_name='category_monthly_spend')
+    op.drop_table('category_monthly_spend')
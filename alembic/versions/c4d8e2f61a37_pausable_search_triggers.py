@@ -0,0 +1,49 @@
+"""Let bulk inserts pause the full-text search insert triggers
+
+Revision ID: c4d8e2f61a37
+Revises: e7a3c95b12f4
+Create Date: 2026-10-18 21:05:47.302915
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d8e2f61a37'
+down_revision: Union[str, None] = 'e7a3c95b12f4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, FTS5 table)
+SEARCH_INDEXES = [
+    ('transactions', 'description', 'transactions_fts'),
+    ('stores', 'name', 'stores_fts'),
+]
+
+
+def upgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    # One row per FTS table while a bulk insert indexes its rows in one statement
+    op.execute("CREATE TABLE IF NOT EXISTS search_index_paused (fts TEXT PRIMARY KEY)")
+    for table, column, fts in SEARCH_INDEXES:
+        op.execute(f"DROP TRIGGER IF EXISTS {fts}_ai")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} "
+            f"WHEN NOT EXISTS (SELECT 1 FROM search_index_paused WHERE fts = '{fts}') BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != 'sqlite':
+        return
+    for table, column, fts in SEARCH_INDEXES:
+        op.execute(f"DROP TRIGGER {fts}_ai")
+        op.execute(
+            f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+            f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+        )
+    op.execute("DROP TABLE search_index_paused")
@@ -0,0 +1,58 @@
+"""Full-text search over transaction descriptions and store names
+
+Revision ID: e7a3c95b12f4
+Revises: b57e2d9a0c18
+Create Date: 2026-10-18 18:40:12.518204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7a3c95b12f4'
+down_revision: Union[str, None] = 'b57e2d9a0c18'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# (table, column, FTS5 table)
+SEARCH_INDEXES = [
+    ('transactions', 'description', 'transactions_fts'),
+    ('stores', 'name', 'stores_fts'),
+]
+
+
+def upgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, column, fts in SEARCH_INDEXES:
+        if dialect == 'postgresql':
+            op.execute(f"CREATE INDEX ix_{table}_{column}_fts ON {table} USING gin (to_tsvector('simple', {column}))")
+        elif dialect == 'sqlite':
+            op.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')")
+            op.execute(
+                f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} BEGIN "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END"
+            )
+            op.execute(
+                f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+                f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+                f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+            )
+            # Index the existing rows
+            op.execute(f"INSERT INTO {fts}({fts}) VALUES ('rebuild')")
+
+
+def downgrade() -> None:
+    dialect = op.get_bind().dialect.name
+    for table, column, fts in SEARCH_INDEXES:
+        if dialect == 'postgresql':
+            op.execute(f"DROP INDEX ix_{table}_{column}_fts")
+        elif dialect == 'sqlite':
+            for suffix in ('ai', 'ad', 'au'):
+                op.execute(f"DROP TRIGGER {fts}_{suffix}")
+            op.execute(f"DROP TABLE {fts}")
@@ -1,11 +1,14 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
-from typing import List, Tuple
+from typing import List, Optional, Tuple
 
 from app.crud import account as account_crud
-from app.schemas.account import Account, AccountCreate, AccountUpdate
+from app.crud import ledger
+from app.schemas.account import Account, AccountCreate, AccountUpdate, AccountBalanceCheck
 from app.db.database import get_db
 from app.schemas.query import QueryParams, PaginatedResponse
+from app.utils.etag import not_modified
+from app.utils.serialization import json_response, page_include
 
 router = APIRouter()
 
@@ -14,18 +17,31 @@ def create_account(account: AccountCreate, db: Session = Depends(get_db)):
     return account_crud.create_account(db=db, account=account)
 
 @router.post("/query", response_model=PaginatedResponse[Account])
-def query_accounts(query_params: QueryParams, db: Session = Depends(get_db)):
-    accounts, total = account_crud.get_accounts(db, query_params)
-    return PaginatedResponse(
+def query_accounts(query_params: QueryParams, request: Request, response: Response, db: Session = Depends(get_db)):
+    key = ("accounts.query", query_params.model_dump_json())
+    if unchanged := not_modified(request, response, key, account_crud.ACCOUNT_TABLES):
+        return unchanged
+    accounts, total, next_cursor = account_crud.read_accounts(db, query_params)
+    # Items are already Account models, so serialize once instead of revalidating
+    page = PaginatedResponse[Account](
         items=accounts,
         total=total,
         page=query_params.skip // query_params.limit + 1,
-        size=query_params.limit
+        size=query_params.limit,
+        next_cursor=next_cursor
     )
+    return json_response(page.model_dump_json(include=page_include(query_params.fields)).encode(), response)
+
+@router.post("/recompute_balances", response_model=List[AccountBalanceCheck])
+def recompute_balances(account_id: Optional[int] = None, db: Session = Depends(get_db)):
+    # Admin check: rebuilds balances from the full ledger and reports any drift
+    return ledger.recompute_balances(db, account_id=account_id)
 
 @router.get("/{account_id}", response_model=Account)
-def read_account(account_id: int, db: Session = Depends(get_db)):
-    db_account = account_crud.get_account(db, account_id=account_id)
+def read_account(account_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    if unchanged := not_modified(request, response, ("account", account_id), account_crud.ACCOUNT_TABLES):
+        return unchanged
+    db_account = account_crud.read_account(db, account_id=account_id)
     if db_account is None:
         raise HTTPException(status_code=404, detail="Account not found")
     return db_account
@@ -0,0 +1,121 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.crud import account as account_crud
+from app.crud import category as category_crud
+from app.crud import transaction as transaction_crud
+from app.schemas.account import Account
+from app.schemas.category import Category
+from app.schemas.transaction import Transaction, TransactionCreate, TransactionUpdate, TransactionWithRelated
+from app.db.database import get_async_db
+from app.schemas.query import QueryParams, PaginatedResponse
+from app.api.v1.endpoints.transactions import dump_related_page
+from app.utils.etag import not_modified
+from app.utils.serialization import dump_rows_page, json_response, page_include
+
+# Async versions of the hottest routes, imported and mounted ahead of the sync
+# routers only when settings.async_database is on. Ids use the int convertor so sibling paths
+# such as /transactions/export still fall through to the sync routers. A route here
+# shadows its sync version, so it takes the same parameters and returns the same shape.
+
+router = APIRouter()
+
+@router.post("/transactions/", response_model=Transaction, tags=["transactions"])
+async def create_transaction(transaction: TransactionCreate, db: AsyncSession = Depends(get_async_db)):
+    return await transaction_crud.create_transaction_async(db=db, transaction=transaction)
+
+@router.post("/transactions/query", response_model=PaginatedResponse[TransactionWithRelated], tags=["transactions"])
+async def query_transactions(
+    query_params: QueryParams,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: account, category, store"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    relations = transaction_crud.parse_include(include)
+    tables = transaction_crud.TRANSACTION_TABLES + tuple(transaction_crud.TRANSACTION_RELATIONS[relation] for relation in relations)
+    key = ("transactions.query", query_params.model_dump_json(), relations)
+    if unchanged := not_modified(request, response, key, tables):
+        return unchanged
+
+    if relations:
+        transactions, total, next_cursor = await transaction_crud.get_transactions_async(db, query_params, include=relations)
+        return json_response(dump_related_page(transactions, total, next_cursor, query_params, relations), response)
+
+    fields, rows, total, next_cursor = await transaction_crud.get_transaction_rows_async(db, query_params)
+    content = dump_rows_page(
+        rows,
+        fields,
+        total=total,
+        page=query_params.skip // query_params.limit + 1,
+        size=query_params.limit,
+        next_cursor=next_cursor,
+    )
+    return json_response(content, response)
+
+@router.get("/transactions/{transaction_id:int}", response_model=Transaction, tags=["transactions"])
+async def read_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_transaction = await transaction_crud.get_transaction_async(db, transaction_id=transaction_id)
+    if db_transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return db_transaction
+
+@router.put("/transactions/{transaction_id:int}", response_model=Transaction, tags=["transactions"])
+async def update_transaction(transaction_id: int, transaction: TransactionUpdate, db: AsyncSession = Depends(get_async_db)):
+    db_transaction = await transaction_crud.update_transaction_async(db, transaction_id=transaction_id, transaction=transaction)
+    if db_transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return db_transaction
+
+@router.delete("/transactions/{transaction_id:int}", response_model=Transaction, tags=["transactions"])
+async def delete_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_transaction = await transaction_crud.delete_transaction_async(db, transaction_id=transaction_id)
+    if db_transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return db_transaction
+
+@router.put("/transactions/{transaction_id:int}/complete", response_model=Transaction, tags=["transactions"])
+async def complete_transaction(transaction_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_transaction = await transaction_crud.complete_transaction_async(db, transaction_id=transaction_id)
+    if db_transaction is None:
+        raise HTTPException(status_code=404, detail="Transaction not found")
+    return db_transaction
+
+@router.post("/accounts/query", response_model=PaginatedResponse[Account], tags=["accounts"])
+async def query_accounts(query_params: QueryParams, response: Response, db: AsyncSession = Depends(get_async_db)):
+    accounts, total, next_cursor = await account_crud.get_accounts_async(db, query_params)
+    page = PaginatedResponse[Account](
+        items=accounts,
+        total=total,
+        page=query_params.skip // query_params.limit + 1,
+        size=query_params.limit,
+        next_cursor=next_cursor
+    )
+    return json_response(page.model_dump_json(include=page_include(query_params.fields)).encode(), response)
+
+@router.get("/accounts/{account_id:int}", response_model=Account, tags=["accounts"])
+async def read_account(account_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_account = await account_crud.get_account_async(db, account_id=account_id)
+    if db_account is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+    return db_account
+
+@router.post("/categories/query", response_model=PaginatedResponse[Category], tags=["categories"])
+async def query_categories(query_params: QueryParams, response: Response, db: AsyncSession = Depends(get_async_db)):
+    categories, total, next_cursor = await category_crud.get_categories_async(db, query_params)
+    page = PaginatedResponse[Category](
+        items=categories,
+        total=total,
+        page=query_params.skip // query_params.limit + 1,
+        size=query_params.limit,
+        next_cursor=next_cursor
+    )
+    return json_response(page.model_dump_json(include=page_include(query_params.fields)).encode(), response)
+
+@router.get("/categories/{category_id:int}", response_model=Category, tags=["categories"])
+async def read_category(category_id: int, db: AsyncSession = Depends(get_async_db)):
+    db_category = await category_crud.get_category_async(db, category_id=category_id)
+    if db_category is None:
+        raise HTTPException(status_code=404, detail="Category not found")
+    return db_category
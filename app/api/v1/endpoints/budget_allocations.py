@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.crud import budget_allocation as budget_allocation_crud
 from app.schemas.budget_allocation import BudgetAllocation, BudgetAllocationCreate, BudgetAllocationUpdate
 from app.db.database import get_db
+from app.utils.etag import not_modified
 
 router = APIRouter()
 
@@ -13,13 +14,19 @@ def create_budget_allocation(budget_allocation: BudgetAllocationCreate, db: Sess
     return budget_allocation_crud.create_budget_allocation(db=db, budget_allocation=budget_allocation)
 
 @router.get("/", response_model=List[BudgetAllocation])
-def read_budget_allocations(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
-    budget_allocations = budget_allocation_crud.get_budget_allocations(db, skip=skip, limit=limit)
+def read_budget_allocations(request: Request, response: Response, skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
+    key = ("budget_allocations", skip, limit)
+    if unchanged := not_modified(request, response, key, budget_allocation_crud.BUDGET_ALLOCATION_TABLES):
+        return unchanged
+    budget_allocations = budget_allocation_crud.read_budget_allocations(db, skip=skip, limit=limit)
     return budget_allocations
 
 @router.get("/{budget_allocation_id}", response_model=BudgetAllocation)
-def read_budget_allocation(budget_allocation_id: int, db: Session = Depends(get_db)):
-    db_budget_allocation = budget_allocation_crud.get_budget_allocation(db, budget_allocation_id=budget_allocation_id)
+def read_budget_allocation(budget_allocation_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    key = ("budget_allocation", budget_allocation_id)
+    if unchanged := not_modified(request, response, key, budget_allocation_crud.BUDGET_ALLOCATION_TABLES):
+        return unchanged
+    db_budget_allocation = budget_allocation_crud.read_budget_allocation(db, budget_allocation_id=budget_allocation_id)
     if db_budget_allocation is None:
         raise HTTPException(status_code=404, detail="Budget allocation not found")
     return db_budget_allocation
@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from sqlalchemy.orm import Session
 from typing import List
 
@@ -6,6 +6,8 @@ from app.crud import category as category_crud
 from app.schemas.category import Category, CategoryCreate, CategoryUpdate
 from app.db.database import get_db
 from app.schemas.query import QueryParams, PaginatedResponse
+from app.utils.etag import not_modified
+from app.utils.serialization import json_response, page_include
 
 router = APIRouter()
 
@@ -14,18 +16,26 @@ def create_category(category: CategoryCreate, db: Session = Depends(get_db)):
     return category_crud.create_category(db=db, category=category)
 
 @router.post("/query", response_model=PaginatedResponse[Category])
-def query_categories(query_params: QueryParams, db: Session = Depends(get_db)):
-    categories, total = category_crud.get_categories(db, query_params)
-    return PaginatedResponse(
+def query_categories(query_params: QueryParams, request: Request, response: Response, db: Session = Depends(get_db)):
+    key = ("categories.query", query_params.model_dump_json())
+    if unchanged := not_modified(request, response, key, category_crud.CATEGORY_TABLES):
+        return unchanged
+    categories, total, next_cursor = category_crud.read_categories(db, query_params)
+    # Items are already Category models, so serialize once instead of revalidating
+    page = PaginatedResponse[Category](
         items=categories,
         total=total,
         page=query_params.skip // query_params.limit + 1,
-        size=query_params.limit
+        size=query_params.limit,
+        next_cursor=next_cursor
     )
+    return json_response(page.model_dump_json(include=page_include(query_params.fields)).encode(), response)
 
 @router.get("/{category_id}", response_model=Category)
-def read_category(category_id: int, db: Session = Depends(get_db)):
-    db_category = category_crud.get_category(db, category_id=category_id)
+def read_category(category_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    if unchanged := not_modified(request, response, ("category", category_id), category_crud.CATEGORY_TABLES):
+        return unchanged
+    db_category = category_crud.read_category(db, category_id=category_id)
     if db_category is None:
         raise HTTPException(status_code=404, detail="Category not found")
     return db_category
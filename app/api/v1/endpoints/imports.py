@@ -0,0 +1,66 @@
+import io
+import logging
+from fastapi import APIRouter, Depends, File, Form, HTTPException, UploadFile
+from sqlalchemy.orm import Session
+from typing import List, Optional
+
+from app.core.config import settings
+from app.crud import account as account_crud
+from app.db.database import get_db
+from app.importers.parsers import PARSERS, detect_format
+from app.importers.pipeline import StatementImporter, imports
+from app.schemas.statement_import import ImportResult
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+def log_progress(progress):
+    logger.info(
+        "Import %s: %d rows read, %d imported, %d duplicates (%.0f rows/s)",
+        progress.id, progress.rows_read, progress.imported, progress.duplicates, progress.rows_per_second,
+    )
+
+@router.post("/", response_model=ImportResult)
+def import_statement(
+    file: UploadFile = File(...),
+    account_id: int = Form(...),
+    category_id: int = Form(...),
+    format: Optional[str] = Form(None),
+    create_stores: bool = Form(True),
+    db: Session = Depends(get_db),
+):
+    # category_id is used for rows whose category is missing or unknown
+    file_format = (format or detect_format(file.filename) or "").lower()
+    if file_format not in PARSERS:
+        raise HTTPException(status_code=400, detail="Unsupported or undetectable statement format")
+    if account_crud.get_account(db, account_id=account_id) is None:
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    importer = StatementImporter(
+        db,
+        account_id=account_id,
+        default_category_id=category_id,
+        create_stores=create_stores,
+        batch_size=settings.import_batch_size,
+        on_progress=log_progress,
+    )
+    stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        return importer.run(stream, file_format, filename=file.filename)
+    finally:
+        # Leave the upload's file for FastAPI to close
+        stream.detach()
+
+@router.get("/", response_model=List[ImportResult])
+def read_imports():
+    # Running imports report their progress here while the upload request is still open
+    progresses = (imports.get(import_id) for import_id in imports.keys())
+    return [progress for progress in progresses if progress is not None]
+
+@router.get("/{import_id}", response_model=ImportResult)
+def read_import(import_id: str):
+    progress = imports.get(import_id)
+    if progress is None:
+        raise HTTPException(status_code=404, detail="Import not found")
+    return progress
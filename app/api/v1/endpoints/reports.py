@@ -0,0 +1,53 @@
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response
+from sqlalchemy.orm import Session
+from typing import Optional
+
+from app.crud import analytics, report as report_crud
+from app.schemas.report import BudgetReport, TimeSeries
+from app.core.config import settings
+from app.db.database import get_db
+from app.utils.etag import not_modified
+from app.utils.serialization import json_response
+
+router = APIRouter()
+
+@router.get("/budget", response_model=BudgetReport)
+def read_budget_report(
+    request: Request,
+    response: Response,
+    year: int,
+    month: int = Query(..., ge=1, le=12),
+    db: Session = Depends(get_db),
+):
+    if unchanged := not_modified(request, response, ("budget_report", year, month), report_crud.BUDGET_REPORT_TABLES):
+        return unchanged
+    return report_crud.get_budget_report(db, year=year, month=month)
+
+
+@router.get("/timeseries", response_model=TimeSeries)
+def read_timeseries(
+    request: Request,
+    response: Response,
+    start: date,
+    end: date,
+    interval: str = Query("month", description="day, week or month"),
+    group_by: Optional[str] = Query(None, description="account_id, category_id or store_id; omit for one overall series"),
+    account_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+    db: Session = Depends(get_db),
+):
+    key = ("timeseries", start, end, interval, group_by, account_id, category_id)
+    if unchanged := not_modified(request, response, key, report_crud.TIMESERIES_TABLES):
+        return unchanged
+    content = report_crud.get_timeseries(
+        db, start=start, end=end, interval=interval, group_by=group_by, account_id=account_id, category_id=category_id,
+    )
+    return json_response(content, response)
+
+@router.post("/analytics/rebuild")
+def rebuild_analytics(db: Session = Depends(get_db)):
+    # Reloads the analytics snapshot, e.g. after writes made by another process
+    if not settings.analytics_snapshot:
+        raise HTTPException(status_code=400, detail="The analytics snapshot is disabled (ANALYTICS_SNAPSHOT)")
+    return analytics.snapshot.rebuild(db)
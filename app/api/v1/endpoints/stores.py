@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
 from typing import List
 
 from app.crud import store as store_crud
-from app.schemas.store import Store, StoreCreate, StoreUpdate
+from app.schemas.store import Store, StoreCreate, StoreUpdate, StoreSuggestion
 from app.db.database import get_db
+from app.schemas.query import QueryParams, PaginatedResponse
 
 router = APIRouter()
 
@@ -12,11 +13,27 @@ router = APIRouter()
 def create_store(store: StoreCreate, db: Session = Depends(get_db)):
     return store_crud.create_store(db=db, store=store)
 
+@router.post("/query", response_model=PaginatedResponse[Store])
+def query_stores(query_params: QueryParams, db: Session = Depends(get_db)):
+    stores, total, next_cursor = store_crud.query_stores(db, query_params)
+    return PaginatedResponse(
+        items=stores,
+        total=total,
+        page=query_params.skip // query_params.limit + 1,
+        size=query_params.limit,
+        next_cursor=next_cursor
+    )
+
 @router.get("/", response_model=List[Store])
 def read_stores(skip: int = 0, limit: int = 100, db: Session = Depends(get_db)):
     stores = store_crud.get_stores(db, skip=skip, limit=limit)
     return stores
 
+@router.get("/suggest", response_model=List[StoreSuggestion])
+def suggest_stores(q: str, limit: int = Query(10, ge=1, le=50), db: Session = Depends(get_db)):
+    # Prefix and typo-tolerant matches, most used stores first
+    return store_crud.suggest_stores(db, q=q, limit=limit)
+
 @router.get("/{store_id}", response_model=Store)
 def read_store(store_id: int, db: Session = Depends(get_db)):
     db_store = store_crud.get_store(db, store_id=store_id)
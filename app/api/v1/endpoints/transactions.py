@@ -1,30 +1,149 @@
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from pydantic import TypeAdapter, ValidationError
 from sqlalchemy.orm import Session
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from app.crud import transaction as transaction_crud
-from app.schemas.transaction import Transaction, TransactionCreate, TransactionUpdate
+from app.schemas.transaction import Transaction, TransactionCreate, TransactionUpdate, TransactionWithRelated, BulkTransactionResult
 from app.db.database import get_db
-from app.schemas.query import QueryParams, PaginatedResponse
+from app.schemas.query import AggregateParams, AggregateResponse, QueryParams, PaginatedResponse, FilterCondition, SortOrder
+from app.core.config import settings
+from app.utils import columnar
+from app.utils.etag import not_modified
+from app.utils.export import iter_csv, iter_ndjson
+from app.utils.serialization import dump_rows_page, json_response, page_include
 
 router = APIRouter()
 
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv"),
+    # An Arrow IPC stream; needs pyarrow from the parquet extra
+    "arrow": (columnar.iter_arrow, "application/vnd.apache.arrow.stream"),
+}
+
 @router.post("/", response_model=Transaction)
 def create_transaction(transaction: TransactionCreate, db: Session = Depends(get_db)):
     return transaction_crud.create_transaction(db=db, transaction=transaction)
 
-@router.post("/query", response_model=PaginatedResponse[Transaction])
-def query_transactions(query_params: QueryParams, db: Session = Depends(get_db)):
-    transactions, total = transaction_crud.get_transactions(db, query_params)
-    return PaginatedResponse(
-        items=transactions,
+@router.post("/bulk", response_model=BulkTransactionResult)
+def create_transactions(
+    transactions: List[Dict[str, Any]] = Body(...),
+    chunk_size: Optional[int] = Query(None, ge=1, le=10000),
+    db: Session = Depends(get_db),
+):
+    # Rows are validated one by one so a bad row is reported instead of failing the batch
+    ids, errors = transaction_crud.create_transactions(db, transactions, chunk_size=chunk_size or settings.bulk_chunk_size)
+    return BulkTransactionResult(ids=ids, errors=errors)
+
+@router.post("/query", response_model=PaginatedResponse[TransactionWithRelated])
+def query_transactions(
+    query_params: QueryParams,
+    request: Request,
+    response: Response,
+    include: Optional[str] = Query(None, description="Comma-separated relations to embed: account, category, store"),
+    db: Session = Depends(get_db),
+):
+    relations = transaction_crud.parse_include(include)
+    tables = transaction_crud.TRANSACTION_TABLES + tuple(transaction_crud.TRANSACTION_RELATIONS[relation] for relation in relations)
+    key = ("transactions.query", query_params.model_dump_json(), relations)
+    if unchanged := not_modified(request, response, key, tables):
+        return unchanged
+
+    if relations:
+        return json_response(_related_page(db, query_params, relations), response)
+
+    fields, rows, total, next_cursor = transaction_crud.get_transaction_rows(db, query_params)
+    content = dump_rows_page(
+        rows,
+        fields,
         total=total,
         page=query_params.skip // query_params.limit + 1,
-        size=query_params.limit
+        size=query_params.limit,
+        next_cursor=next_cursor,
+    )
+    return json_response(content, response)
+
+def _related_page(db: Session, query_params: QueryParams, relations: tuple[str, ...]) -> bytes:
+    transactions, total, next_cursor = transaction_crud.get_transactions(db, query_params, include=relations)
+    return dump_related_page(transactions, total, next_cursor, query_params, relations)
+
+def dump_related_page(transactions: list, total: Optional[int], next_cursor: Optional[str], query_params: QueryParams, relations: tuple[str, ...]) -> bytes:
+    # Shared with the async /query route. Validation reads only the requested
+    # relations; the others are not loaded
+    fields = transaction_crud.TRANSACTION_FIELDS + relations
+    page = PaginatedResponse[TransactionWithRelated](
+        items=[{field: getattr(transaction, field) for field in fields} for transaction in transactions],
+        total=total,
+        page=query_params.skip // query_params.limit + 1,
+        size=query_params.limit,
+        next_cursor=next_cursor,
+    )
+    not_included = set(transaction_crud.TRANSACTION_RELATIONS) - set(relations)
+    return page.model_dump_json(
+        include=page_include(query_params.fields + list(relations)) if query_params.fields is not None else None,
+        exclude={"items": {"__all__": not_included}},
+    ).encode()
+
+@router.post("/aggregate", response_model=AggregateResponse)
+def aggregate_transactions(aggregate_params: AggregateParams, request: Request, response: Response, db: Session = Depends(get_db)):
+    key = ("transactions.aggregate", aggregate_params.model_dump_json())
+    if unchanged := not_modified(request, response, key, transaction_crud.TRANSACTION_TABLES):
+        return unchanged
+    return AggregateResponse(groups=transaction_crud.aggregate_transactions(db, aggregate_params))
+
+@router.get("/export")
+def export_transactions(
+    format: str = "ndjson",
+    filters: Optional[str] = None,
+    sort: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    # filters and sort take the same JSON as the QueryParams fields of /query
+    if format not in EXPORT_FORMATS:
+        raise HTTPException(status_code=400, detail=f"Unsupported export format: {format}")
+    if format == "arrow" and not columnar.available():
+        raise HTTPException(status_code=400, detail="Arrow export needs pyarrow; install the parquet extra")
+    try:
+        query_params = QueryParams(
+            filters=TypeAdapter(List[FilterCondition]).validate_json(filters) if filters else None,
+            sort=TypeAdapter(List[SortOrder]).validate_json(sort) if sort else None,
+        )
+    except ValidationError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+    serialize, media_type = EXPORT_FORMATS[format]
+    # get_db closes its session as soon as this handler returns, before the body
+    # streams, so the rows are read through a session of their own on the same
+    # bind (primary or replica). It is closed once the response is finished.
+    export_db = Session(bind=db.get_bind())
+    try:
+        # Execute now so invalid filters fail before the response starts
+        batches = transaction_crud.stream_transactions(export_db, query_params, batch_size=settings.export_batch_size)
+    except Exception:
+        export_db.close()
+        raise
+
+    def content():
+        try:
+            yield from serialize(batches, transaction_crud.EXPORT_COLUMNS)
+        finally:
+            export_db.close()
+
+    return StreamingResponse(
+        content(),
+        media_type=media_type,
+        # Also covers a client that disconnects before the body starts
+        background=BackgroundTask(export_db.close),
+        headers={"Content-Disposition": f"attachment; filename=transactions.{format}"},
     )
 
 @router.get("/{transaction_id}", response_model=Transaction)
-def read_transaction(transaction_id: int, db: Session = Depends(get_db)):
+def read_transaction(transaction_id: int, request: Request, response: Response, db: Session = Depends(get_db)):
+    if unchanged := not_modified(request, response, ("transaction", transaction_id), transaction_crud.TRANSACTION_TABLES):
+        return unchanged
     db_transaction = transaction_crud.get_transaction(db, transaction_id=transaction_id)
     if db_transaction is None:
         raise HTTPException(status_code=404, detail="Transaction not found")
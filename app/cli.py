@@ -0,0 +1,65 @@
+"""Maintenance commands.
+
+    python -m app.cli recompute-balances [--account-id ID]
+    python -m app.cli rebuild-rollups
+    python -m app.cli export-transactions DIRECTORY [--format parquet|arrow] [--names] [--incremental]
+"""
+import argparse
+from app.core.config import settings
+from app.crud import ledger
+from app.crud import transaction as transaction_crud
+from app.db.database import SessionLocal
+from app.utils import columnar
+
+def recompute_balances(args):
+    db = SessionLocal()
+    try:
+        for result in ledger.recompute_balances(db, account_id=args.account_id):
+            print(f"account {result['account_id']}: balance {result['balance']:.2f} "
+                  f"(cleared {result['cleared_balance']:.2f}, pending {result['pending_balance']:.2f}, drift {result['drift']:.2f})")
+    finally:
+        db.close()
+
+def rebuild_rollups(args):
+    db = SessionLocal()
+    try:
+        print(f"rebuilt {ledger.rebuild_monthly_spend(db)} category month rollups")
+    finally:
+        db.close()
+
+def export_transactions(args):
+    if not columnar.available():
+        raise SystemExit("export-transactions needs pyarrow; install the parquet extra")
+    db = SessionLocal()
+    try:
+        columns, batches = transaction_crud.stream_transactions_by_date(db, batch_size=args.batch_size, with_names=args.names)
+        result = columnar.export_partitions(batches, columns, args.directory, format=args.format, incremental=args.incremental)
+        print(f"exported {result['rows']} transactions in {result['partitions']} month partitions: "
+              f"{result['written']} written, {result['removed']} removed")
+    finally:
+        db.close()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m app.cli")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    command = commands.add_parser("recompute-balances", help="rebuild account balances from the transaction ledger")
+    command.add_argument("--account-id", type=int)
+    command.set_defaults(handler=recompute_balances)
+
+    command = commands.add_parser("rebuild-rollups", help="regenerate monthly category spend rollups from transactions")
+    command.set_defaults(handler=rebuild_rollups)
+
+    command = commands.add_parser("export-transactions", help="write transactions as Parquet or Arrow files partitioned by year and month")
+    command.add_argument("directory")
+    command.add_argument("--format", choices=["parquet", "arrow"], default="parquet")
+    command.add_argument("--names", action="store_true", help="include account, category and store names")
+    command.add_argument("--incremental", action="store_true", help="only rewrite months that changed since the last export")
+    command.add_argument("--batch-size", type=int, default=settings.export_batch_size)
+    command.set_defaults(handler=export_transactions)
+
+    args = parser.parse_args(argv)
+    args.handler(args)
+
+if __name__ == "__main__":
+    main()
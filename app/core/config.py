@@ -1,16 +1,56 @@
-from pydantic_settings import BaseSettings
+from pydantic_settings import BaseSettings, SettingsConfigDict
 from functools import lru_cache
+from typing import Optional
 import os
 
 class Settings(BaseSettings):
     app_name: str = "Finance Tracker"
     debug: bool = os.getenv("DEBUG", "False").lower() == "true"
     database_url: str = os.getenv("DATABASE_URL", "sqlite:///./finance_tracker.db")
+    # Serve the hot read endpoints from an AsyncEngine (needs aiosqlite or asyncpg)
+    async_database: bool = os.getenv("ASYNC_DATABASE", "False").lower() == "true"
+    async_database_url: Optional[str] = os.getenv("ASYNC_DATABASE_URL")
+    # Optional read replica for GET, /query and report requests
+    read_replica_url: Optional[str] = os.getenv("READ_REPLICA_URL")
+    # After a client writes, its reads stay on the primary for this many seconds
+    replica_sticky_seconds: int = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))
     environment: str = os.getenv("ENVIRONMENT", "dev")
+    # Connection pool; sizing is ignored for in-memory SQLite, which keeps one connection per thread
+    pool_size: int = int(os.getenv("POOL_SIZE", "5"))
+    max_overflow: int = int(os.getenv("MAX_OVERFLOW", "10"))
+    pool_timeout: int = int(os.getenv("POOL_TIMEOUT", "30"))
+    pool_pre_ping: bool = os.getenv("POOL_PRE_PING", "False").lower() == "true"
+    pool_recycle: int = int(os.getenv("POOL_RECYCLE", "-1"))
+    # PRAGMAs applied to every new SQLite connection; an empty string leaves the SQLite default
+    sqlite_journal_mode: str = os.getenv("SQLITE_JOURNAL_MODE", "WAL")
+    sqlite_synchronous: str = os.getenv("SQLITE_SYNCHRONOUS", "NORMAL")
+    sqlite_busy_timeout: str = os.getenv("SQLITE_BUSY_TIMEOUT", "5000")
+    sqlite_mmap_size: str = os.getenv("SQLITE_MMAP_SIZE", "268435456")
+    sqlite_cache_size: str = os.getenv("SQLITE_CACHE_SIZE", "-64000")
+    sqlite_temp_store: str = os.getenv("SQLITE_TEMP_STORE", "MEMORY")
+    count_cache_size: int = int(os.getenv("COUNT_CACHE_SIZE", "1024"))
+    # How stale a total_mode="estimate" count may be, in seconds (0 = never expires)
+    count_cache_ttl: float = float(os.getenv("COUNT_CACHE_TTL", "30"))
+    export_batch_size: int = int(os.getenv("EXPORT_BATCH_SIZE", "1000"))
+    bulk_chunk_size: int = int(os.getenv("BULK_CHUNK_SIZE", "1000"))
+    import_batch_size: int = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+    # In-process cache for dashboard reads; entries also expire after the TTL (0 = never)
+    response_cache: bool = os.getenv("RESPONSE_CACHE", "True").lower() == "true"
+    response_cache_size: int = int(os.getenv("RESPONSE_CACHE_SIZE", "1024"))
+    response_cache_ttl: float = float(os.getenv("RESPONSE_CACHE_TTL", "60"))
+    # ETags stop matching after at most this many seconds (0 = only on local writes)
+    etag_ttl: float = float(os.getenv("ETAG_TTL", "60"))
+    # /aggregate requests that would return more groups than this are rejected
+    aggregate_max_groups: int = int(os.getenv("AGGREGATE_MAX_GROUPS", "10000"))
+    # Time series requests covering more buckets x series than this are rejected
+    timeseries_max_points: int = int(os.getenv("TIMESERIES_MAX_POINTS", "1000000"))
+    # Keep a NumPy columnar copy of transactions in memory and answer the aggregate,
+    # time series and budget reports from it
+    analytics_snapshot: bool = os.getenv("ANALYTICS_SNAPSHOT", "False").lower() == "true"
+    # Store autocomplete re-ranks by transaction usage at most this often
+    store_usage_refresh_seconds: float = float(os.getenv("STORE_USAGE_REFRESH_SECONDS", "60"))
 
-    class Config:
-        env_file = ".env"
-        env_file_encoding = "utf-8"
+    model_config = SettingsConfigDict(env_file=".env", env_file_encoding="utf-8")
 
 @lru_cache()
 def get_settings():
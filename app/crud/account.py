@@ -1,8 +1,19 @@
+from typing import TYPE_CHECKING
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.db.database import served_by_replica
 from app.db.models import Account
+from app.schemas import account as schemas
 from app.schemas.account import AccountCreate, AccountUpdate
 from app.schemas.query import QueryParams
-from app.utils.query import apply_filters, apply_sorting
+from app.utils.cache import response_cache
+from app.utils.query import apply_filters, paginate, paginate_async, project
+
+if TYPE_CHECKING:
+    # sqlalchemy.ext.asyncio needs greenlet, which only the async install has
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+ACCOUNT_TABLES = ("accounts",)
 
 def get_account(db: Session, account_id: int):
     return db.query(Account).filter(Account.id == account_id).first()
@@ -13,13 +24,37 @@ def get_accounts(db: Session, query_params: QueryParams):
     if query_params.filters:
         query = apply_filters(query, Account, query_params.filters)
     
-    if query_params.sort:
-        query = apply_sorting(query, Account, query_params.sort)
-    
-    total = query.count()
-    accounts = query.offset(query_params.skip).limit(query_params.limit).all()
-    
-    return accounts, total
+    return paginate(query, Account, query_params)
+
+def read_account(db: Session, account_id: int):
+    # Cached schema copies for the read endpoints; mutations keep using the ORM getters
+    def load():
+        db_account = get_account(db, account_id)
+        return schemas.Account.model_validate(db_account) if db_account else None
+    return response_cache.get_or_load(("account", account_id), ACCOUNT_TABLES, load, fill=not served_by_replica(db))
+
+def read_accounts(db: Session, query_params: QueryParams):
+    # Sparse fieldsets only trim the response for this narrow table; validate them here
+    project(Account, query_params, ())
+    def load():
+        accounts, total, next_cursor = get_accounts(db, query_params)
+        return [schemas.Account.model_validate(account) for account in accounts], total, next_cursor
+    key = ("accounts", query_params.model_dump_json())
+    return response_cache.get_or_load(key, ACCOUNT_TABLES, load, fill=not served_by_replica(db))
+
+async def get_account_async(db: "AsyncSession", account_id: int):
+    return await db.get(Account, account_id)
+
+async def get_accounts_async(db: "AsyncSession", query_params: QueryParams):
+    statement = select(Account)
+
+    # Sparse fieldsets only trim the response, as in read_accounts()
+    project(Account, query_params, ())
+
+    if query_params.filters:
+        statement = apply_filters(statement, Account, query_params.filters)
+
+    return await paginate_async(db, statement, Account, query_params)
 
 def create_account(db: Session, account: AccountCreate):
     db_account = Account(**account.model_dump())
@@ -0,0 +1,409 @@
+import threading
+from datetime import date
+from typing import Iterable, Optional
+import numpy as np
+from sqlalchemy import String, event, select, type_coerce
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db import generations
+from app.db.models import Transaction
+from app.schemas.query import FilterCondition
+from app.utils.query import _as_date_range, _as_day
+
+# Optional columnar copy of the transactions table (ANALYTICS_SNAPSHOT=true). The
+# aggregate, time series and budget reports answer from it with vectorized NumPy
+# group-bys instead of scanning the table in SQL.
+#
+# - One compact array per column, in id order: dates as int32 days since
+#   1970-01-01, foreign keys as int32, status as an int8 code.
+# - Built from the primary on first use or on demand. After that, the rows each
+#   flush writes (and those of Core inserts, via record()) are applied when the
+#   session commits, so a rollback never reaches the snapshot.
+# - Process-local like app.db.generations: writes made by other processes are
+#   only seen after a rebuild.
+
+# Stand-ins for NULL; -1 is never a real id and NULL_DAY is no real date
+NULL_ID = -1
+NULL_DAY = np.iinfo(np.int32).min
+# Alphabetical, so codes sort like the stored text
+STATUSES = ("COMPLETED", "PENDING")
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+COLUMNS = {
+    "day": np.int32,
+    "amount": np.float64,
+    "account_id": np.int32,
+    "category_id": np.int32,
+    "store_id": np.int32,
+    "status": np.int8,
+}
+ID_COLUMNS = ("account_id", "category_id", "store_id")
+# Deleted rows are only marked dead until they are this share of the arrays
+COMPACT_RATIO = 0.25
+EPOCH = date(1970, 1, 1)
+
+def _days(value: date) -> int:
+    return (value - EPOCH).days
+
+def _encode(rows: list[tuple]) -> tuple[np.ndarray, dict]:
+    # rows are (id, date, amount, account_id, category_id, store_id, status), with
+    # dates as date objects or ISO text. None converts to NaN and NaT on the way in.
+    ids, days, amounts, accounts, categories, stores, statuses = zip(*rows)
+    parsed = np.array(days, dtype="datetime64[D]")
+    statuses = np.array(statuses, dtype=object)
+    foreign_keys = lambda values: np.nan_to_num(np.array(values, dtype=np.float64), nan=NULL_ID).astype(np.int32)
+    return np.array(ids, dtype=np.int64), {
+        "day": np.where(np.isnat(parsed), NULL_DAY, parsed.astype(np.int64)).astype(np.int32),
+        "amount": np.array(amounts, dtype=np.float64),
+        "account_id": foreign_keys(accounts),
+        "category_id": foreign_keys(categories),
+        "store_id": foreign_keys(stores),
+        "status": np.select([statuses == status for status in STATUSES], range(len(STATUSES)), NULL_ID).astype(np.int8),
+    }
+
+def row(transaction_id: int, values: dict) -> tuple:
+    # Snapshot row for a transaction written as a column dict, as by bulk inserts
+    return (
+        transaction_id, values["date"], values["amount"], values["account_id"],
+        values["category_id"], values.get("store_id"), values["status"],
+    )
+
+def _as_row(item: Transaction) -> tuple:
+    return item.id, item.date, item.amount, item.account_id, item.category_id, item.store_id, item.status
+
+def _grouped(inverse: np.ndarray, groups: int, values: np.ndarray, reduce: np.ufunc) -> np.ndarray:
+    # Per-group reduction of values for group numbers 0..groups-1, all non-empty
+    order = np.argsort(inverse, kind="stable")
+    starts = np.searchsorted(inverse[order], np.arange(groups))
+    return reduce.reduceat(values[order], starts)
+
+class TransactionSnapshot:
+    """Columnar, incrementally maintained copy of the transactions table.
+
+    Arrays are allocated with spare capacity so appends are amortized; the first
+    `size` entries are in use and `live` marks the rows not deleted since the last
+    compaction. All access holds `lock`, as writes update the arrays in place.
+    """
+
+    def __init__(self):
+        self.lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self.lock:
+            self.loaded = False
+            self._reset(np.empty(0, dtype=np.int64), {name: np.empty(0, dtype=dtype) for name, dtype in COLUMNS.items()})
+
+    def _reset(self, ids: np.ndarray, columns: dict):
+        self.size = len(ids)
+        self.dead = 0
+        self.ids = ids
+        self.columns = columns
+        self.live = np.ones(len(ids), dtype=bool)
+
+    def stats(self) -> dict:
+        arrays = [self.ids, self.live, *self.columns.values()]
+        return {
+            "enabled": settings.analytics_snapshot,
+            "loaded": self.loaded,
+            "rows": self.size - self.dead,
+            "dead_rows": self.dead,
+            "bytes": sum(array.nbytes for array in arrays),
+        }
+
+    def rebuild(self, db: Session, batch_size: int = 100_000) -> dict:
+        # Read from the primary in a transaction of its own: a lagging replica or an
+        # older session snapshot would miss writes that were committed while the
+        # snapshot was not loaded. Commits made during the rebuild wait on the lock.
+        statement = select(
+            Transaction.id,
+            type_coerce(Transaction.date, String),
+            Transaction.amount,
+            Transaction.account_id,
+            Transaction.category_id,
+            Transaction.store_id,
+            type_coerce(Transaction.status, String),
+        ).order_by(Transaction.id)
+        with self.lock:
+            with Session.get_bind(db, Transaction).connect() as connection:
+                result = connection.execute(statement.execution_options(yield_per=batch_size))
+                parts = [_encode(rows) for rows in result.partitions()]
+            if parts:
+                ids = np.concatenate([part_ids for part_ids, _ in parts])
+                columns = {name: np.concatenate([part[name] for _, part in parts]) for name in COLUMNS}
+                self._reset(ids, columns)
+            else:
+                self.clear()
+            self.loaded = True
+            # The rebuild may pick up rows written behind the session listeners (another
+            # process, raw SQL); drop the cached responses and ETags computed before it
+            generations.bump("transactions", "category_monthly_spend")
+            return self.stats()
+
+    def ensure_loaded(self, db: Session):
+        if not self.loaded:
+            with self.lock:
+                if not self.loaded:
+                    self.rebuild(db)
+
+    def _positions(self, ids: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        # Array positions of the ids that are present, and which ids those are
+        positions = np.searchsorted(self.ids[:self.size], ids)
+        found = positions < self.size
+        found[found] = self.ids[positions[found]] == ids[found]
+        return positions[found], found
+
+    def apply(self, rows: list[tuple], deleted: list[int]):
+        with self.lock:
+            if not self.loaded:
+                # The first read loads these rows from the database anyway
+                return
+            if rows:
+                ids, columns = _encode(rows)
+                # The last write of an id wins
+                _, last = np.unique(ids[::-1], return_index=True)
+                keep = len(ids) - 1 - last
+                ids, columns = ids[keep], {name: values[keep] for name, values in columns.items()}
+
+                positions, found = self._positions(ids)
+                self.dead -= int(np.count_nonzero(~self.live[positions]))
+                self.live[positions] = True
+                for name, values in columns.items():
+                    self.columns[name][positions] = values[found]
+                if not found.all():
+                    self._append(ids[~found], {name: values[~found] for name, values in columns.items()})
+            if deleted:
+                positions, _ = self._positions(np.array(deleted, dtype=np.int64))
+                positions = positions[self.live[positions]]
+                self.live[positions] = False
+                self.dead += len(positions)
+                if self.dead > COMPACT_RATIO * self.size:
+                    self._compact()
+
+    def _append(self, ids: np.ndarray, columns: dict):
+        size, count = self.size, len(ids)
+        if size + count > len(self.ids):
+            capacity = max(2 * len(self.ids), size + count, 1024)
+            grow = lambda array: np.concatenate([array[:size], np.empty(capacity - size, dtype=array.dtype)])
+            self.ids, self.live = grow(self.ids), grow(self.live)
+            self.columns = {name: grow(array) for name, array in self.columns.items()}
+        in_order = size == 0 or ids.min() > self.ids[size - 1]
+        self.ids[size:size + count] = ids
+        self.live[size:size + count] = True
+        for name, values in columns.items():
+            self.columns[name][size:size + count] = values
+        self.size += count
+        if not in_order:
+            # Autoincrement ids arrive in order; anything else needs a re-sort
+            order = np.argsort(self.ids[:self.size], kind="stable")
+            live = self.live[:self.size][order]
+            self._reset(self.ids[order], {name: array[:self.size][order] for name, array in self.columns.items()})
+            self.live = live
+            self.dead = self.size - int(np.count_nonzero(live))
+
+    def _compact(self):
+        keep = np.flatnonzero(self.live[:self.size])
+        self._reset(self.ids[keep], {name: array[keep] for name, array in self.columns.items()})
+
+    def _column(self, name: str) -> np.ndarray:
+        return self.ids[:self.size] if name == "id" else self.columns[name][:self.size]
+
+    def _filter_mask(self, filters: Optional[list[FilterCondition]]) -> Optional[np.ndarray]:
+        # The subset of the /query filter language the columns can answer; None
+        # means the caller should run the request in SQL instead
+        mask = self.live[:self.size].copy()
+        for condition in filters or []:
+            try:
+                criterion = self._criterion(condition)
+            except (TypeError, ValueError, IndexError, KeyError, AttributeError):
+                return None
+            if criterion is None:
+                return None
+            mask &= criterion
+        return mask
+
+    def _criterion(self, condition: FilterCondition) -> Optional[np.ndarray]:
+        field, operator, data_type, value = condition.field, condition.operator, condition.data_type, condition.value
+        if field == "status" and data_type in ("string", "enum"):
+            column = self._column("status")
+            # Like the SQL: eq and ne on strings ignore case, everything else is exact
+            code = lambda text: STATUS_CODES.get(str(text).upper() if data_type == "string" else text, -2)
+            if operator == "eq":
+                return column == code(value)
+            if operator == "ne":
+                return (column != code(value)) & (column != NULL_ID)
+            if operator == "in":
+                return np.isin(column, [STATUS_CODES.get(text, -2) for text in value])
+            return None
+
+        if field == "date" and data_type == "date":
+            column = self._column("day")
+            # [low, high) in days, mirroring the day boundaries of the SQL filters
+            if operator == "between":
+                date_range = _as_date_range(value)
+                low, high = _days(_as_day(date_range.start)), _days(_as_day(date_range.end)) + 1
+            else:
+                day = _days(_as_day(value))
+                low, high = {
+                    "eq": (day, day + 1), "ne": (day, day + 1), "gt": (day + 1, None),
+                    "ge": (day, None), "lt": (None, day), "le": (None, day + 1),
+                }[operator]
+            valid = column != NULL_DAY
+            in_range = valid.copy()
+            if low is not None:
+                in_range &= column >= low
+            if high is not None:
+                in_range &= column < high
+            return valid & ~in_range if operator == "ne" else in_range
+
+        if field in ("id", "amount", *ID_COLUMNS) and data_type == "number":
+            column = self._column(field)
+            valid = ~np.isnan(column) if field == "amount" else column != NULL_ID
+            if operator == "in":
+                return np.isin(column, [float(number) for number in value]) & valid
+            if operator == "between":
+                return (column >= float(value[0])) & (column <= float(value[1])) & valid
+            compare = {"eq": np.equal, "ne": np.not_equal, "gt": np.greater, "lt": np.less, "ge": np.greater_equal, "le": np.less_equal}.get(operator)
+            return compare(column, float(value)) & valid if compare else None
+        return None
+
+    def _group_keys(self, key: str, rows: np.ndarray) -> np.ndarray:
+        if key in ("year", "month"):
+            day = self.columns["day"][rows]
+            months = day.astype("datetime64[D]").astype("datetime64[M]").astype(np.int64)
+            values = months // 12 + 1970 if key == "year" else months % 12 + 1
+            return np.where(day == NULL_DAY, NULL_ID, values)
+        return self.columns[key][rows].astype(np.int64)
+
+    def aggregate(self, db: Session, group_by: tuple[str, ...], metrics: tuple[str, ...], filters, limit: int) -> Optional[list[dict]]:
+        # Up to limit of the rows, in the same order, that the GROUP BY statement of
+        # transaction_crud.aggregate_transactions returns; None if the filters need SQL
+        self.ensure_loaded(db)
+        with self.lock:
+            mask = self._filter_mask(filters)
+            if mask is None:
+                return None
+            rows = np.flatnonzero(mask)
+            keys = [self._group_keys(key, rows) for key in group_by]
+
+            # Fold the keys into one integer per row that sorts in key order, then
+            # number the distinct ones; only that last step needs a sort
+            inverse, span = np.zeros(len(rows), dtype=np.int64), 1
+            for values in keys:
+                low = int(values.min()) if len(rows) else 0
+                width = int(values.max()) - low + 1 if len(rows) else 1
+                if span * width >= 2 ** 62:
+                    _, inverse = np.unique(inverse, return_inverse=True)
+                    span = int(inverse.max()) + 1
+                inverse, span = inverse * width + (values - low), span * width
+            if group_by:
+                _, inverse = np.unique(inverse, return_inverse=True)
+            groups = int(inverse.max()) + 1 if len(rows) else 0
+            if not group_by:
+                groups = 1
+            first = np.full(groups, len(rows), dtype=np.int64)
+            np.minimum.at(first, inverse, np.arange(len(rows)))
+
+            amount = self.columns["amount"][rows]
+            present = ~np.isnan(amount)
+            count = np.bincount(inverse, minlength=groups)
+            non_null = np.bincount(inverse, weights=present, minlength=groups)
+            total = np.bincount(inverse, weights=np.where(present, amount, 0.0), minlength=groups)
+            values = {
+                "sum": total,
+                "count": count,
+                "avg": np.divide(total, non_null, out=np.zeros(groups), where=non_null > 0),
+            }
+            if "min" in metrics or "max" in metrics:
+                if len(rows):
+                    values["min"] = _grouped(inverse, groups, amount, np.fmin)
+                    values["max"] = _grouped(inverse, groups, amount, np.fmax)
+                else:
+                    values["min"] = values["max"] = np.full(groups, np.nan)
+
+            results = []
+            for group in range(min(groups, limit)):
+                result = {}
+                for key, column in zip(group_by, keys):
+                    key_value = int(column[first[group]])
+                    result[key] = None if key_value == NULL_ID else STATUSES[key_value] if key == "status" else key_value
+                for metric in metrics:
+                    if metric == "count":
+                        result[metric] = int(count[group])
+                    else:
+                        result[metric] = float(values[metric][group]) if non_null[group] else None
+                results.append(result)
+            return results
+
+    def buckets(
+        self, db: Session, interval: str, group_by: Optional[str], start: date, stop: date,
+        account_id: Optional[int], category_id: Optional[int],
+    ) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        # Per-row (bucket, series key, amount, 1) for the time series report, which
+        # sums them per cell; dates in [start, stop)
+        self.ensure_loaded(db)
+        with self.lock:
+            day = self.columns["day"][:self.size]
+            mask = self.live[:self.size] & (day >= _days(start)) & (day < _days(stop))
+            if account_id is not None:
+                mask &= self.columns["account_id"][:self.size] == account_id
+            if category_id is not None:
+                mask &= self.columns["category_id"][:self.size] == category_id
+            rows = np.flatnonzero(mask)
+
+            buckets = self.columns["day"][rows].astype(np.int64)
+            if interval == "week":
+                buckets -= (buckets + 3) % 7
+            buckets = buckets.astype("datetime64[D]")
+            if interval == "month":
+                buckets = buckets.astype("datetime64[M]")
+            keys = self.columns[group_by][rows].astype(np.int64) if group_by else np.full(len(rows), NULL_ID, dtype=np.int64)
+            amount = np.nan_to_num(self.columns["amount"][rows])
+            return buckets, keys, amount, np.ones(len(rows), dtype=np.int64)
+
+    def category_spend(self, db: Session, year: int, month: int) -> dict[int, tuple[float, int]]:
+        # category_id -> (total, count) for the month, like the category_monthly_spend rollup
+        self.ensure_loaded(db)
+        first = date(year, month, 1)
+        stop = date(year + month // 12, month % 12 + 1, 1)
+        with self.lock:
+            day = self.columns["day"][:self.size]
+            category = self.columns["category_id"][:self.size]
+            rows = np.flatnonzero(self.live[:self.size] & (day >= _days(first)) & (day < _days(stop)) & (category != NULL_ID))
+            categories, inverse = np.unique(category[rows], return_inverse=True)
+            totals = np.bincount(inverse, weights=np.nan_to_num(self.columns["amount"][rows]), minlength=len(categories))
+            counts = np.bincount(inverse, minlength=len(categories))
+            return {int(category_id): (float(total), int(count)) for category_id, total, count in zip(categories, totals, counts)}
+
+snapshot = TransactionSnapshot()
+
+def _pending(db: Session) -> tuple[list, list]:
+    return db.info.setdefault("analytics_pending", ([], []))
+
+def record(db: Session, rows: Iterable[tuple]):
+    # row() tuples written in this session with Core statements, which bypass the
+    # unit of work; applied to the snapshot when the session commits
+    if settings.analytics_snapshot:
+        _pending(db)[0].extend(rows)
+
+@event.listens_for(Session, "after_flush")
+def _record_flushed(session, flush_context):
+    # Every Transaction the unit of work wrote, including the foreign keys it sets
+    # to NULL when an account, category or store is deleted. Rows are taken now,
+    # while the entities hold what was just written.
+    if not settings.analytics_snapshot:
+        return
+    rows, deleted = _pending(session)
+    rows.extend(_as_row(item) for item in (*session.new, *session.dirty) if isinstance(item, Transaction))
+    deleted.extend(item.id for item in session.deleted if isinstance(item, Transaction))
+
+# Ahead of the generation bump, so a reader that sees the new generation also sees
+# the new rows
+@event.listens_for(Session, "after_commit", insert=True)
+def _apply_committed(session):
+    pending = session.info.pop("analytics_pending", None)
+    if pending:
+        snapshot.apply(*pending)
+
+@event.listens_for(Session, "after_rollback")
+def _discard_rolled_back(session):
+    session.info.pop("analytics_pending", None)
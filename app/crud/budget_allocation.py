@@ -1,6 +1,11 @@
 from sqlalchemy.orm import Session
+from app.db.database import served_by_replica
 from app.db.models import BudgetAllocation
+from app.schemas import budget_allocation as schemas
 from app.schemas.budget_allocation import BudgetAllocationCreate, BudgetAllocationUpdate
+from app.utils.cache import response_cache
+
+BUDGET_ALLOCATION_TABLES = ("budget_allocations",)
 
 def get_budget_allocation(db: Session, budget_allocation_id: int):
     return db.query(BudgetAllocation).filter(BudgetAllocation.id == budget_allocation_id).first()
@@ -8,6 +13,20 @@ def get_budget_allocation(db: Session, budget_allocation_id: int):
 def get_budget_allocations(db: Session, skip: int = 0, limit: int = 100):
     return db.query(BudgetAllocation).offset(skip).limit(limit).all()
 
+def read_budget_allocation(db: Session, budget_allocation_id: int):
+    # Cached schema copies for the read endpoints; mutations keep using the ORM getters
+    def load():
+        db_budget_allocation = get_budget_allocation(db, budget_allocation_id)
+        return schemas.BudgetAllocation.model_validate(db_budget_allocation) if db_budget_allocation else None
+    key = ("budget_allocation", budget_allocation_id)
+    return response_cache.get_or_load(key, BUDGET_ALLOCATION_TABLES, load, fill=not served_by_replica(db))
+
+def read_budget_allocations(db: Session, skip: int = 0, limit: int = 100):
+    def load():
+        return [schemas.BudgetAllocation.model_validate(row) for row in get_budget_allocations(db, skip=skip, limit=limit)]
+    key = ("budget_allocations", skip, limit)
+    return response_cache.get_or_load(key, BUDGET_ALLOCATION_TABLES, load, fill=not served_by_replica(db))
+
 def create_budget_allocation(db: Session, budget_allocation: BudgetAllocationCreate):
     db_budget_allocation = BudgetAllocation(**budget_allocation.dict())
     db.add(db_budget_allocation)
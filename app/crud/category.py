@@ -1,8 +1,19 @@
+from typing import TYPE_CHECKING
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from app.db.database import served_by_replica
 from app.db.models import Category
+from app.schemas import category as schemas
 from app.schemas.category import CategoryCreate, CategoryUpdate
 from app.schemas.query import QueryParams
-from app.utils.query import apply_filters, apply_sorting
+from app.utils.cache import response_cache
+from app.utils.query import apply_filters, paginate, paginate_async, project
+
+if TYPE_CHECKING:
+    # sqlalchemy.ext.asyncio needs greenlet, which only the async install has
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+CATEGORY_TABLES = ("categories",)
 
 def get_category(db: Session, category_id: int):
     return db.query(Category).filter(Category.id == category_id).first()
@@ -13,13 +24,37 @@ def get_categories(db: Session, query_params: QueryParams):
     if query_params.filters:
         query = apply_filters(query, Category, query_params.filters)
     
-    if query_params.sort:
-        query = apply_sorting(query, Category, query_params.sort)
-    
-    total = query.count()
-    categories = query.offset(query_params.skip).limit(query_params.limit).all()
-    
-    return categories, total
+    return paginate(query, Category, query_params)
+
+def read_category(db: Session, category_id: int):
+    # Cached schema copies for the read endpoints; mutations keep using the ORM getters
+    def load():
+        db_category = get_category(db, category_id)
+        return schemas.Category.model_validate(db_category) if db_category else None
+    return response_cache.get_or_load(("category", category_id), CATEGORY_TABLES, load, fill=not served_by_replica(db))
+
+def read_categories(db: Session, query_params: QueryParams):
+    # Sparse fieldsets only trim the response for this narrow table; validate them here
+    project(Category, query_params, ())
+    def load():
+        categories, total, next_cursor = get_categories(db, query_params)
+        return [schemas.Category.model_validate(category) for category in categories], total, next_cursor
+    key = ("categories", query_params.model_dump_json())
+    return response_cache.get_or_load(key, CATEGORY_TABLES, load, fill=not served_by_replica(db))
+
+async def get_category_async(db: "AsyncSession", category_id: int):
+    return await db.get(Category, category_id)
+
+async def get_categories_async(db: "AsyncSession", query_params: QueryParams):
+    statement = select(Category)
+
+    # Sparse fieldsets only trim the response, as in read_categories()
+    project(Category, query_params, ())
+
+    if query_params.filters:
+        statement = apply_filters(statement, Category, query_params.filters)
+
+    return await paginate_async(db, statement, Category, query_params)
 
 def create_category(db: Session, category: CategoryCreate):
     db_category = Category(**category.model_dump())
@@ -0,0 +1,132 @@
+from collections import defaultdict
+from typing import Iterable, Optional
+from sqlalchemy import bindparam, case, delete, extract, func, insert, select, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+from app.db.models import Account, CategoryMonthlySpend, Transaction
+
+# Derived ledger state is maintained incrementally: every transaction write posts
+# its amount (or reverses it) in the same database transaction as the write.
+#
+# - Account balances. Amounts are signed, so outflows are negative. balance is the
+#   opening balance plus cleared_balance (COMPLETED rows) plus pending_balance.
+# - Monthly category spend rollups: total and count per (category, year, month).
+
+accounts = Account.__table__
+monthly_spend = CategoryMonthlySpend.__table__
+
+_post_balances = (
+    update(accounts)
+    .where(accounts.c.id == bindparam("account"))
+    .values(
+        balance=func.coalesce(accounts.c.balance, 0) + bindparam("cleared") + bindparam("pending"),
+        cleared_balance=func.coalesce(accounts.c.cleared_balance, 0) + bindparam("cleared"),
+        pending_balance=func.coalesce(accounts.c.pending_balance, 0) + bindparam("pending"),
+    )
+)
+
+_update_spend = (
+    update(monthly_spend)
+    .where(
+        monthly_spend.c.category_id == bindparam("category"),
+        monthly_spend.c.year == bindparam("spend_year"),
+        monthly_spend.c.month == bindparam("spend_month"),
+    )
+    .values(total=monthly_spend.c.total + bindparam("delta_total"), count=monthly_spend.c.count + bindparam("delta_count"))
+)
+
+def entry(transaction) -> tuple:
+    return transaction.account_id, transaction.category_id, transaction.date, transaction.amount, transaction.status
+
+def row_entry(row: dict) -> tuple:
+    return row["account_id"], row["category_id"], row["date"], row["amount"], row["status"]
+
+def post(db: Session, entries: Iterable[tuple], sign: int = 1):
+    # entries are (account_id, category_id, date, amount, status); sign=-1 reverses them
+    balances = defaultdict(lambda: [0.0, 0.0])
+    spend = defaultdict(lambda: [0.0, 0])
+    for account_id, category_id, day, amount, status in entries:
+        amount = amount or 0.0
+        if account_id is not None and amount:
+            balances[account_id][0 if status == "COMPLETED" else 1] += sign * amount
+        if category_id is not None and day is not None:
+            totals = spend[(category_id, day.year, day.month)]
+            totals[0] += sign * amount
+            totals[1] += sign
+
+    if balances:
+        # One UPDATE per touched account, however many transactions were posted
+        db.execute(_post_balances, [
+            {"account": account_id, "cleared": cleared, "pending": pending}
+            for account_id, (cleared, pending) in balances.items()
+        ])
+    if spend:
+        _upsert_spend(db, [
+            {"category_id": category_id, "year": year, "month": month, "total": total, "count": count}
+            for (category_id, year, month), (total, count) in spend.items()
+        ])
+
+def _upsert_spend(db: Session, rows: list[dict]):
+    dialect = db.get_bind().dialect.name
+    if dialect in ("sqlite", "postgresql"):
+        statement = (sqlite if dialect == "sqlite" else postgresql).insert(monthly_spend)
+        statement = statement.on_conflict_do_update(
+            index_elements=["category_id", "year", "month"],
+            set_={"total": monthly_spend.c.total + statement.excluded.total, "count": monthly_spend.c.count + statement.excluded.count},
+        )
+        db.execute(statement, rows)
+        return
+
+    for row in rows:
+        result = db.execute(_update_spend, {
+            "category": row["category_id"], "spend_year": row["year"], "spend_month": row["month"],
+            "delta_total": row["total"], "delta_count": row["count"],
+        })
+        if result.rowcount == 0:
+            db.execute(insert(monthly_spend), row)
+
+def recompute_balances(db: Session, account_id: Optional[int] = None) -> list[dict]:
+    is_cleared = Transaction.status == "COMPLETED"
+    sums = (
+        select(
+            Transaction.account_id,
+            func.sum(case((is_cleared, Transaction.amount), else_=0)),
+            func.sum(case((is_cleared, 0), else_=Transaction.amount)),
+        )
+        .group_by(Transaction.account_id)
+    )
+    query = db.query(Account)
+    if account_id is not None:
+        sums = sums.where(Transaction.account_id == account_id)
+        query = query.filter(Account.id == account_id)
+    ledger = {row[0]: (row[1] or 0.0, row[2] or 0.0) for row in db.execute(sums)}
+
+    results = []
+    for account in query.all():
+        cleared, pending = ledger.get(account.id, (0.0, 0.0))
+        opening = (account.balance or 0.0) - (account.cleared_balance or 0.0) - (account.pending_balance or 0.0)
+        balance = opening + cleared + pending
+        results.append({
+            "account_id": account.id,
+            "previous_balance": account.balance,
+            "balance": balance,
+            "cleared_balance": cleared,
+            "pending_balance": pending,
+            "drift": (account.balance or 0.0) - balance,
+        })
+        account.balance, account.cleared_balance, account.pending_balance = balance, cleared, pending
+    db.commit()
+    return results
+
+def rebuild_monthly_spend(db: Session) -> int:
+    year = extract("year", Transaction.date)
+    month = extract("month", Transaction.date)
+    grouped = (
+        select(Transaction.category_id, year, month, func.coalesce(func.sum(Transaction.amount), 0), func.count())
+        .where(Transaction.category_id.is_not(None), Transaction.date.is_not(None))
+        .group_by(Transaction.category_id, year, month)
+    )
+    db.execute(delete(monthly_spend))
+    result = db.execute(insert(monthly_spend).from_select(["category_id", "year", "month", "total", "count"], grouped))
+    db.commit()
+    return result.rowcount
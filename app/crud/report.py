@@ -0,0 +1,196 @@
+from datetime import date
+from typing import Optional
+import numpy as np
+from sqlalchemy import Date, String, cast, func, literal, select
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.crud import analytics
+from app.db.database import served_by_replica
+from app.db.models import BudgetAllocation, Category, CategoryMonthlySpend, Transaction
+from app.schemas.report import BudgetReport, BudgetReportLine
+from app.utils.cache import response_cache
+from app.utils.query import InvalidQueryError
+from app.utils.serialization import dump_arrays
+
+BUDGET_REPORT_TABLES = ("categories", "budget_allocations", "category_monthly_spend")
+TIMESERIES_TABLES = ("transactions", "category_monthly_spend")
+TIMESERIES_INTERVALS = ("day", "week", "month")
+TIMESERIES_GROUPS = {
+    "account_id": Transaction.account_id,
+    "category_id": Transaction.category_id,
+    "store_id": Transaction.store_id,
+}
+# Series key for rows whose group_by column is NULL, and for the ungrouped series
+NO_KEY = analytics.NULL_ID
+
+def _budget_report_statement(year: int, month: int, with_spend: bool = True):
+    allocated = (
+        select(BudgetAllocation.category_id, func.sum(BudgetAllocation.amount).label("allocated"))
+        .where(BudgetAllocation.year == year, BudgetAllocation.month == month)
+        .group_by(BudgetAllocation.category_id)
+        .subquery()
+    )
+    spend = (
+        select(CategoryMonthlySpend.category_id, CategoryMonthlySpend.total, CategoryMonthlySpend.count)
+        .where(CategoryMonthlySpend.year == year, CategoryMonthlySpend.month == month)
+        .subquery()
+    )
+    # Without the rollup join, spend is filled in by the caller
+    spent = (func.coalesce(spend.c.total, 0), func.coalesce(spend.c.count, 0)) if with_spend else (literal(0.0), literal(0))
+    statement = (
+        select(
+            Category.id,
+            Category.name,
+            Category.type,
+            Category.monthly_budget,
+            func.coalesce(allocated.c.allocated, 0),
+            *spent,
+        )
+        .outerjoin(allocated, allocated.c.category_id == Category.id)
+    )
+    if with_spend:
+        statement = statement.outerjoin(spend, spend.c.category_id == Category.id)
+    return statement.order_by(Category.id)
+
+def get_budget_report(db: Session, year: int, month: int) -> BudgetReport:
+    def load() -> BudgetReport:
+        # Spend comes from the rollup table, or from the analytics snapshot when enabled
+        spend = analytics.snapshot.category_spend(db, year, month) if settings.analytics_snapshot else None
+        lines = []
+        for category_id, name, category_type, monthly_budget, allocated, total, count in db.execute(_budget_report_statement(year, month, spend is None)):
+            if spend is not None:
+                total, count = spend.get(category_id, (0.0, 0))
+            spent = -total
+            lines.append(BudgetReportLine(
+                category_id=category_id,
+                name=name,
+                type=category_type,
+                monthly_budget=monthly_budget,
+                allocated=allocated,
+                spent=spent,
+                remaining=allocated - spent,
+                transaction_count=count,
+            ))
+        return BudgetReport(
+            year=year,
+            month=month,
+            allocated=sum(line.allocated for line in lines),
+            spent=sum(line.spent for line in lines),
+            remaining=sum(line.remaining for line in lines),
+            categories=lines,
+        )
+
+    return response_cache.get_or_load(("budget_report", year, month), BUDGET_REPORT_TABLES, load, fill=not served_by_replica(db))
+
+def _bucket(db: Session, interval: str):
+    # First day of each row's bucket, so SQL returns one row per bucket and series
+    if interval == "day":
+        return Transaction.date
+    if db.get_bind().dialect.name == "sqlite":
+        modifiers = ("weekday 0", "-6 days") if interval == "week" else ("start of month",)
+        return func.date(Transaction.date, *modifiers, type_=Date)
+    return cast(func.date_trunc(interval, Transaction.date), Date)
+
+def _bucket_start(day: date, interval: str) -> np.datetime64:
+    # Days for day and week buckets, months for month buckets
+    if interval == "month":
+        return np.datetime64(day, "M")
+    value = np.datetime64(day, "D")
+    if interval == "week":
+        # Back to Monday; 1970-01-01 was a Thursday
+        value -= (value.astype(np.int64) + 3) % 7
+    return value
+
+def _transaction_buckets(db: Session, interval: str, group_by: Optional[str], start: date, end: date, account_id: Optional[int], category_id: Optional[int]):
+    # As ISO text, which NumPy parses far faster than date objects
+    bucket = cast(_bucket(db, interval), String).label("bucket")
+    keys = [TIMESERIES_GROUPS[group_by].label("key")] if group_by else []
+    statement = (
+        select(bucket, *keys, func.coalesce(func.sum(Transaction.amount), 0), func.count(Transaction.id))
+        .where(Transaction.date >= start, Transaction.date < end)
+        .group_by(bucket, *keys)
+    )
+    if account_id is not None:
+        statement = statement.where(Transaction.account_id == account_id)
+    if category_id is not None:
+        statement = statement.where(Transaction.category_id == category_id)
+
+    rows = db.execute(statement).all()
+    columns = list(zip(*rows)) if rows else [[]] * (len(keys) + 3)
+    buckets = np.array(columns[0], dtype="datetime64[D]")
+    if interval == "month":
+        buckets = buckets.astype("datetime64[M]")
+    series = np.array([NO_KEY if key is None else key for key in columns[1]], dtype=np.int64) if group_by else np.full(len(rows), NO_KEY)
+    return buckets, series, np.array(columns[-2], dtype=np.float64), np.array(columns[-1], dtype=np.int64)
+
+def _category_month_buckets(db: Session, start: date, end: date):
+    # Monthly totals per category are already maintained by the ledger rollup
+    month_index = CategoryMonthlySpend.year * 12 + CategoryMonthlySpend.month - 1
+    statement = select(month_index, CategoryMonthlySpend.category_id, CategoryMonthlySpend.total, CategoryMonthlySpend.count).where(
+        month_index >= start.year * 12 + start.month - 1,
+        month_index < end.year * 12 + end.month - 1,
+        CategoryMonthlySpend.count != 0,
+    )
+    rows = db.execute(statement).all()
+    columns = list(zip(*rows)) if rows else [[]] * 4
+    # Months since 0000-01 to months since the 1970 epoch
+    buckets = (np.array(columns[0], dtype=np.int64) - 1970 * 12).astype("datetime64[M]")
+    return buckets, np.array(columns[1], dtype=np.int64), np.array(columns[2], dtype=np.float64), np.array(columns[3], dtype=np.int64)
+
+def _timeseries(
+    db: Session, interval: str, group_by: Optional[str], start: date, end: date, account_id: Optional[int], category_id: Optional[int],
+) -> bytes:
+    step = 7 if interval == "week" else 1
+    edges = np.arange(_bucket_start(start, interval), _bucket_start(end, interval) + step, step)
+    if len(edges) > settings.timeseries_max_points:
+        raise InvalidQueryError(f"Time series spans more than {settings.timeseries_max_points} buckets; use a longer interval")
+    # Whole buckets only, so the first and last points are not partial
+    first, stop = edges[0].astype("datetime64[D]").item(), (edges[-1] + step).astype("datetime64[D]").item()
+
+    if settings.analytics_snapshot:
+        buckets, keys, totals, counts = analytics.snapshot.buckets(db, interval, group_by, first, stop, account_id, category_id)
+    elif interval == "month" and group_by == "category_id" and account_id is None and category_id is None:
+        buckets, keys, totals, counts = _category_month_buckets(db, first, stop)
+    else:
+        buckets, keys, totals, counts = _transaction_buckets(db, interval, group_by, first, stop, account_id, category_id)
+
+    series, rows = np.unique(keys, return_inverse=True) if group_by else (np.array([NO_KEY]), np.zeros(len(keys), dtype=np.int64))
+    if len(series) * len(edges) > settings.timeseries_max_points:
+        raise InvalidQueryError(f"Time series has more than {settings.timeseries_max_points} points; add filters or use a longer interval")
+    # Scatter the non-empty buckets into zero-filled (series, bucket) matrices
+    cells = rows * len(edges) + (buckets - edges[0]).astype(np.int64) // step
+    shape = (len(series), len(edges))
+    total = np.bincount(cells, weights=totals, minlength=shape[0] * shape[1]).reshape(shape)
+    count = np.bincount(cells, weights=counts, minlength=shape[0] * shape[1]).astype(np.int64).reshape(shape)
+
+    return dump_arrays({
+        "interval": interval,
+        "group_by": group_by,
+        "buckets": np.datetime_as_string(edges.astype("datetime64[D]")).tolist(),
+        "series": [
+            {"key": None if key == NO_KEY else int(key), "total": total[i], "count": count[i]}
+            for i, key in enumerate(series.tolist())
+        ],
+    })
+
+def get_timeseries(
+    db: Session,
+    start: date,
+    end: date,
+    interval: str = "month",
+    group_by: Optional[str] = None,
+    account_id: Optional[int] = None,
+    category_id: Optional[int] = None,
+) -> bytes:
+    # Serialized TimeSeries: one zero-filled total and count array per series,
+    # covering every bucket from the one containing start to the one containing end
+    if interval not in TIMESERIES_INTERVALS:
+        raise InvalidQueryError(f"Unsupported interval: {interval}")
+    if group_by is not None and group_by not in TIMESERIES_GROUPS:
+        raise InvalidQueryError(f"Unsupported group_by for time series: {group_by}")
+    if end < start:
+        raise InvalidQueryError("end must not be before start")
+
+    key = ("timeseries", start, end, interval, group_by, account_id, category_id)
+    load = lambda: _timeseries(db, interval, group_by, start, end, account_id, category_id)
+    return response_cache.get_or_load(key, TIMESERIES_TABLES, load, fill=not served_by_replica(db))
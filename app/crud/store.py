@@ -1,6 +1,14 @@
+import threading
+import time
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
-from app.db.models import Store
+from app.core.config import settings
+from app.db import generations
+from app.db.models import Store, Transaction
 from app.schemas.store import StoreCreate, StoreUpdate
+from app.schemas.query import QueryParams
+from app.utils.query import apply_filters, paginate
+from app.utils.suggest import SuggestIndex
 
 def get_store(db: Session, store_id: int):
     return db.query(Store).filter(Store.id == store_id).first()
@@ -8,6 +16,91 @@ def get_store(db: Session, store_id: int):
 def get_stores(db: Session, skip: int = 0, limit: int = 100):
     return db.query(Store).offset(skip).limit(limit).all()
 
+def query_stores(db: Session, query_params: QueryParams):
+    query = db.query(Store)
+
+    if query_params.filters:
+        query = apply_filters(query, Store, query_params.filters)
+
+    return paginate(query, Store, query_params)
+
+class StoreSuggestions:
+    """Autocomplete index over store names, ranked by how many transactions use each store.
+
+    Rebuilt after any store write, and after transaction writes at most every
+    refresh_seconds since usage counts only move the ranking. Only the very first
+    build runs on the request path; later ones run in a background thread while
+    lookups keep using the previous index, which is swapped out once the new one
+    is ready.
+    """
+
+    def __init__(self, refresh_seconds: float):
+        self.refresh_seconds = refresh_seconds
+        # (index, generations it was read under, monotonic build time), replaced as a whole
+        self._state = None
+        self._builder = None
+        self._lock = threading.Lock()
+
+    def _is_stale(self, state: tuple, snapshot: tuple[int, int]) -> bool:
+        _, built_snapshot, built_at = state
+        if snapshot[0] != built_snapshot[0]:
+            return True
+        return snapshot[1] != built_snapshot[1] and time.monotonic() - built_at >= self.refresh_seconds
+
+    @staticmethod
+    def _build(bind, snapshot: tuple[int, int]) -> tuple:
+        usage = (
+            select(Transaction.store_id, func.count().label("usage"))
+            .where(Transaction.store_id.is_not(None))
+            .group_by(Transaction.store_id)
+            .subquery()
+        )
+        with bind.connect() as connection:
+            rows = connection.execute(
+                select(Store.id, Store.name, func.coalesce(usage.c.usage, 0))
+                .outerjoin(usage, usage.c.store_id == Store.id)
+                .where(Store.name.is_not(None))
+            ).all()
+        return SuggestIndex(rows), snapshot, time.monotonic()
+
+    def _rebuild(self, bind, snapshot: tuple[int, int]):
+        state = self._build(bind, snapshot)
+        with self._lock:
+            self._state = state
+
+    def get(self, db: Session) -> SuggestIndex:
+        # Generations are read before the build, so a write made during it leaves
+        # the new index stale and the next lookup starts another build
+        snapshot = generations.snapshot("stores", "transactions")
+        state = self._state
+        if state is not None and not self._is_stale(state, snapshot):
+            return state[0]
+        # Read on the primary: the index is stamped with its generations, which a
+        # lagging replica may not have caught up with yet
+        bind = Session.get_bind(db, Store)
+        with self._lock:
+            if self._state is None:
+                self._state = self._build(bind, snapshot)
+                return self._state[0]
+            if self._builder is None or not self._builder.is_alive():
+                self._builder = threading.Thread(target=self._rebuild, args=(bind, snapshot), daemon=True)
+                self._builder.start()
+            return self._state[0]
+
+    def wait(self, timeout: float = None):
+        # Block until a background build in progress has been swapped in
+        builder = self._builder
+        if builder is not None:
+            builder.join(timeout)
+
+store_suggestions = StoreSuggestions(refresh_seconds=settings.store_usage_refresh_seconds)
+
+def suggest_stores(db: Session, q: str, limit: int = 10) -> list[dict]:
+    return [
+        {"id": store_id, "name": name, "usage_count": usage}
+        for store_id, name, usage in store_suggestions.get(db).suggest(q, limit)
+    ]
+
 def create_store(db: Session, store: StoreCreate):
     db_store = Store(**store.dict())
     db.add(db_store)
@@ -1,54 +1,318 @@
-from sqlalchemy.orm import Session
-from app.db.models import Transaction
+from typing import TYPE_CHECKING, Optional
+from pydantic import ValidationError
+from sqlalchemy import extract, func, insert, select, type_coerce, String
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session, raiseload, selectinload
+from app.core.config import settings
+from app.crud import analytics, ledger
+from app.db import search
+from app.db.database import served_by_replica
+from app.db.models import Account, Category, Store, Transaction
+from app.schemas import transaction as schemas
 from app.schemas.transaction import TransactionCreate, TransactionUpdate, TransactionStatus
-from app.schemas.query import QueryParams
-from app.utils.query import apply_filters, apply_sorting
+from app.schemas.query import AggregateParams, QueryParams
+from app.utils.cache import response_cache
+from app.utils.query import InvalidQueryError, apply_filters, apply_sorting, paginate, paginate_async, project
+
+if TYPE_CHECKING:
+    # sqlalchemy.ext.asyncio needs greenlet, which only the async install has
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+TRANSACTION_TABLES = ("transactions",)
+# Relations that /query can embed, and the table each one reads
+TRANSACTION_RELATIONS = {"account": "accounts", "category": "categories", "store": "stores"}
+# Columns behind the Transaction schema, in its field order
+TRANSACTION_FIELDS = tuple(schemas.Transaction.model_fields)
+# Keys /aggregate can group by; year and month come from the transaction date
+AGGREGATE_GROUPS = {
+    "account_id": Transaction.account_id,
+    "category_id": Transaction.category_id,
+    "store_id": Transaction.store_id,
+    "status": Transaction.status,
+    "year": extract("year", Transaction.date),
+    "month": extract("month", Transaction.date),
+}
+AGGREGATE_METRICS = {
+    "sum": func.sum(Transaction.amount),
+    "count": func.count(Transaction.id),
+    "avg": func.avg(Transaction.amount),
+    "min": func.min(Transaction.amount),
+    "max": func.max(Transaction.amount),
+}
+EXPORT_COLUMNS = ("id", "date", "amount", "description", "account_id", "category_id", "store_id", "status")
+# Names a partitioned export can join in after EXPORT_COLUMNS
+EXPORT_NAME_COLUMNS = ("account_name", "category_name", "store_name")
 
 def get_transaction(db: Session, transaction_id: int):
     return db.query(Transaction).filter(Transaction.id == transaction_id).first()
 
-def get_transactions(db: Session, query_params: QueryParams):
+def parse_include(include: Optional[str]) -> tuple[str, ...]:
+    relations = tuple(dict.fromkeys(name.strip() for name in include.split(",") if name.strip())) if include else ()
+    for relation in relations:
+        if relation not in TRANSACTION_RELATIONS:
+            raise InvalidQueryError(f"Unknown relation for transactions: {relation}")
+    return relations
+
+def _include_options(include: tuple[str, ...]) -> list:
+    # One SELECT ... IN per included relation and page, however many rows it has;
+    # reading any other relation raises instead of lazy-loading one row at a time
+    return [
+        selectinload(getattr(Transaction, relation)) if relation in include else raiseload(getattr(Transaction, relation))
+        for relation in TRANSACTION_RELATIONS
+    ]
+
+def get_transactions(db: Session, query_params: QueryParams, include: tuple[str, ...] = ()):
     query = db.query(Transaction)
+
+    if include:
+        query = query.options(*_include_options(include))
+
+    if query_params.fields is not None:
+        # Entities are loaded whole; a fieldset only trims what is serialized
+        project(Transaction, query_params, ())
     
     if query_params.filters:
         query = apply_filters(query, Transaction, query_params.filters)
     
+    return paginate(query, Transaction, query_params)
+
+def get_transaction_rows(db: Session, query_params: QueryParams):
+    # Column rows instead of entities, for serializing straight to JSON. Only the
+    # requested fields (plus keyset columns) are selected; returns them with the page.
+    fields, columns = project(Transaction, query_params, TRANSACTION_FIELDS)
+    query = db.query(*columns)
+
+    if query_params.filters:
+        query = apply_filters(query, Transaction, query_params.filters)
+
+    return fields, *paginate(query, Transaction, query_params)
+
+async def get_transaction_async(db: "AsyncSession", transaction_id: int):
+    return await db.get(Transaction, transaction_id)
+
+async def get_transactions_async(db: "AsyncSession", query_params: QueryParams, include: tuple[str, ...] = ()):
+    statement = select(Transaction)
+
+    if include:
+        statement = statement.options(*_include_options(include))
+
+    if query_params.fields is not None:
+        project(Transaction, query_params, ())
+
+    if query_params.filters:
+        statement = apply_filters(statement, Transaction, query_params.filters)
+
+    return await paginate_async(db, statement, Transaction, query_params)
+
+async def get_transaction_rows_async(db: "AsyncSession", query_params: QueryParams):
+    # get_transaction_rows() for an AsyncSession
+    fields, columns = project(Transaction, query_params, TRANSACTION_FIELDS)
+    statement = select(*columns)
+
+    if query_params.filters:
+        statement = apply_filters(statement, Transaction, query_params.filters)
+
+    return fields, *await paginate_async(db, statement, Transaction, query_params)
+
+def stream_transactions(db: Session, query_params: QueryParams, batch_size: int = 1000):
+    # Core rows from a server-side cursor, skipping ORM entities entirely. Dates and
+    # statuses come back as their stored text since exports only re-serialize them.
+    columns = [
+        type_coerce(getattr(Transaction, column), String) if column in ("date", "status") else getattr(Transaction, column)
+        for column in EXPORT_COLUMNS
+    ]
+    statement = select(*columns)
+
+    if query_params.filters:
+        statement = apply_filters(statement, Transaction, query_params.filters)
+
     if query_params.sort:
-        query = apply_sorting(query, Transaction, query_params.sort)
-    
-    total = query.count()
-    transactions = query.offset(query_params.skip).limit(query_params.limit).all()
-    
-    return transactions, total
+        statement = apply_sorting(statement, Transaction, query_params.sort)
+    else:
+        statement = statement.order_by(Transaction.id)
+
+    result = db.connection().execute(statement.execution_options(yield_per=batch_size))
+    return result.partitions()
+
+def stream_transactions_by_date(db: Session, batch_size: int = 1000, with_names: bool = False):
+    # Like stream_transactions, but ordered by date (undated rows first) so a
+    # partitioned export can cut the stream into months as it arrives. Returns
+    # the column names with the batches.
+    columns = EXPORT_COLUMNS + (EXPORT_NAME_COLUMNS if with_names else ())
+    selected = [
+        type_coerce(getattr(Transaction, column), String) if column in ("date", "status") else getattr(Transaction, column)
+        for column in EXPORT_COLUMNS
+    ]
+    statement = select(*selected)
+    if with_names:
+        statement = statement.add_columns(Account.name, Category.name, Store.name).select_from(Transaction)
+        for model, relation in ((Account, Transaction.account), (Category, Transaction.category), (Store, Transaction.store)):
+            statement = statement.outerjoin(model, relation)
+    statement = statement.order_by(Transaction.date.asc().nulls_first(), Transaction.id)
+
+    result = db.connection().execute(statement.execution_options(yield_per=batch_size))
+    return columns, result.partitions()
+
+def _aggregate_statement(aggregate_params: AggregateParams):
+    group_by = tuple(dict.fromkeys(aggregate_params.group_by))
+    metrics = tuple(dict.fromkeys(aggregate_params.metrics))
+    if not metrics:
+        raise InvalidQueryError("metrics must name at least one metric")
+    for key in group_by:
+        if key not in AGGREGATE_GROUPS:
+            raise InvalidQueryError(f"Unsupported group_by for transactions: {key}")
+    for metric in metrics:
+        if metric not in AGGREGATE_METRICS:
+            raise InvalidQueryError(f"Unsupported metric: {metric}")
+
+    keys = [AGGREGATE_GROUPS[key].label(key) for key in group_by]
+    statement = select(*keys, *(AGGREGATE_METRICS[metric].label(metric) for metric in metrics))
+    if aggregate_params.filters:
+        statement = apply_filters(statement, Transaction, aggregate_params.filters)
+    return group_by, metrics, statement.group_by(*keys).order_by(*keys)
+
+def aggregate_transactions(db: Session, aggregate_params: AggregateParams) -> list[dict]:
+    # One GROUP BY statement for the whole request, or one pass over the analytics
+    # snapshot when it can apply the filters. One group past the limit is fetched
+    # so an oversized result is refused instead of truncated.
+    group_by, metrics, statement = _aggregate_statement(aggregate_params)
+    max_groups = settings.aggregate_max_groups
+
+    def load():
+        groups = None
+        if settings.analytics_snapshot:
+            groups = analytics.snapshot.aggregate(db, group_by, metrics, aggregate_params.filters, max_groups + 1)
+        if groups is None:
+            names = group_by + metrics
+            groups = [dict(zip(names, row)) for row in db.execute(statement.limit(max_groups + 1))]
+        if len(groups) > max_groups:
+            raise InvalidQueryError(f"Aggregation returns more than {max_groups} groups; add filters or group by fewer keys")
+        return groups
+
+    key = ("transactions.aggregate", aggregate_params.model_dump_json())
+    return response_cache.get_or_load(key, TRANSACTION_TABLES, load, fill=not served_by_replica(db))
 
 def create_transaction(db: Session, transaction: TransactionCreate):
     db_transaction = Transaction(**transaction.model_dump())
     db.add(db_transaction)
+    ledger.post(db, [ledger.entry(db_transaction)])
     db.commit()
     db.refresh(db_transaction)
     return db_transaction
 
+async def create_transaction_async(db: "AsyncSession", transaction: TransactionCreate):
+    db_transaction = Transaction(**transaction.model_dump())
+    db.add(db_transaction)
+    await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)]))
+    await db.commit()
+    await db.refresh(db_transaction)
+    return db_transaction
+
+def create_transactions(db: Session, transactions: list, chunk_size: int = 1000):
+    ids = [None] * len(transactions)
+    errors = []
+
+    rows = []
+    for index, data in enumerate(transactions):
+        try:
+            rows.append((index, TransactionCreate.model_validate(data).model_dump()))
+        except ValidationError as exc:
+            errors.append({"index": index, "detail": exc.errors(include_url=False, include_context=False)})
+
+    statement = insert(Transaction).returning(Transaction.id, sort_by_parameter_order=True)
+    for start in range(0, len(rows), chunk_size):
+        chunk = rows[start:start + chunk_size]
+        try:
+            # One executemany (batched into multi-row VALUES), one search index insert
+            # and one commit per chunk
+            with search.bulk_index(db, Transaction) as indexed:
+                new_ids = db.execute(statement, [row for _, row in chunk]).scalars().all()
+                indexed.extend(new_ids)
+            ledger.post(db, [ledger.row_entry(row) for _, row in chunk])
+            analytics.record(db, [analytics.row(new_id, row) for new_id, (_, row) in zip(new_ids, chunk)])
+            db.commit()
+        except IntegrityError:
+            db.rollback()
+            new_ids = _create_rows_individually(db, chunk, errors)
+        for (index, _), new_id in zip(chunk, new_ids):
+            ids[index] = new_id
+
+    errors.sort(key=lambda error: error["index"])
+    return ids, errors
+
+def _create_rows_individually(db: Session, chunk: list, errors: list) -> list:
+    # Only used to pinpoint the offending rows once a whole chunk has failed
+    new_ids = []
+    for index, row in chunk:
+        try:
+            new_id = db.execute(insert(Transaction).returning(Transaction.id), row).scalar_one()
+            ledger.post(db, [ledger.row_entry(row)])
+            analytics.record(db, [analytics.row(new_id, row)])
+            db.commit()
+            new_ids.append(new_id)
+        except IntegrityError as exc:
+            db.rollback()
+            new_ids.append(None)
+            errors.append({"index": index, "detail": str(exc.orig)})
+    return new_ids
+
 def update_transaction(db: Session, transaction_id: int, transaction: TransactionUpdate):
     db_transaction = get_transaction(db, transaction_id)
     if db_transaction:
         update_data = transaction.model_dump(exclude_unset=True)
+        # Reverse the old posting and apply the new one, covering amount, account and status changes
+        ledger.post(db, [ledger.entry(db_transaction)], sign=-1)
         for key, value in update_data.items():
             setattr(db_transaction, key, value)
+        ledger.post(db, [ledger.entry(db_transaction)])
         db.commit()
         db.refresh(db_transaction)
     return db_transaction
 
+async def update_transaction_async(db: "AsyncSession", transaction_id: int, transaction: TransactionUpdate):
+    db_transaction = await get_transaction_async(db, transaction_id)
+    if db_transaction:
+        update_data = transaction.model_dump(exclude_unset=True)
+        await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)], sign=-1))
+        for key, value in update_data.items():
+            setattr(db_transaction, key, value)
+        await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)]))
+        await db.commit()
+        await db.refresh(db_transaction)
+    return db_transaction
+
 def delete_transaction(db: Session, transaction_id: int):
     db_transaction = get_transaction(db, transaction_id)
     if db_transaction:
+        ledger.post(db, [ledger.entry(db_transaction)], sign=-1)
         db.delete(db_transaction)
         db.commit()
     return db_transaction
 
+async def delete_transaction_async(db: "AsyncSession", transaction_id: int):
+    db_transaction = await get_transaction_async(db, transaction_id)
+    if db_transaction:
+        await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)], sign=-1))
+        await db.delete(db_transaction)
+        await db.commit()
+    return db_transaction
+
 def complete_transaction(db: Session, transaction_id: int):
     db_transaction = get_transaction(db, transaction_id)
     if db_transaction:
+        ledger.post(db, [ledger.entry(db_transaction)], sign=-1)
         db_transaction.status = TransactionStatus.COMPLETED
+        ledger.post(db, [ledger.entry(db_transaction)])
         db.commit()
         db.refresh(db_transaction)
-    return db_transaction
\ No newline at end of file
+    return db_transaction
+
+async def complete_transaction_async(db: "AsyncSession", transaction_id: int):
+    db_transaction = await get_transaction_async(db, transaction_id)
+    if db_transaction:
+        await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)], sign=-1))
+        db_transaction.status = TransactionStatus.COMPLETED
+        await db.run_sync(lambda session: ledger.post(session, [ledger.entry(db_transaction)]))
+        await db.commit()
+        await db.refresh(db_transaction)
+    return db_transaction
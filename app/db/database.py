@@ -1,13 +1,129 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+import time
+from fastapi import Request, Response
+from sqlalchemy import Delete, Insert, Update, create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker
 from app.core.config import settings
 
-engine = create_engine(settings.database_url)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+SQLITE_PRAGMAS = ("journal_mode", "synchronous", "busy_timeout", "mmap_size", "cache_size", "temp_store")
 
-def get_db():
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+def engine_options(url: str) -> dict:
+    options = {"pool_pre_ping": settings.pool_pre_ping, "pool_recycle": settings.pool_recycle}
+    parsed = make_url(url)
+    if not (parsed.get_backend_name() == "sqlite" and parsed.database in (None, "", ":memory:")):
+        options.update(pool_size=settings.pool_size, max_overflow=settings.max_overflow, pool_timeout=settings.pool_timeout)
+    return options
+
+def sqlite_pragmas() -> dict:
+    pragmas = {name: getattr(settings, f"sqlite_{name}") for name in SQLITE_PRAGMAS}
+    return {name: value for name, value in pragmas.items() if value}
+
+def apply_sqlite_pragmas(engine, pragmas: dict):
+    # Runs on every new DBAPI connection, before the pool hands it out and outside any transaction
+    @event.listens_for(engine, "connect")
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+        cursor.close()
+
+def create_configured_engine(url: str):
+    configured = create_engine(url, **engine_options(url))
+    if is_sqlite(url):
+        apply_sqlite_pragmas(configured, sqlite_pragmas())
+    return configured
+
+class RoutingSession(Session):
+    """Session that sends reads to a replica once marked with info["replica"].
+
+    Flushes and insert/update/delete statements always go to the primary, as
+    does everything in a session that was not marked.
+    """
+
+    def __init__(self, *args, replica=None, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.replica = replica
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if (
+            self.replica is not None
+            and self.info.get("replica")
+            and not self._flushing
+            and not isinstance(clause, (Insert, Update, Delete))
+        ):
+            return self.replica
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+def served_by_replica(db: Session) -> bool:
+    # Generations only track the primary and a replica may lag it, so a replica
+    # read must not fill a generation-keyed cache or carry a generation ETag: the
+    # pre-write rows would be stored as current. It may still be answered from
+    # entries that primary reads filled.
+    return getattr(db, "replica", None) is not None and bool(db.info.get("replica"))
+
+engine = create_configured_engine(settings.database_url)
+replica_engine = create_configured_engine(settings.read_replica_url) if settings.read_replica_url else None
+SessionLocal = sessionmaker(class_=RoutingSession, autocommit=False, autoflush=False, bind=engine, replica=replica_engine)
+
+# Requests that never write; POST /query and /aggregate only read despite the method
+READ_METHODS = ("GET", "HEAD")
+READ_PATH_SUFFIXES = ("/query", "/aggregate")
+STICKY_COOKIE = "primary_until"
+
+def is_read_request(request: Request) -> bool:
+    return request.method in READ_METHODS or request.url.path.rstrip("/").endswith(READ_PATH_SUFFIXES)
+
+def use_replica(request: Request, response: Response) -> bool:
+    # Read-your-writes: a write pins the client to the primary for a short window,
+    # tracked in a cookie so it holds across workers
+    now = time.time()
+    if not is_read_request(request):
+        response.set_cookie(STICKY_COOKIE, str(int(now) + settings.replica_sticky_seconds), max_age=settings.replica_sticky_seconds, httponly=True)
+        return False
+    try:
+        return float(request.cookies.get(STICKY_COOKIE, 0)) <= now
+    except ValueError:
+        return True
+
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "sqlite+pysqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+}
+
+def async_database_url(url: str) -> str:
+    # Swap a sync driver for its async counterpart; other drivers are kept as given
+    parsed = make_url(url)
+    if parsed.drivername in ASYNC_DRIVERS:
+        parsed = parsed.set(drivername=ASYNC_DRIVERS[parsed.drivername])
+    return parsed.render_as_string(hide_password=False)
+
+async_engine = None
+AsyncSessionLocal = None
+if settings.async_database:
+    # Imported lazily so the sync-only install does not need greenlet or an async driver
+    from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+    async_url = settings.async_database_url or async_database_url(settings.database_url)
+    async_engine = create_async_engine(async_url, **engine_options(async_url))
+    if is_sqlite(async_url):
+        apply_sqlite_pragmas(async_engine.sync_engine, sqlite_pragmas())
+    AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
+
+def get_db(request: Request, response: Response):
     db = SessionLocal()
+    if db.replica is not None:
+        # Also on the request, for generation ETags (app.utils.etag)
+        db.info["replica"] = request.state.replica = use_replica(request, response)
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,47 @@
+import itertools
+import threading
+from collections import defaultdict
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+# Per-table write generations. Every committed write bumps the generation of the
+# tables it touched, so anything derived from a table (cached counts, cached
+# responses) is valid only while the generation it was computed under is current.
+# Generations are process-local: writes made by other processes are not seen.
+
+_lock = threading.Lock()
+_generations = defaultdict(int)
+
+def current(table: str) -> int:
+    return _generations[table]
+
+def snapshot(*tables: str) -> tuple[int, ...]:
+    return tuple(_generations[table] for table in tables)
+
+def bump(*tables: str):
+    with _lock:
+        for table in tables:
+            _generations[table] += 1
+
+def _pending(session: Session) -> set:
+    return session.info.setdefault("written_tables", set())
+
+@event.listens_for(Session, "after_flush")
+def _track_flush(session, flush_context):
+    pending = _pending(session)
+    for instance in itertools.chain(session.new, session.dirty, session.deleted):
+        pending.add(instance.__table__.name)
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_execute(orm_execute_state):
+    # Bulk insert()/update()/delete() statements bypass the flush
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        _pending(orm_execute_state.session).add(orm_execute_state.statement.table.name)
+
+@event.listens_for(Session, "after_commit")
+def _bump_committed(session):
+    # Tables are only forgotten on commit; a rollback leaves them to be bumped
+    # by the next commit, which over-invalidates but never serves stale data.
+    pending = session.info.pop("written_tables", None)
+    if pending:
+        bump(*pending)
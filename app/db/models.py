@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Float, Date, Boolean, ForeignKey, Enum, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from sqlalchemy.ext.declarative import declarative_base
 
@@ -16,6 +16,8 @@ class Category(Base):
 
     transactions = relationship("Transaction", back_populates="category")
     budget_allocations = relationship("BudgetAllocation", back_populates="category")
+    # Rollup rows cannot outlive their category (category_id is NOT NULL)
+    monthly_spend = relationship("CategoryMonthlySpend", back_populates="category", cascade="all, delete-orphan")
 
 class Reconciliation(Base):
     __tablename__ = "reconciliations"
@@ -31,6 +33,8 @@ class Account(Base):
     name = Column(String, index=True)
     type = Column(String)
     balance = Column(Float)
+    cleared_balance = Column(Float, default=0.0)
+    pending_balance = Column(Float, default=0.0)
     last_reconciled = Column(Date, nullable=True)
 
     transactions = relationship("Transaction", back_populates="account")
@@ -59,6 +63,17 @@ class Transaction(Base):
     account = relationship("Account", back_populates="transactions")
     category = relationship("Category", back_populates="transactions")
     store = relationship("Store", back_populates="transactions")
+
+    __table_args__ = (
+        Index("ix_transactions_account_id_date", "account_id", "date"),
+        Index("ix_transactions_category_id_date", "category_id", "date"),
+        Index("ix_transactions_store_id_date", "store_id", "date"),
+        Index(
+            "ix_transactions_pending_date", "date",
+            sqlite_where=text("status = 'PENDING'"),
+            postgresql_where=text("status = 'PENDING'"),
+        ),
+    )
     
 class BudgetAllocation(Base):
     __tablename__ = "budget_allocations"
@@ -69,4 +84,22 @@ class BudgetAllocation(Base):
     amount = Column(Float)
     category_id = Column(Integer, ForeignKey("categories.id"))
 
-    category = relationship("Category", back_populates="budget_allocations")
\ No newline at end of file
+    category = relationship("Category", back_populates="budget_allocations")
+
+class CategoryMonthlySpend(Base):
+    # Rollup of transactions per category and month, maintained by app.crud.ledger
+    __tablename__ = "category_monthly_spend"
+
+    id = Column(Integer, primary_key=True, index=True)
+    year = Column(Integer, nullable=False)
+    month = Column(Integer, nullable=False)
+    total = Column(Float, nullable=False, default=0.0)
+    count = Column(Integer, nullable=False, default=0)
+    category_id = Column(Integer, ForeignKey("categories.id"), nullable=False)
+
+    category = relationship("Category", back_populates="monthly_spend")
+
+    __table_args__ = (
+        UniqueConstraint("category_id", "year", "month", name="uq_category_monthly_spend"),
+        Index("ix_category_monthly_spend_year_month", "year", "month"),
+    )
@@ -0,0 +1,157 @@
+import re
+from contextlib import contextmanager
+from typing import Iterator, Optional
+from sqlalchemy import Column, Integer, MetaData, Table, Text, delete, event, func, insert, literal_column, select
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.db.models import Base
+
+# Full-text search over transaction descriptions and store names.
+#
+# - SQLite: external-content FTS5 tables over the base tables, kept in sync by
+#   triggers. Ranked by bm25, where lower is better. Bulk inserts pause the
+#   insert trigger and index their rows in one statement (see bulk_index).
+# - PostgreSQL: GIN indexes on to_tsvector('simple', column), ranked by ts_rank.
+#
+# Either way a search is a join against a (row id, rank) subquery of the matches,
+# so it filters and supplies the rank to order by.
+
+backend = make_url(settings.database_url).get_backend_name()
+
+# (table, column) -> FTS5 table
+SEARCH_INDEXES = {
+    ("transactions", "description"): "transactions_fts",
+    ("stores", "name"): "stores_fts",
+}
+
+_fts_metadata = MetaData()
+_fts_tables = {
+    fts: Table(fts, _fts_metadata, Column("rowid", Integer), Column(column, Text), Column("rank"))
+    for (_, column), fts in SEARCH_INDEXES.items()
+}
+# FTS tables whose insert trigger is paused; only ever written inside a bulk insert
+_paused = Table("search_index_paused", _fts_metadata, Column("fts", Text, primary_key=True))
+
+def _sqlite_insert_trigger(table: str, column: str, fts: str) -> str:
+    return (
+        f"CREATE TRIGGER {fts}_ai AFTER INSERT ON {table} "
+        f"WHEN NOT EXISTS (SELECT 1 FROM search_index_paused WHERE fts = '{fts}') BEGIN "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END"
+    )
+
+def _sqlite_ddl(table: str, column: str, fts: str) -> list[str]:
+    return [
+        f"CREATE VIRTUAL TABLE {fts} USING fts5({column}, content='{table}', content_rowid='id', tokenize='unicode61 remove_diacritics 2')",
+        _sqlite_insert_trigger(table, column, fts),
+        f"CREATE TRIGGER {fts}_ad AFTER DELETE ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); END",
+        f"CREATE TRIGGER {fts}_au AFTER UPDATE OF {column} ON {table} BEGIN "
+        f"INSERT INTO {fts}({fts}, rowid, {column}) VALUES ('delete', old.id, old.{column}); "
+        f"INSERT INTO {fts}(rowid, {column}) VALUES (new.id, new.{column}); END",
+        # Index rows that predate the FTS table
+        f"INSERT INTO {fts}({fts}) VALUES ('rebuild')",
+    ]
+
+def _postgresql_ddl(table: str, column: str) -> list[str]:
+    return [f"CREATE INDEX IF NOT EXISTS ix_{table}_{column}_fts ON {table} USING gin (to_tsvector('simple', {column}))"]
+
+def _sqlite_exists(connection, name: str) -> bool:
+    return connection.exec_driver_sql("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)).first() is not None
+
+def create_search_indexes(connection):
+    dialect = connection.dialect.name
+    pausable = dialect == "sqlite" and _sqlite_exists(connection, _paused.name)
+    if dialect == "sqlite" and not pausable:
+        _paused.create(connection)
+    for (table, column), fts in SEARCH_INDEXES.items():
+        if dialect == "sqlite":
+            if not _sqlite_exists(connection, fts):
+                statements = _sqlite_ddl(table, column, fts)
+            elif not pausable:
+                # Created before bulk_index: swap in the insert trigger that can be paused
+                statements = [f"DROP TRIGGER IF EXISTS {fts}_ai", _sqlite_insert_trigger(table, column, fts)]
+            else:
+                statements = []
+        elif dialect == "postgresql":
+            statements = _postgresql_ddl(table, column)
+        else:
+            statements = []
+        for statement in statements:
+            connection.exec_driver_sql(statement)
+
+def drop_search_indexes(connection):
+    dialect = connection.dialect.name
+    for (table, column), fts in SEARCH_INDEXES.items():
+        if dialect == "sqlite":
+            # Dropping the FTS table leaves the triggers pointing at nothing
+            for suffix in ("ai", "ad", "au"):
+                connection.exec_driver_sql(f"DROP TRIGGER IF EXISTS {fts}_{suffix}")
+            connection.exec_driver_sql(f"DROP TABLE IF EXISTS {fts}")
+        elif dialect == "postgresql":
+            connection.exec_driver_sql(f"DROP INDEX IF EXISTS ix_{table}_{column}_fts")
+    if dialect == "sqlite":
+        _paused.drop(connection, checkfirst=True)
+
+@event.listens_for(Base.metadata, "after_create")
+def _create_after_tables(target, connection, **kw):
+    create_search_indexes(connection)
+
+@event.listens_for(Base.metadata, "before_drop")
+def _drop_before_tables(target, connection, **kw):
+    drop_search_indexes(connection)
+
+@contextmanager
+def bulk_index(db: Session, model: type) -> Iterator[list]:
+    # For bulk inserts into a searchable table on SQLite. The per-row insert
+    # trigger roughly halves insert throughput; inside the block it is paused and
+    # the rows whose ids the caller appends to the yielded list are indexed with
+    # one INSERT ... SELECT per FTS table on the way out.
+    #
+    # The pause is a row written in the caller's transaction, which holds the
+    # write lock until it ends, so other connections never see it. The block must
+    # not commit; if it raises, the caller's rollback discards the pause with the
+    # rows.
+    indexes = [
+        (getattr(model, column), _fts_tables[fts])
+        for (table, column), fts in SEARCH_INDEXES.items() if table == model.__tablename__
+    ]
+    ids = []
+    if backend != "sqlite" or not indexes:
+        yield ids
+        return
+    names = [fts.name for _, fts in indexes]
+    db.execute(insert(_paused), [{"fts": name} for name in names])
+    yield ids
+    if ids:
+        for column, fts in indexes:
+            rows = select(model.id, column).where(model.id.in_(ids))
+            db.execute(insert(fts).from_select(["rowid", column.key], rows))
+    db.execute(delete(_paused).where(_paused.c.fts.in_(names)))
+
+def is_searchable(column: any) -> bool:
+    return (column.class_.__tablename__, column.key) in SEARCH_INDEXES
+
+def search_query(value: any) -> Optional[str]:
+    # Free text to the backend's query syntax: every word must match and the last
+    # one may be a prefix, for search-as-you-type. Words are quoted for FTS5 so
+    # operators in user text stay literal.
+    words = re.findall(r"\w+", str(value))
+    if not words:
+        return None
+    if backend == "postgresql":
+        return " & ".join(words) + ":*"
+    return " ".join(f'"{word}"' for word in words) + "*"
+
+def search_join(column: any, param: any) -> tuple:
+    # Returns the subquery of matches, the join condition and the rank ordering
+    model = column.class_
+    if backend == "postgresql":
+        query = func.to_tsquery("simple", param)
+        vector = func.to_tsvector("simple", column)
+        matches = select(model.id.label("rowid"), func.ts_rank(vector, query).label("rank")).where(vector.op("@@")(query)).subquery()
+        return matches, matches.c.rowid == model.id, matches.c.rank.desc()
+
+    fts = _fts_tables[SEARCH_INDEXES[(model.__tablename__, column.key)]]
+    matches = select(fts.c.rowid, fts.c.rank).where(literal_column(fts.name).op("MATCH")(param)).subquery()
+    return matches, matches.c.rowid == model.id, matches.c.rank.asc()
@@ -0,0 +1,136 @@
+import csv
+import re
+from datetime import date, datetime
+from typing import Iterator, Optional, TextIO
+
+# Each parser turns a text stream into raw records: dicts with "line", and any of
+# "date", "amount" (or CSV "debit"/"credit"), "payee", "memo", "category", "reference"
+# as strings. Records are yielded as soon as they are complete, so only one record is
+# held at a time. Values are not parsed here, so a bad cell is an error for its row only.
+
+DATE_FORMATS = ("%Y-%m-%d", "%m/%d/%Y", "%m/%d/%y", "%Y%m%d", "%d.%m.%Y")
+
+class ParseError(ValueError):
+    pass
+
+def parse_date(value: str) -> date:
+    value = value.strip()
+    # QIF writes years after 1999 as m/d'yy
+    value = value.replace("'", "/").replace(" ", "")
+    for date_format in DATE_FORMATS:
+        try:
+            return datetime.strptime(value, date_format).date()
+        except ValueError:
+            continue
+    raise ParseError(f"Unrecognized date: {value!r}")
+
+def parse_amount(value: str) -> float:
+    cleaned = value.strip().replace(",", "").replace("$", "")
+    negative = cleaned.startswith("(") and cleaned.endswith(")")
+    try:
+        amount = float(cleaned.strip("()"))
+    except ValueError:
+        raise ParseError(f"Unrecognized amount: {value!r}")
+    return -amount if negative else amount
+
+CSV_COLUMNS = {
+    "date": ("date", "posted date", "transaction date", "posting date"),
+    "amount": ("amount", "transaction amount"),
+    "debit": ("debit", "withdrawal", "outflow"),
+    "credit": ("credit", "deposit", "inflow"),
+    "payee": ("payee", "description", "name", "merchant", "store"),
+    "memo": ("memo", "notes", "note"),
+    "category": ("category",),
+    "reference": ("reference", "id", "transaction id", "fitid"),
+}
+
+def _csv_field_map(header: list[str]) -> dict[str, int]:
+    normalized = [column.strip().lower() for column in header]
+    fields = {}
+    for field, aliases in CSV_COLUMNS.items():
+        for alias in aliases:
+            if alias in normalized:
+                fields[field] = normalized.index(alias)
+                break
+    if "date" not in fields or not ({"amount", "debit", "credit"} & fields.keys()):
+        raise ParseError("CSV header needs a date column and an amount (or debit/credit) column")
+    return fields
+
+def parse_csv(stream: TextIO) -> Iterator[dict]:
+    reader = csv.reader(stream)
+    header = next(reader, None)
+    if header is None:
+        return
+    fields = _csv_field_map(header)
+
+    for row in reader:
+        if not any(cell.strip() for cell in row):
+            continue
+        record = {"line": reader.line_num}
+        for field, position in fields.items():
+            if position < len(row) and row[position].strip():
+                record[field] = row[position].strip()
+        yield record
+
+OFX_FIELDS = {"DTPOSTED": "date", "TRNAMT": "amount", "NAME": "payee", "PAYEE": "payee", "MEMO": "memo", "FITID": "reference"}
+OFX_TAG = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+def _ofx_tokens(stream: TextIO, chunk_size: int = 65536) -> Iterator[tuple[bool, str, str]]:
+    # OFX 1.x is SGML without closing tags for leaf elements and may sit on a
+    # single line, so tokenize tags from fixed-size chunks instead of lines
+    pending = ""
+    while True:
+        chunk = stream.read(chunk_size)
+        pending += chunk
+        # Keep the last, possibly incomplete, tag for the next chunk
+        cut = pending.rfind("<") if chunk else len(pending)
+        for match in OFX_TAG.finditer(pending, 0, max(cut, 0)):
+            yield match.group(1) == "/", match.group(2).upper(), match.group(3).strip()
+        if not chunk:
+            return
+        pending = pending[cut:] if cut >= 0 else ""
+
+def parse_ofx(stream: TextIO) -> Iterator[dict]:
+    record: Optional[dict] = None
+    count = 0
+    for closing, tag, text in _ofx_tokens(stream):
+        if tag == "STMTTRN":
+            if closing and record is not None:
+                yield record
+                record = None
+            elif not closing:
+                count += 1
+                record = {"line": count}
+        elif record is not None and not closing and tag in OFX_FIELDS and text:
+            if tag == "DTPOSTED":
+                text = text[:8]  # YYYYMMDD[HHMMSS[.XXX][TZ]]
+            record.setdefault(OFX_FIELDS[tag], text)
+
+QIF_FIELDS = {"D": "date", "T": "amount", "U": "amount", "P": "payee", "M": "memo", "L": "category", "N": "reference"}
+
+def parse_qif(stream: TextIO) -> Iterator[dict]:
+    record = {}
+    for line_number, line in enumerate(stream, start=1):
+        line = line.rstrip("\r\n")
+        if not line or line.startswith("!"):
+            continue
+        if line.startswith("^"):
+            if "date" in record or "amount" in record:
+                yield record
+            record = {}
+            continue
+        field = QIF_FIELDS.get(line[0])
+        if field and line[1:].strip():
+            record.setdefault("line", line_number)
+            record.setdefault(field, line[1:].strip())
+    if "date" in record or "amount" in record:
+        yield record
+
+PARSERS = {"csv": parse_csv, "ofx": parse_ofx, "qfx": parse_ofx, "qif": parse_qif}
+
+def detect_format(filename: Optional[str]) -> Optional[str]:
+    if filename and "." in filename:
+        extension = filename.rsplit(".", 1)[1].lower()
+        if extension in PARSERS:
+            return extension
+    return None
@@ -0,0 +1,188 @@
+import itertools
+import time
+import uuid
+from collections import Counter
+from typing import Callable, Iterable, Iterator, Optional, TextIO
+
+from sqlalchemy import func, insert, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.crud import transaction as transaction_crud
+from app.db.models import Category, Store, Transaction
+from app.importers.parsers import PARSERS, ParseError, parse_amount, parse_date
+from app.utils.cache import LRUCache
+
+# A statement import streams through parse -> normalize -> resolve -> dedupe ->
+# insert. Every stage is a generator over records or fixed-size batches, so memory
+# is bounded by the batch size no matter how large the uploaded file is.
+
+MAX_REPORTED_ERRORS = 100
+
+class ImportProgress:
+    def __init__(self, filename: Optional[str], file_format: str):
+        self.id = uuid.uuid4().hex
+        self.filename = filename
+        self.format = file_format
+        self.status = "running"
+        self.rows_read = 0
+        self.imported = 0
+        self.duplicates = 0
+        self.error_count = 0
+        self.errors = []
+        self.stores_created = 0
+        self.batches = 0
+        self.started = time.monotonic()
+        self.finished = None
+
+    def add_error(self, line: Optional[int], detail):
+        self.error_count += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "detail": detail})
+
+    @property
+    def elapsed_seconds(self) -> float:
+        return (self.finished or time.monotonic()) - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        elapsed = self.elapsed_seconds
+        return self.rows_read / elapsed if elapsed > 0 else 0.0
+
+# Recent and running imports, readable while an import is still in progress
+imports = LRUCache(maxsize=100)
+
+class StatementImporter:
+    def __init__(
+        self,
+        db: Session,
+        account_id: int,
+        default_category_id: int,
+        create_stores: bool = True,
+        batch_size: int = 1000,
+        on_progress: Optional[Callable[[ImportProgress], None]] = None,
+    ):
+        self.db = db
+        self.account_id = account_id
+        self.default_category_id = default_category_id
+        self.create_stores = create_stores
+        self.batch_size = batch_size
+        self.on_progress = on_progress
+        self.stores_created = 0
+        # Name lookups are answered from memory; only unseen stores touch the database
+        self.stores = {name.lower(): store_id for store_id, name in db.execute(select(Store.id, Store.name)) if name}
+        self.categories = {name.lower(): category_id for category_id, name in db.execute(select(Category.id, Category.name)) if name}
+        # Rows inserted by this import are never treated as duplicates of each other
+        self.max_existing_id = db.execute(select(func.max(Transaction.id))).scalar() or 0
+        # (date, amount, description) -> existing rows already matched by earlier batches
+        self.matched = Counter()
+
+    def run(self, stream: TextIO, file_format: str, filename: Optional[str] = None) -> ImportProgress:
+        progress = ImportProgress(filename, file_format)
+        imports.set(progress.id, progress)
+        try:
+            records = self._normalize(PARSERS[file_format](stream), progress)
+            for batch in self._batches(records):
+                batch = self._resolve(batch)
+                batch = self._dedupe(batch, progress)
+                self._insert(batch, progress)
+                progress.batches += 1
+                if self.on_progress:
+                    self.on_progress(progress)
+            progress.status = "completed"
+        except ParseError as exc:
+            progress.add_error(None, str(exc))
+            progress.status = "failed"
+        finally:
+            progress.finished = time.monotonic()
+        return progress
+
+    def _normalize(self, records: Iterable[dict], progress: ImportProgress) -> Iterator[dict]:
+        for record in records:
+            progress.rows_read += 1
+            try:
+                payee = record.get("payee")
+                yield {
+                    "line": record["line"],
+                    "date": parse_date(record["date"]),
+                    "amount": self._amount(record),
+                    "description": payee or record.get("memo") or "",
+                    "store": payee,
+                    "category": record.get("category"),
+                }
+            except KeyError as exc:
+                progress.add_error(record.get("line"), f"Missing {exc.args[0]}")
+            except ParseError as exc:
+                progress.add_error(record.get("line"), str(exc))
+
+    @staticmethod
+    def _amount(record: dict) -> float:
+        # Split debit/credit columns become one signed amount
+        if "amount" not in record and ("debit" in record or "credit" in record):
+            return parse_amount(record.get("credit", "0")) - abs(parse_amount(record.get("debit", "0")))
+        return parse_amount(record["amount"])
+
+    def _batches(self, records: Iterator[dict]) -> Iterator[list[dict]]:
+        while batch := list(itertools.islice(records, self.batch_size)):
+            yield batch
+
+    def _resolve(self, batch: list[dict]) -> list[dict]:
+        new_stores = {record["store"].lower(): record["store"] for record in batch
+                      if record["store"] and record["store"].lower() not in self.stores}
+        if new_stores and self.create_stores:
+            self._create_stores(new_stores)
+
+        for record in batch:
+            store = record.pop("store")
+            category = record.pop("category")
+            record["store_id"] = self.stores.get(store.lower()) if store else None
+            record["category_id"] = self.categories.get(category.lower(), self.default_category_id) if category else self.default_category_id
+            record["account_id"] = self.account_id
+        return batch
+
+    def _create_stores(self, names: dict[str, str]):
+        rows = [{"name": name, "user_defined": False} for name in names.values()]
+        try:
+            created = self.db.execute(insert(Store).returning(Store.id, Store.name, sort_by_parameter_order=True), rows).all()
+            self.db.commit()
+        except IntegrityError:
+            # Another writer created one of these stores since the cache was loaded
+            self.db.rollback()
+            created = self.db.execute(select(Store.id, Store.name).where(Store.name.in_(list(names.values())))).all()
+        else:
+            self.stores_created += len(created)
+        for store_id, name in created:
+            self.stores[name.lower()] = store_id
+
+    def _dedupe(self, batch: list[dict], progress: ImportProgress) -> list[dict]:
+        if not batch:
+            return batch
+        dates = [record["date"] for record in batch]
+        existing = Counter(self.db.execute(
+            select(Transaction.date, Transaction.amount, Transaction.description).where(
+                Transaction.account_id == self.account_id,
+                Transaction.date >= min(dates),
+                Transaction.date <= max(dates),
+                Transaction.id <= self.max_existing_id,
+            )
+        ).all())
+
+        unique = []
+        for record in batch:
+            key = (record["date"], record["amount"], record["description"])
+            # Counting keeps genuinely repeated purchases that are new to the ledger;
+            # an existing row matched in an earlier batch cannot match again
+            if existing[key] > self.matched[key]:
+                self.matched[key] += 1
+                progress.duplicates += 1
+            else:
+                unique.append(record)
+        return unique
+
+    def _insert(self, batch: list[dict], progress: ImportProgress):
+        lines = [record.pop("line") for record in batch]
+        ids, errors = transaction_crud.create_transactions(self.db, batch, chunk_size=self.batch_size)
+        progress.imported += sum(1 for new_id in ids if new_id is not None)
+        progress.stores_created = self.stores_created
+        for error in errors:
+            progress.add_error(lines[error["index"]], error["detail"])
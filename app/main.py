@@ -1,17 +1,32 @@
-from fastapi import FastAPI, Depends
+from fastapi import FastAPI, Depends, Request
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from app.core.config import settings
+from app.crud import analytics
 from app.db.database import get_db
-from app.api.v1.endpoints import categories, accounts, transactions, stores, budget_allocations, reconciliations
+from app.utils.cache import response_cache
+from app.utils.query import InvalidQueryError
+from app.api.v1.endpoints import categories, accounts, transactions, stores, budget_allocations, reconciliations, imports, reports
 
 app = FastAPI(title=settings.app_name, debug=settings.debug)
 
+@app.exception_handler(InvalidQueryError)
+async def invalid_query_handler(request: Request, exc: InvalidQueryError):
+    return JSONResponse(status_code=400, content={"detail": str(exc)})
+
+if settings.async_database:
+    # Registered first so these routes take precedence over their sync versions
+    from app.api.v1.endpoints import async_routes
+    app.include_router(async_routes.router, prefix="/api/v1")
+
 app.include_router(categories.router, prefix="/api/v1/categories", tags=["categories"])
 app.include_router(accounts.router, prefix="/api/v1/accounts", tags=["accounts"])
 app.include_router(transactions.router, prefix="/api/v1/transactions", tags=["transactions"])
 app.include_router(stores.router, prefix="/api/v1/stores", tags=["stores"])
 app.include_router(budget_allocations.router, prefix="/api/v1/budget_allocations", tags=["budget_allocations"])
 app.include_router(reconciliations.router, prefix="/api/v1/reconciliations", tags=["reconciliations"])
+app.include_router(imports.router, prefix="/api/v1/imports", tags=["imports"])
+app.include_router(reports.router, prefix="/api/v1/reports", tags=["reports"])
 
 @app.get("/")
 async def root(db: Session = Depends(get_db)):
@@ -23,4 +38,13 @@ async def root(db: Session = Depends(get_db)):
 
 @app.get("/health")
 async def health_check(db: Session = Depends(get_db)):
-    return {"status": "healthy", "environment": settings.environment}
\ No newline at end of file
+    return {"status": "healthy", "environment": settings.environment}
+
+@app.get("/metrics/cache")
+async def cache_metrics():
+    return response_cache.stats()
+
+
+@app.get("/metrics/analytics")
+async def analytics_metrics():
+    return analytics.snapshot.stats()
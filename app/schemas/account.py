@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 from datetime import date
 
@@ -18,7 +18,16 @@ class AccountUpdate(BaseModel):
 
 class Account(AccountBase):
     id: int
+    cleared_balance: float = 0.0
+    pending_balance: float = 0.0
     last_reconciled: Optional[date] = None
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class AccountBalanceCheck(BaseModel):
+    account_id: int
+    previous_balance: Optional[float] = None
+    balance: float
+    cleared_balance: float
+    pending_balance: float
+    drift: float
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 class BudgetAllocationBase(BaseModel):
@@ -19,5 +19,4 @@ class BudgetAllocationUpdate(BaseModel):
 class BudgetAllocation(BudgetAllocationBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
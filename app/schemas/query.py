@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import List, Optional, Any, Union, Generic, TypeVar
+from typing import List, Optional, Any, Dict, Literal, Union, Generic, TypeVar
 from datetime import date, datetime
 
 T = TypeVar('T')
@@ -12,7 +12,7 @@ class FilterCondition(BaseModel):
     field: str
     operator: str
     value: Any
-    data_type: str  # 'string', 'number', 'date', 'boolean', 'enum'
+    data_type: str  # 'string', 'number', 'date', 'boolean', 'enum', 'search' (operator 'match')
 
 class SortOrder(BaseModel):
     field: str
@@ -23,9 +23,23 @@ class QueryParams(BaseModel):
     sort: Optional[List[SortOrder]] = None
     skip: int = 0
     limit: int = 100
+    pagination: Literal["offset", "cursor"] = "offset"
+    cursor: Optional[str] = None
+    total_mode: Literal["exact", "estimate", "none"] = "exact"  # 'estimate' may lag recent writes
+    fields: Optional[List[str]] = None  # sparse fieldset; items carry only these columns
 
 class PaginatedResponse(BaseModel, Generic[T]):
     items: List[T]
-    total: int
+    total: Optional[int]
     page: int
-    size: int
\ No newline at end of file
+    size: int
+    next_cursor: Optional[str] = None
+
+class AggregateParams(BaseModel):
+    filters: Optional[List[FilterCondition]] = None
+    group_by: List[str] = []  # e.g. 'account_id', 'status', 'year', 'month'; none gives one overall row
+    metrics: List[str] = ["sum", "count"]  # 'sum', 'count', 'avg', 'min', 'max'
+
+class AggregateResponse(BaseModel):
+    # One row per group: the group_by keys followed by the metrics, ordered by the keys
+    groups: List[Dict[str, Any]]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from datetime import date
 
 class ReconciliationBase(BaseModel):
@@ -11,5 +11,4 @@ class ReconciliationCreate(ReconciliationBase):
 class Reconciliation(ReconciliationBase):
     id: int
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
\ No newline at end of file
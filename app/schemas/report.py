@@ -0,0 +1,32 @@
+from pydantic import BaseModel
+from datetime import date
+from typing import List, Optional
+
+class BudgetReportLine(BaseModel):
+    category_id: int
+    name: Optional[str] = None
+    type: Optional[str] = None
+    monthly_budget: Optional[float] = None
+    allocated: float
+    spent: float  # net outflow, i.e. the negated sum of the month's signed amounts
+    remaining: float
+    transaction_count: int
+
+class BudgetReport(BaseModel):
+    year: int
+    month: int
+    allocated: float
+    spent: float
+    remaining: float
+    categories: List[BudgetReportLine]
+
+class TimeSeriesLine(BaseModel):
+    key: Optional[int] = None  # the group_by id; None for the ungrouped series
+    total: List[float]  # signed sum of amounts per bucket, aligned with TimeSeries.buckets
+    count: List[int]
+
+class TimeSeries(BaseModel):
+    interval: str
+    group_by: Optional[str] = None
+    buckets: List[date]  # start of each bucket; weeks start on Monday
+    series: List[TimeSeriesLine]
@@ -0,0 +1,23 @@
+from pydantic import BaseModel, ConfigDict
+from typing import Any, List, Optional
+
+class ImportRowError(BaseModel):
+    line: Optional[int] = None
+    detail: Any
+
+class ImportResult(BaseModel):
+    id: str
+    filename: Optional[str] = None
+    format: str
+    status: str  # 'running', 'completed', 'failed'
+    rows_read: int
+    imported: int
+    duplicates: int
+    stores_created: int
+    batches: int
+    error_count: int
+    errors: List[ImportRowError]  # the first 100 errors
+    elapsed_seconds: float
+    rows_per_second: float
+
+    model_config = ConfigDict(from_attributes=True)
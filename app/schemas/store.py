@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 from typing import Optional
 
 class StoreBase(BaseModel):
@@ -12,8 +12,12 @@ class StoreUpdate(BaseModel):
     name: Optional[str] = None
     user_defined: Optional[bool] = None
 
+class StoreSuggestion(BaseModel):
+    id: int
+    name: str
+    usage_count: int
+
 class Store(StoreBase):
     id: int
 
-    class Config:
-        orm_mode = True
+    model_config = ConfigDict(from_attributes=True)
@@ -1,7 +1,11 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+import datetime
 from datetime import date
-from typing import Optional
+from typing import Optional, List, Any
 from enum import Enum
+from app.schemas.account import Account
+from app.schemas.category import Category
+from app.schemas.store import Store
 
 class TransactionStatus(str, Enum):
     PENDING = "PENDING"
@@ -20,7 +24,8 @@ class TransactionCreate(TransactionBase):
     pass
 
 class TransactionUpdate(BaseModel):
-    date: Optional[date] = None
+    # The field name shadows the date type inside this class body
+    date: Optional[datetime.date] = None
     amount: Optional[float] = None
     description: Optional[str] = None
     account_id: Optional[int] = None
@@ -31,5 +36,18 @@ class TransactionUpdate(BaseModel):
 class Transaction(TransactionBase):
     id: int
 
-    class Config:
-        orm_mode = True
\ No newline at end of file
+    model_config = ConfigDict(from_attributes=True)
+
+class TransactionWithRelated(Transaction):
+    # Only filled in for the relations requested with include=
+    account: Optional[Account] = None
+    category: Optional[Category] = None
+    store: Optional[Store] = None
+
+class BulkTransactionError(BaseModel):
+    index: int
+    detail: Any
+
+class BulkTransactionResult(BaseModel):
+    ids: List[Optional[int]]  # aligned with the request rows, None where the row failed
+    errors: List[BulkTransactionError]
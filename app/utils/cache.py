@@ -0,0 +1,97 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+from app.core.config import settings
+from app.db import generations
+
+class LRUCache:
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            value, expires = entry
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any):
+        if self.maxsize <= 0:
+            return
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def keys(self) -> list:
+        with self._lock:
+            return list(self._data)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+class ResponseCache:
+    """LRU/TTL cache for read results, invalidated by table write generations.
+
+    Each entry remembers the generations of the tables it was read from and is
+    only served while none of them has been written since.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None, enabled: bool = True):
+        self.enabled = enabled
+        self.hits = 0
+        self.misses = 0
+        self._entries = LRUCache(maxsize=maxsize, ttl=ttl)
+
+    def get_or_load(self, key: Hashable, tables: tuple, load: Callable[[], Any], fill: bool = True) -> Any:
+        # fill=False answers from a current entry but never stores what load()
+        # returns, for reads that may lag the generations (replica reads)
+        if not self.enabled:
+            return load()
+        # Snapshot before loading so a concurrent write can only invalidate the entry
+        snapshot = generations.snapshot(*tables)
+        cached = self._entries.get(key)
+        if cached is not None and cached[0] == snapshot:
+            self.hits += 1
+            return cached[1]
+        self.misses += 1
+        value = load()
+        if fill:
+            self._entries.set(key, (snapshot, value))
+        return value
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "enabled": self.enabled,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": self.hits / lookups if lookups else 0.0,
+            "size": len(self._entries),
+        }
+
+    def clear(self):
+        self.hits = 0
+        self.misses = 0
+        self._entries.clear()
+
+response_cache = ResponseCache(
+    maxsize=settings.response_cache_size,
+    ttl=settings.response_cache_ttl or None,
+    enabled=settings.response_cache,
+)
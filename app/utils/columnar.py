@@ -0,0 +1,210 @@
+import bisect
+import hashlib
+import io
+import json
+import os
+from typing import Iterable, Iterator, Optional
+import numpy as np
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    # pyarrow comes with the parquet extra; the JSON and CSV exports do not need it
+    pa = None
+
+# Arrow writers for transaction rows. iter_arrow streams one IPC stream over
+# HTTP; export_partitions writes a directory of year=YYYY/month=M files (hive
+# layout) that Arrow, DuckDB or Spark read as one partitioned dataset.
+
+# Arrow type aliases for the exported columns; anything else (joined names) is text
+COLUMN_TYPES = {
+    "id": "int64",
+    "date": "date32",
+    "amount": "float64",
+    "account_id": "int64",
+    "category_id": "int64",
+    "store_id": "int64",
+}
+FORMATS = {"parquet": ".parquet", "arrow": ".arrow"}
+MANIFEST = "_manifest.json"
+# Hive's name for a null partition value, which Arrow reads back as null
+NULL_PARTITION = "__HIVE_DEFAULT_PARTITION__"
+
+def available() -> bool:
+    return pa is not None
+
+def arrow_schema(columns: tuple[str, ...]) -> "pa.Schema":
+    return pa.schema([(column, pa.type_for_alias(COLUMN_TYPES.get(column, "string"))) for column in columns])
+
+def record_batch(rows: list[tuple], schema: "pa.Schema") -> "pa.RecordBatch":
+    if not rows:
+        return pa.RecordBatch.from_pylist([], schema=schema)
+    arrays = []
+    for values, field in zip(zip(*rows), schema):
+        if field.type == pa.date32():
+            # Dates are selected as ISO text; Arrow parses those faster than date objects
+            arrays.append(pa.array(values, pa.string()).cast(field.type))
+        else:
+            arrays.append(pa.array(values, field.type))
+    return pa.RecordBatch.from_arrays(arrays, schema=schema)
+
+def _drain(buffer: io.BytesIO) -> bytes:
+    chunk = buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate()
+    return chunk
+
+def iter_arrow(batches: Iterable[list[tuple]], columns: tuple[str, ...]) -> Iterator[bytes]:
+    # One Arrow IPC stream, emitted a record batch at a time
+    schema = arrow_schema(columns)
+    buffer = io.BytesIO()
+    with pa.ipc.new_stream(buffer, schema) as writer:
+        for batch in batches:
+            writer.write_batch(record_batch(batch, schema))
+            yield _drain(buffer)
+    yield _drain(buffer)
+
+def fingerprint(table: "pa.Table") -> str:
+    # Hash of a partition's values; it does not depend on how the rows were split
+    # into batches, so an unchanged month hashes the same on every export
+    digest = hashlib.blake2b(digest_size=16)
+    for column in table.itercolumns():
+        array = column.combine_chunks()
+        digest.update(array.is_null().to_numpy(zero_copy_only=False))
+        if pa.types.is_string(array.type):
+            _, offsets, data = array.buffers()
+            offsets = np.frombuffer(offsets, dtype=np.int32)[array.offset:array.offset + len(array) + 1]
+            digest.update(np.diff(offsets))
+            if data is not None:
+                digest.update(memoryview(data)[offsets[0]:offsets[-1]])
+        else:
+            digest.update(array.fill_null(pa.scalar(0, array.type)).to_numpy(zero_copy_only=False))
+    return digest.hexdigest()
+
+def partition_name(day: Optional[str]) -> str:
+    if day is None:
+        return f"year={NULL_PARTITION}/month={NULL_PARTITION}"
+    return f"year={int(day[:4])}/month={int(day[5:7])}"
+
+def _split_months(dates: list) -> Iterator[tuple[str, int, int]]:
+    # (partition, start, stop) runs of a batch sorted by date with undated rows first
+    start = bisect.bisect_left(dates, True, key=lambda day: day is not None)
+    if start:
+        yield partition_name(None), 0, start
+    while start < len(dates):
+        month = dates[start][:7]
+        stop = bisect.bisect_left(dates, month + "~", start)
+        yield partition_name(dates[start]), start, stop
+        start = stop
+
+def read_manifest(directory: str) -> Optional[dict]:
+    try:
+        with open(os.path.join(directory, MANIFEST), "rb") as manifest:
+            return json.load(manifest)
+    except FileNotFoundError:
+        return None
+
+def _write_file(table: "pa.Table", path: str, format: str):
+    # Written beside the target and renamed over it, so readers never see half a file.
+    # The temporary name starts with a dot, which dataset discovery skips.
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    temporary = os.path.join(os.path.dirname(path), "." + os.path.basename(path))
+    if format == "parquet":
+        pq.write_table(table, temporary)
+    else:
+        # Uncompressed IPC files map straight into memory when read back
+        with pa.OSFile(temporary, "wb") as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    os.replace(temporary, path)
+
+def _remove_file(directory: str, name: str, suffix: str):
+    path = os.path.join(directory, name, "part-0" + suffix)
+    if os.path.exists(path):
+        os.remove(path)
+    for parent in (os.path.dirname(path), os.path.dirname(os.path.dirname(path))):
+        try:
+            os.rmdir(parent)
+        except OSError:
+            break
+
+def export_partitions(
+    batches: Iterable[list[tuple]],
+    columns: tuple[str, ...],
+    directory: str,
+    format: str = "parquet",
+    incremental: bool = False,
+) -> dict:
+    # batches must be ordered by date, undated rows first (transaction_crud.
+    # stream_transactions_by_date). Each month is collected as Arrow batches and
+    # written as one file, so memory is bounded by the largest month. With
+    # incremental, a month whose fingerprint matches the last export's manifest is
+    # left untouched. Months that no longer have rows are removed either way.
+    suffix = FORMATS[format]
+    schema = arrow_schema(columns)
+    date_index = columns.index("date")
+    previous = read_manifest(directory) or {"partitions": {}}
+    reusable = incremental and previous.get("format") == format and previous.get("columns") == list(columns)
+    partitions = {}
+    written = 0
+
+    def flush(name: str, pieces: list):
+        nonlocal written
+        table = pa.Table.from_batches(pieces, schema)
+        entry = partitions[name] = {"rows": table.num_rows, "fingerprint": fingerprint(table)}
+        path = os.path.join(directory, name, "part-0" + suffix)
+        if reusable and previous["partitions"].get(name, {}).get("fingerprint") == entry["fingerprint"] and os.path.exists(path):
+            return
+        _write_file(table, path, format)
+        written += 1
+
+    current, pieces = None, []
+    for rows in batches:
+        batch = record_batch(rows, schema)
+        for name, start, stop in _split_months([row[date_index] for row in rows]):
+            if name != current:
+                if pieces:
+                    flush(current, pieces)
+                current, pieces = name, []
+            pieces.append(batch.slice(start, stop - start))
+    if pieces:
+        flush(current, pieces)
+
+    # Months without rows any more, and every old file if the format changed
+    previous_suffix = FORMATS.get(previous.get("format"), suffix)
+    removed = [name for name in previous["partitions"] if name not in partitions]
+    for name in previous["partitions"]:
+        if name not in partitions or previous_suffix != suffix:
+            _remove_file(directory, name, previous_suffix)
+
+    os.makedirs(directory, exist_ok=True)
+    manifest = {"format": format, "columns": list(columns), "partitions": partitions}
+    temporary = os.path.join(directory, "." + MANIFEST)
+    with open(temporary, "w") as output:
+        json.dump(manifest, output, indent=1, sort_keys=True)
+    os.replace(temporary, os.path.join(directory, MANIFEST))
+    return {
+        "rows": sum(entry["rows"] for entry in partitions.values()),
+        "partitions": len(partitions),
+        "written": written,
+        "removed": len(removed),
+    }
+
+def open_export(directory: str) -> "ds.Dataset":
+    # The exported files as one dataset with year and month columns from the paths.
+    # Files are memory-mapped, so local readers page data in instead of copying
+    # it; filter on year/month to touch only those files.
+    manifest = read_manifest(directory)
+    if manifest is None:
+        raise FileNotFoundError(f"No export manifest in {directory}")
+    keys = pa.schema([("year", pa.int32()), ("month", pa.int32())])
+    schema = arrow_schema(tuple(manifest["columns"]))
+    return ds.dataset(
+        directory,
+        schema=pa.unify_schemas([schema, keys]),
+        format="parquet" if manifest["format"] == "parquet" else "ipc",
+        partitioning=ds.partitioning(keys, flavor="hive"),
+        filesystem=pafs.LocalFileSystem(use_mmap=True),
+    )
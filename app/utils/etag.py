@@ -0,0 +1,44 @@
+import hashlib
+import time
+import uuid
+from typing import Hashable, Optional
+from fastapi import Request, Response
+from app.core.config import settings
+from app.db import generations
+
+# Strong ETags derived from table write generations, so a matching request can be
+# answered without touching the database. Generations are process-local and the
+# boot token changes on restart, so a tag only ever matches on the worker that
+# issued it. Writes made by other processes (workers, the CLI) bump no generation
+# here, so tags also roll over every ETAG_TTL seconds: a 304 for data another
+# process has changed is returned for at most that long.
+
+_boot = uuid.uuid4().hex
+
+def _epoch() -> int:
+    return int(time.monotonic() // settings.etag_ttl) if settings.etag_ttl else 0
+
+def generation_etag(key: Hashable, tables: tuple) -> str:
+    digest = hashlib.blake2b(repr((_boot, _epoch(), key, generations.snapshot(*tables))).encode(), digest_size=16)
+    return f'"{digest.hexdigest()}"'
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    # If-None-Match uses the weak comparison, so W/ prefixes are ignored
+    return any(candidate.strip().removeprefix("W/") == etag for candidate in header.split(","))
+
+def not_modified(request: Request, response: Response, key: Hashable, tables: tuple) -> Optional[Response]:
+    """Return a 304 when the client's copy is current, otherwise tag the response.
+
+    A request served by a lagging read replica is not tagged, since its body may
+    predate the current generations. A tag the client already holds was issued
+    for current data, so it is still answered with a 304.
+    """
+    etag = generation_etag(key, tables)
+    if etag_matches(request, etag):
+        return Response(status_code=304, headers={"ETag": etag})
+    if not getattr(request.state, "replica", False):
+        response.headers["ETag"] = etag
+    return None
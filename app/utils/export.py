@@ -0,0 +1,23 @@
+import csv
+import io
+from typing import Iterable, Iterator
+import orjson
+
+# Both writers take rows already grouped into batches (e.g. Result.partitions())
+# and emit one chunk per batch, so memory stays bounded by the batch size.
+
+def iter_ndjson(batches: Iterable[list[tuple]], columns: tuple[str, ...]) -> Iterator[bytes]:
+    for batch in batches:
+        yield b"".join(orjson.dumps(dict(zip(columns, row))) + b"\n" for row in batch)
+
+def iter_csv(batches: Iterable[list[tuple]], columns: tuple[str, ...]) -> Iterator[str]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for batch in batches:
+        writer.writerows(batch)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
@@ -1,74 +1,361 @@
+import base64
+import json
+from datetime import date, datetime, timedelta
+from typing import Optional
 from sqlalchemy.orm import Query
-from app.schemas.query import FilterCondition, SortOrder
-from sqlalchemy import and_, or_, func
-from sqlalchemy.sql import text
+from pydantic import ValidationError
+from app.schemas.query import FilterCondition, SortOrder, QueryParams, DateRange
+from functools import lru_cache
+from sqlalchemy import Select, and_, or_, not_, func, false, bindparam, inspect, select, Date, DateTime, String
+from app.core.config import settings
+from app.db import search
+from app.db.database import served_by_replica
+from app.utils.cache import LRUCache
+
+class InvalidQueryError(ValueError):
+    pass
+
+def _as_day(value: any) -> date:
+    try:
+        if isinstance(value, str):
+            value = datetime.fromisoformat(value)
+        if isinstance(value, datetime):
+            return value.date()
+        if isinstance(value, date):
+            return value
+    except ValueError:
+        pass
+    raise InvalidQueryError(f"Invalid date value: {value!r}")
+
+def _as_date_range(value: any) -> DateRange:
+    if isinstance(value, DateRange):
+        return value
+    try:
+        if isinstance(value, (list, tuple)) and len(value) == 2:
+            return DateRange(start=value[0], end=value[1])
+        return DateRange.model_validate(value)
+    except ValidationError:
+        raise InvalidQueryError(f"Invalid date range: {value!r}")
+
+@lru_cache(maxsize=None)
+def column_registry(model: any) -> dict:
+    return {attribute.key: getattr(model, attribute.key) for attribute in inspect(model).column_attrs}
+
+def get_column(model: any, field: str):
+    column = column_registry(model).get(field)
+    if column is None:
+        raise InvalidQueryError(f"Unknown field for {model.__tablename__}: {field}")
+    return column
+
+def _as_list(value: any) -> list:
+    if not isinstance(value, (list, tuple)):
+        raise InvalidQueryError(f"Expected a list of values, got {value!r}")
+    return list(value)
+
+def _like_pattern(value: any) -> str:
+    escaped = str(value).replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"%{escaped}%"
+
+def _compile_condition(column: any, data_type: str, operator: str, name: str):
+    # Returns the criterion, built on named bind parameters, and a function
+    # mapping a request's filter value onto those parameters
+    value_param = bindparam(name, type_=column.type)
+    end_param = bindparam(f"{name}_end", type_=column.type)
+    list_param = bindparam(name, type_=column.type, expanding=True)
+    bind_value = lambda value: {name: value}
+    bind_list = lambda value: {name: _as_list(value)}
+
+    if data_type == 'string':
+        if operator == "eq":
+            return func.lower(column) == func.lower(value_param), bind_value
+        elif operator == "ne":
+            return func.lower(column) != func.lower(value_param), bind_value
+        elif operator == "like":
+            return func.lower(column).like(func.lower(value_param), escape="\\"), lambda value: {name: _like_pattern(value)}
+        elif operator == "ilike":
+            return column.ilike(value_param, escape="\\"), lambda value: {name: _like_pattern(value)}
+        elif operator == "in":
+            return column.in_(list_param), bind_list
+    elif data_type == 'number':
+        if operator == "eq":
+            return column == value_param, bind_value
+        elif operator == "ne":
+            return column != value_param, bind_value
+        elif operator == "gt":
+            return column > value_param, bind_value
+        elif operator == "lt":
+            return column < value_param, bind_value
+        elif operator == "ge":
+            return column >= value_param, bind_value
+        elif operator == "le":
+            return column <= value_param, bind_value
+        elif operator == "between":
+            return column.between(value_param, end_param), lambda value: {name: value[0], f"{name}_end": value[1]}
+        elif operator == "in":
+            return column.in_(list_param), bind_list
+    elif data_type == 'date':
+        # Compare the raw column against day boundaries so the date index stays usable
+        bind_day = lambda value: {name: _as_day(value)}
+        bind_next_day = lambda value: {name: _as_day(value) + timedelta(days=1)}
+        bind_whole_day = lambda value: {**bind_day(value), f"{name}_end": _as_day(value) + timedelta(days=1)}
+        if operator == "eq":
+            return and_(column >= value_param, column < end_param), bind_whole_day
+        elif operator == "ne":
+            # Matches nearly every row, so leave it as a plain scan predicate
+            return not_(and_(column >= value_param, column < end_param)), bind_whole_day
+        elif operator == "gt":
+            return column >= value_param, bind_next_day
+        elif operator == "lt":
+            return column < value_param, bind_day
+        elif operator == "ge":
+            return column >= value_param, bind_day
+        elif operator == "le":
+            return column < value_param, bind_next_day
+        elif operator == "between":
+            def bind_range(value):
+                date_range = _as_date_range(value)
+                return {name: _as_day(date_range.start), f"{name}_end": _as_day(date_range.end) + timedelta(days=1)}
+            return and_(column >= value_param, column < end_param), bind_range
+    elif data_type == 'boolean':
+        return column == value_param, bind_value
+    elif data_type == 'enum':
+        if operator == "eq":
+            return column == value_param, bind_value
+        elif operator == "ne":
+            return column != value_param, bind_value
+        elif operator == "in":
+            return column.in_(list_param), bind_list
+
+    raise InvalidQueryError(f"Unsupported {data_type} filter operator: {operator}")
+
+def _compile_search(column: any, operator: str, name: str):
+    # Full-text search is a join against the matching rows rather than a criterion
+    if operator != "match":
+        raise InvalidQueryError(f"Unsupported search filter operator: {operator}")
+    if not search.is_searchable(column):
+        raise InvalidQueryError(f"No full-text index on {column.key}")
+
+    def bind_search(value):
+        terms = search.search_query(value)
+        if terms is None:
+            raise InvalidQueryError("Search text must contain at least one word")
+        return {name: terms}
+    return search.search_join(column, bindparam(name, type_=String)), bind_search
+
+@lru_cache(maxsize=512)
+def _filter_plan(model: any, shape: tuple[tuple[str, str, str], ...]) -> tuple[tuple, tuple, tuple]:
+    # Compiled once per (field, operator, data_type) shape; requests with the same
+    # shape reuse the same criteria, so SQLAlchemy and the driver see one statement
+    criteria, joins, binders = [], [], []
+    for i, (field, operator, data_type) in enumerate(shape):
+        column = get_column(model, field)
+        if data_type == "search":
+            join, binder = _compile_search(column, operator, f"filter_{i}")
+            joins.append(join)
+        else:
+            criterion, binder = _compile_condition(column, data_type, operator, f"filter_{i}")
+            criteria.append(criterion)
+        binders.append(binder)
+    return tuple(criteria), tuple(joins), tuple(binders)
+
+def _filter_shape(filters: list[FilterCondition]) -> tuple[tuple[str, str, str], ...]:
+    return tuple((filter_condition.field, filter_condition.operator, filter_condition.data_type) for filter_condition in filters)
 
 def apply_filters(query: Query, model: any, filters: list[FilterCondition]) -> Query:
-    for filter_condition in filters:
-        column = getattr(model, filter_condition.field)
-        operator = filter_condition.operator
-        value = filter_condition.value
-        data_type = filter_condition.data_type
-
-        if data_type == 'string':
-            if operator == "eq":
-                query = query.filter(func.lower(column) == func.lower(value))
-            elif operator == "ne":
-                query = query.filter(func.lower(column) != func.lower(value))
-            elif operator == "like":
-                query = query.filter(func.lower(column).like(func.lower(text(f"%{value}%"))))
-            elif operator == "ilike":
-                query = query.filter(column.ilike(text(f"%{value}%")))
-            elif operator == "in":
-                query = query.filter(column.in_(value))
-        elif data_type == 'number':
-            if operator == "eq":
-                query = query.filter(column == value)
-            elif operator == "ne":
-                query = query.filter(column != value)
-            elif operator == "gt":
-                query = query.filter(column > value)
-            elif operator == "lt":
-                query = query.filter(column < value)
-            elif operator == "ge":
-                query = query.filter(column >= value)
-            elif operator == "le":
-                query = query.filter(column <= value)
-            elif operator == "between":
-                query = query.filter(column.between(value[0], value[1]))
-            elif operator == "in":
-                query = query.filter(column.in_(value))
-        elif data_type == 'date':
-            if operator == "eq":
-                query = query.filter(func.date(column) == value)
-            elif operator == "ne":
-                query = query.filter(func.date(column) != value)
-            elif operator == "gt":
-                query = query.filter(column > value)
-            elif operator == "lt":
-                query = query.filter(column < value)
-            elif operator == "between":
-                query = query.filter(column.between(value.start, value.end))
-        elif data_type == 'boolean':
-            query = query.filter(column.is_(value))
-        elif data_type == 'enum':
-            if operator == "eq":
-                query = query.filter(column == value)
-            elif operator == "ne":
-                query = query.filter(column != value)
-            elif operator == "in":
-                query = query.filter(column.in_(value))
+    criteria, joins, binders = _filter_plan(model, _filter_shape(filters))
 
-    return query
+    params = {}
+    for binder, filter_condition in zip(binders, filters):
+        try:
+            params.update(binder(filter_condition.value))
+        except (TypeError, IndexError, KeyError):
+            raise InvalidQueryError(f"Invalid value for {filter_condition.field}: {filter_condition.value!r}")
+
+    for target, onclause, _ in joins:
+        query = query.join(target, onclause)
+    return query.filter(*criteria).params(**params)
+
+def search_ordering(model: any, filters: Optional[list[FilterCondition]]) -> Optional[tuple]:
+    # Best matches first for the first search filter, if there is one
+    if not filters:
+        return None
+    _, joins, _ = _filter_plan(model, _filter_shape(filters))
+    if not joins:
+        return None
+    return joins[0][2], model.id
 
 def apply_sorting(query: Query, model: any, sort_orders: list[SortOrder]) -> Query:
     for sort_order in sort_orders:
-        column = getattr(model, sort_order.field)
-        if sort_order.field.endswith('_date'):  # Assuming date fields end with '_date'
-            column = func.date(column)
+        column = get_column(model, sort_order.field)
         if sort_order.direction.lower() == "desc":
             query = query.order_by(column.desc())
         else:
             query = query.order_by(column.asc())
     
-    return query
\ No newline at end of file
+    return query
+
+def _keyset_orders(sort_orders: Optional[list[SortOrder]]) -> list[tuple[str, bool]]:
+    # The primary key is always the last key so every row has a unique position
+    keys = [(sort_order.field, sort_order.direction.lower() == "desc") for sort_order in sort_orders or []]
+    if "id" not in (field for field, _ in keys):
+        keys.append(("id", False))
+    return keys
+
+def project(model: any, query_params: QueryParams, default_fields: tuple[str, ...]) -> tuple[tuple[str, ...], list]:
+    # Returns the fields to output and the columns to select. Keyset columns a
+    # cursor page needs for its next cursor are selected after the requested
+    # ones, so zipping rows with the output fields drops them again.
+    if query_params.fields is None:
+        fields = default_fields
+    elif not query_params.fields:
+        raise InvalidQueryError("fields must name at least one column")
+    else:
+        fields = tuple(dict.fromkeys(query_params.fields))
+    columns = [get_column(model, field) for field in fields]
+    if _is_cursor_page(query_params):
+        columns += [get_column(model, field) for field, _ in _keyset_orders(query_params.sort) if field not in fields]
+    return fields, columns
+
+def encode_cursor(row: any, keys: list[tuple[str, bool]]) -> str:
+    values = []
+    for field, _ in keys:
+        value = getattr(row, field)
+        if isinstance(value, (date, datetime)):
+            value = value.isoformat()
+        values.append(value)
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode().rstrip("=")
+
+def decode_cursor(cursor: str, model: any, keys: list[tuple[str, bool]]) -> list:
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except ValueError:
+        raise InvalidQueryError("Malformed cursor")
+    if not isinstance(values, list) or len(values) != len(keys):
+        raise InvalidQueryError("Cursor does not match the requested sort order")
+
+    decoded = []
+    for (field, _), value in zip(keys, values):
+        column_type = get_column(model, field).type
+        try:
+            if value is not None and isinstance(column_type, DateTime):
+                value = datetime.fromisoformat(value)
+            elif value is not None and isinstance(column_type, Date):
+                value = date.fromisoformat(value)
+        except (TypeError, ValueError):
+            raise InvalidQueryError("Malformed cursor")
+        decoded.append(value)
+    return decoded
+
+def _seek_after(column: any, value: any, descending: bool):
+    # Mirrors the ordering in apply_keyset: NULLs first ascending, last descending
+    if descending:
+        return false() if value is None else or_(column < value, column.is_(None))
+    return column.is_not(None) if value is None else column > value
+
+def _seek_equal(column: any, value: any):
+    return column.is_(None) if value is None else column == value
+
+def apply_keyset(query: Query, model: any, sort_orders: Optional[list[SortOrder]], cursor: Optional[str]) -> Query:
+    keys = _keyset_orders(sort_orders)
+    columns = [get_column(model, field) for field, _ in keys]
+
+    if cursor:
+        values = decode_cursor(cursor, model, keys)
+        # Expand (k1, k2, ...) > (v1, v2, ...) so mixed sort directions still seek forward
+        branches = []
+        for i, (column, value, (_, descending)) in enumerate(zip(columns, values, keys)):
+            equal = [_seek_equal(columns[j], values[j]) for j in range(i)]
+            branches.append(and_(*equal, _seek_after(column, value, descending)))
+        leading, leading_value, (_, leading_desc) = columns[0], values[0], keys[0]
+        # Redundant bound on the leading key lets the database range-scan its index
+        if leading_value is not None and not leading_desc:
+            query = query.filter(leading >= leading_value)
+        query = query.filter(or_(*branches))
+
+    for column, (_, descending) in zip(columns, keys):
+        query = query.order_by(column.desc().nulls_last() if descending else column.asc().nulls_first())
+
+    return query
+
+# (table, filters) -> total. Only estimates are answered from here: a count from
+# this process can miss writes made by other workers or the CLI, so entries also
+# expire after the TTL.
+count_cache = LRUCache(maxsize=settings.count_cache_size, ttl=settings.count_cache_ttl or None)
+
+def _count_key(model: any, query_params: QueryParams) -> tuple:
+    filters = [filter_condition.model_dump(mode="json") for filter_condition in query_params.filters or []]
+    return model.__tablename__, json.dumps(filters, sort_keys=True, default=str)
+
+def cached_count(model: any, query_params: QueryParams) -> Optional[int]:
+    # An exact total always runs the COUNT
+    if query_params.total_mode != "estimate":
+        return None
+    return count_cache.get(_count_key(model, query_params))
+
+def store_count(model: any, query_params: QueryParams, total: int):
+    count_cache.set(_count_key(model, query_params), total)
+
+def _is_cursor_page(query_params: QueryParams) -> bool:
+    return query_params.pagination == "cursor" or query_params.cursor is not None
+
+def page_query(query: Query, model: any, query_params: QueryParams) -> Query:
+    # Works on ORM queries and select() statements alike
+    if not _is_cursor_page(query_params):
+        if query_params.sort:
+            query = apply_sorting(query, model, query_params.sort)
+        elif ranking := search_ordering(model, query_params.filters):
+            query = query.order_by(*ranking)
+        return query.offset(query_params.skip).limit(query_params.limit)
+
+    # One extra row tells us whether there is a next page
+    query = apply_keyset(query, model, query_params.sort, query_params.cursor)
+    return query.limit(query_params.limit + 1)
+
+def finish_page(items: list, model: any, query_params: QueryParams, fill: bool = True) -> tuple[list, Optional[int], Optional[str]]:
+    # Returns the page, its total when the page itself reveals it, and the next cursor.
+    # fill=False leaves the count cache alone (replica reads may lag the primary).
+    next_cursor = None
+    if not _is_cursor_page(query_params):
+        # A short page already tells us where the result set ends
+        is_last_page = len(items) < query_params.limit and (items or query_params.skip == 0)
+        known_total = query_params.skip + len(items) if is_last_page else None
+    else:
+        if len(items) > query_params.limit:
+            items = items[:query_params.limit]
+            next_cursor = encode_cursor(items[-1], _keyset_orders(query_params.sort))
+        known_total = len(items) if query_params.cursor is None and next_cursor is None else None
+
+    if query_params.total_mode == "none":
+        return items, None, next_cursor
+    if known_total is not None:
+        if fill:
+            store_count(model, query_params, known_total)
+        return items, known_total, next_cursor
+    return items, cached_count(model, query_params), next_cursor
+
+def paginate(query: Query, model: any, query_params: QueryParams) -> tuple[list, Optional[int], Optional[str]]:
+    fill = not served_by_replica(query.session)
+
+    items = page_query(query, model, query_params).all()
+    items, total, next_cursor = finish_page(items, model, query_params, fill)
+
+    if total is None and query_params.total_mode != "none":
+        total = query.count()
+        if fill:
+            store_count(model, query_params, total)
+
+    return items, total, next_cursor
+
+async def paginate_async(db: any, statement: Select, model: any, query_params: QueryParams) -> tuple[list, Optional[int], Optional[str]]:
+    # paginate() for an AsyncSession and a select() of model or of its columns
+    result = await db.execute(page_query(statement, model, query_params))
+    descriptions = statement.column_descriptions
+    selects_entity = len(descriptions) == 1 and descriptions[0]["expr"] is model
+    items = result.scalars().all() if selects_entity else result.all()
+    items, total, next_cursor = finish_page(items, model, query_params)
+
+    if total is None and query_params.total_mode != "none":
+        total = await db.scalar(select(func.count()).select_from(statement.order_by(None).subquery()))
+        store_count(model, query_params, total)
+
+    return items, total, next_cursor
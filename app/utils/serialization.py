@@ -0,0 +1,40 @@
+from typing import Iterable, Optional
+import orjson
+from fastapi import Response
+
+# Fast path for list endpoints: payloads are serialized once, straight to bytes,
+# instead of being validated into response models and then re-validated and
+# encoded by FastAPI's response_model handling.
+
+def json_response(content: bytes, response: Response) -> Response:
+    # Returning a Response skips FastAPI's merge of the injected one, so carry its headers (ETag) over
+    fast = Response(content, media_type="application/json")
+    fast.raw_headers.extend(response.raw_headers)
+    return fast
+
+def page_include(fields: Optional[list[str]]) -> Optional[dict]:
+    # model_dump include spec that trims PaginatedResponse items to a sparse fieldset
+    if fields is None:
+        return None
+    return {"items": {"__all__": set(fields)}, "total": True, "page": True, "size": True, "next_cursor": True}
+
+def dump_rows_page(
+    rows: Iterable[tuple],
+    columns: tuple[str, ...],
+    total: Optional[int],
+    page: int,
+    size: int,
+    next_cursor: Optional[str],
+) -> bytes:
+    # Same shape as PaginatedResponse; orjson handles dates and str enums natively
+    return orjson.dumps({
+        "items": [dict(zip(columns, row)) for row in rows],
+        "total": total,
+        "page": page,
+        "size": size,
+        "next_cursor": next_cursor,
+    })
+
+def dump_arrays(content: dict) -> bytes:
+    # For column-oriented payloads: NumPy arrays are written straight from their buffers
+    return orjson.dumps(content, option=orjson.OPT_SERIALIZE_NUMPY)
@@ -0,0 +1,125 @@
+import bisect
+import heapq
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from typing import Iterable
+
+# In-memory autocomplete over short names (store names), ranked by a weight such
+# as usage count. Prefix matches on the words of a name come first; when they do
+# not fill the page, names sharing enough trigrams with the query follow, which
+# tolerates typos. The index is immutable: rebuild it and swap the reference.
+
+# Prefixes up to this length match too many names to rank on every request, so
+# their top suggestions are precomputed
+SHORT_PREFIX = 2
+MAX_SHORT_RESULTS = 50
+# Minimum Dice similarity between trigram sets for a typo-tolerant match
+MIN_SIMILARITY = 0.4
+# Trigrams shared by more names than this are too common to find candidates with
+MAX_POSTINGS = 1000
+FUZZY_CANDIDATES = 5
+
+def normalize(text: str) -> str:
+    text = text.casefold()
+    if text.isascii():
+        return text
+    decomposed = unicodedata.normalize("NFKD", text)
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+def words(text: str) -> list[str]:
+    return re.findall(r"\w+", normalize(text))
+
+def padded(name_words: list[str]) -> str:
+    # Words padded so a trigram or " " + prefix test is a substring check
+    return f"  {' '.join(name_words)} "
+
+def trigrams(text: str) -> set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+class SuggestIndex:
+    def __init__(self, entries: Iterable[tuple[int, str, int]]):
+        # entries: (id, name, weight)
+        self.names = {}
+        self.weights = {}
+        self._texts = {}
+        self._gram_counts = {}
+        pairs = []
+        postings = defaultdict(list)
+        for entry_id, name, weight in entries:
+            name_words = words(name)
+            self.names[entry_id] = name
+            self.weights[entry_id] = weight
+            text = self._texts[entry_id] = padded(name_words)
+            pairs.extend((word, entry_id) for word in set(name_words))
+            grams = trigrams(text)
+            self._gram_counts[entry_id] = len(grams)
+            for gram in grams:
+                postings[gram].append(entry_id)
+        pairs.sort()
+        self._words = [word for word, _ in pairs]
+        self._word_ids = [entry_id for _, entry_id in pairs]
+        self._postings = dict(postings)
+
+        short = defaultdict(set)
+        for word, entry_id in pairs:
+            for length in range(1, min(SHORT_PREFIX, len(word)) + 1):
+                short[word[:length]].add(entry_id)
+        self._short = {prefix: self._ranked(ids)[:MAX_SHORT_RESULTS] for prefix, ids in short.items()}
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def _rank_key(self, entry_id: int) -> tuple:
+        return -self.weights[entry_id], self.names[entry_id]
+
+    def _ranked(self, ids: Iterable[int], limit: int = None) -> list[int]:
+        if limit is None:
+            return sorted(ids, key=self._rank_key)
+        return heapq.nsmallest(limit, ids, key=self._rank_key)
+
+    def _word_range(self, prefix: str) -> tuple[int, int]:
+        start = bisect.bisect_left(self._words, prefix)
+        return start, bisect.bisect_left(self._words, prefix + "￿", start)
+
+    def _prefix_matches(self, query_words: list[str], limit: int) -> list[int]:
+        if len(query_words) == 1 and len(query_words[0]) <= SHORT_PREFIX:
+            return self._short.get(query_words[0], [])[:limit]
+        # Candidates come from the most selective word; the rest are checked per name
+        ranges = sorted(((self._word_range(word), word) for word in query_words), key=lambda item: item[0][1] - item[0][0])
+        (start, end), _ = ranges[0]
+        others = [" " + word for _, word in ranges[1:]]
+        matches = {
+            entry_id for entry_id in self._word_ids[start:end]
+            if all(word in self._texts[entry_id] for word in others)
+        }
+        return self._ranked(matches, limit)
+
+    def _similar(self, query_words: list[str], exclude: set, limit: int) -> list[int]:
+        query = trigrams(padded(query_words))
+        shared = Counter()
+        for gram in query:
+            posting = self._postings.get(gram, ())
+            if len(posting) <= MAX_POSTINGS:
+                shared.update(posting)
+        scored = []
+        # Shared rare trigrams shortlist the candidates; similarity is then exact
+        for entry_id, _ in shared.most_common(limit * FUZZY_CANDIDATES + len(exclude)):
+            if entry_id in exclude:
+                continue
+            text = self._texts[entry_id]
+            shared_grams = sum(gram in text for gram in query)
+            similarity = 2 * shared_grams / (len(query) + self._gram_counts[entry_id])
+            if similarity >= MIN_SIMILARITY:
+                scored.append((-similarity, -self.weights[entry_id], self.names[entry_id], entry_id))
+        scored.sort()
+        return [entry_id for *_, entry_id in scored[:limit]]
+
+    def suggest(self, text: str, limit: int = 10) -> list[tuple[int, str, int]]:
+        query_words = words(text)
+        if not query_words:
+            return []
+        ids = self._prefix_matches(query_words, limit)
+        if len(ids) < limit and len("".join(query_words)) >= 3:
+            ids += self._similar(query_words, set(ids), limit - len(ids))
+        return [(entry_id, self.names[entry_id], self.weights[entry_id]) for entry_id in ids]
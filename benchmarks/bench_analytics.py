@@ -0,0 +1,87 @@
+"""Compare report latency from SQL with the NumPy analytics snapshot.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_analytics --rows 1000000 --categories 300
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date
+
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.crud import analytics, ledger
+from app.crud import report as report_crud
+from app.crud import transaction as transaction_crud
+from app.db.database import create_configured_engine
+from app.db.models import Base
+from app.schemas.query import AggregateParams, FilterCondition
+from app.utils.cache import response_cache
+from benchmarks.bench_timeseries import populate
+
+def timed(function, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        response_cache.clear()
+        function()
+    return (time.perf_counter() - started) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=300)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_configured_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows, args.categories, args.accounts)
+        db = sessionmaker(bind=engine)()
+        ledger.rebuild_monthly_spend(db)
+
+        started = time.perf_counter()
+        stats = analytics.snapshot.rebuild(db)
+        print(f"build {stats['rows']} rows: {time.perf_counter() - started:.2f}s, "
+              f"{stats['bytes'] / 1e6:.1f} MB ({stats['bytes'] / stats['rows']:.0f} bytes/row)")
+
+        by_account = [FilterCondition(field="account_id", operator="eq", value=1, data_type="number")]
+        cases = {
+            "aggregate category x year": lambda: transaction_crud.aggregate_transactions(
+                db, AggregateParams(group_by=["category_id", "year"], metrics=["sum", "count", "avg"])),
+            "aggregate one account by status": lambda: transaction_crud.aggregate_transactions(
+                db, AggregateParams(filters=by_account, group_by=["status"], metrics=["sum", "min", "max"])),
+            "timeseries 10y weekly x category": lambda: report_crud.get_timeseries(
+                db, date(2015, 1, 1), date(2024, 12, 31), "week", "category_id"),
+            "timeseries 10y daily": lambda: report_crud.get_timeseries(db, date(2015, 1, 1), date(2024, 12, 31), "day"),
+            "budget report": lambda: report_crud.get_budget_report(db, 2020, 6),
+        }
+        for label, function in cases.items():
+            settings.analytics_snapshot = False
+            before = timed(function, args.repeat)
+            settings.analytics_snapshot = True
+            after = timed(function, args.repeat)
+            print(f"{label:>34}: sql {before * 1000:8.1f} ms  snapshot {after * 1000:7.1f} ms  ({before / after:.0f}x)")
+
+        # Incremental upkeep, as applied after each commit. The first append grows
+        # the arrays, so it is timed separately from the steady state.
+        new_row = lambda offset: (args.rows + offset, date(2024, 1, 1), -5.0, 1, 1, None, "PENDING")
+        upkeep = {
+            "update 1 row": ([(1, date(2024, 1, 1), -5.0, 1, 1, None, "COMPLETED")], []),
+            "append 1 row (grows arrays)": ([new_row(1)], []),
+            "append 1 row": ([new_row(2)], []),
+            "append 1000 rows": ([new_row(3 + i) for i in range(1000)], []),
+            "delete 1 row": ([], [2]),
+        }
+        for label, (rows, deleted) in upkeep.items():
+            started = time.perf_counter()
+            analytics.snapshot.apply(rows, deleted)
+            print(f"{label:>34}: {(time.perf_counter() - started) * 1e6:8.0f} us")
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+"""Compare per-row transaction creation with the chunked bulk path.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_bulk_insert --rows 50000
+"""
+import argparse
+import os
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.transaction import create_transaction, create_transactions
+from app.db.models import Base
+from app.schemas.transaction import TransactionCreate
+
+def make_rows(count: int) -> list[dict]:
+    start = date(2024, 1, 1)
+    return [
+        {
+            "date": str(start + timedelta(days=i % 365)),
+            "amount": -float(i % 200),
+            "description": f"Card purchase {i}",
+            "account_id": 1,
+            "category_id": 1 + i % 10,
+        }
+        for i in range(count)
+    ]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20_000)
+    parser.add_argument("--single-rows", type=int, default=1_000, help="rows for the slower per-row baseline")
+    parser.add_argument("--chunk-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        session = sessionmaker(autocommit=False, autoflush=False, bind=engine)()
+
+        rows = make_rows(args.single_rows)
+        started = time.perf_counter()
+        for row in rows:
+            create_transaction(session, TransactionCreate(**row))
+        elapsed = time.perf_counter() - started
+        print(f"per-row create: {len(rows)} rows in {elapsed:.2f} s ({len(rows) / elapsed:,.0f} rows/s)")
+
+        rows = make_rows(args.rows)
+        started = time.perf_counter()
+        ids, errors = create_transactions(session, rows, chunk_size=args.chunk_size)
+        elapsed = time.perf_counter() - started
+        assert not errors and all(ids)
+        print(f"bulk create (chunks of {args.chunk_size}): {len(rows)} rows in {elapsed:.2f} s ({len(rows) / elapsed:,.0f} rows/s)")
+        session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""Compare sync and async /transactions/query latency under concurrent load.
+
+Run from the repository root (needs the async extra):
+
+    python -m benchmarks.bench_concurrency --rows 200000 --concurrency 50
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api.v1.endpoints import async_routes, transactions
+from app.db.database import get_async_db, get_db
+from app.db.models import Base
+from benchmarks.bench_date_filters import populate
+
+QUERY = {
+    "filters": [{"field": "date", "operator": "ge", "value": "2020-01-01", "data_type": "date"}],
+    "sort": [{"field": "date", "direction": "desc"}],
+    "limit": 50,
+}
+
+def build_apps(path: str) -> tuple[FastAPI, FastAPI]:
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    async_engine = create_async_engine(f"sqlite+aiosqlite:///{path}")
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+    def override_get_db():
+        try:
+            db = SessionLocal()
+            yield db
+        finally:
+            db.close()
+
+    async def override_get_async_db():
+        async with AsyncSessionLocal() as db:
+            yield db
+
+    sync_app = FastAPI()
+    sync_app.include_router(transactions.router, prefix="/api/v1/transactions")
+    sync_app.dependency_overrides[get_db] = override_get_db
+
+    async_app = FastAPI()
+    async_app.include_router(async_routes.router, prefix="/api/v1")
+    async_app.dependency_overrides[get_async_db] = override_get_async_db
+    return sync_app, async_app
+
+async def run(app: FastAPI, requests: int, concurrency: int) -> tuple[float, list[float]]:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.post("/api/v1/transactions/query", json=QUERY)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - started)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        return time.perf_counter() - started, latencies
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "bench.db")
+        engine = create_engine(f"sqlite:///{path}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows)
+
+        for name, app in zip(("sync", "async"), build_apps(path)):
+            elapsed, latencies = asyncio.run(run(app, args.requests, args.concurrency))
+            latencies.sort()
+            print(
+                f"{name:>5}: {args.requests / elapsed:8.1f} req/s  "
+                f"p50 {statistics.median(latencies) * 1000:7.1f} ms  "
+                f"p95 {latencies[int(len(latencies) * 0.95) - 1] * 1000:7.1f} ms"
+            )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""Compare the old func.date() date filters with the sargable range predicates.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_date_filters --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func
+from sqlalchemy.orm import sessionmaker
+
+from app.db.models import Base, Transaction
+from app.schemas.query import FilterCondition
+from app.utils.query import apply_filters
+
+def populate(engine, rows: int):
+    start = date(2015, 1, 1)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (date, amount, description, account_id, category_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (str(start + timedelta(days=random.randrange(3650))), round(random.uniform(-500, 500), 2), f"Row {i}", 1, 1, "COMPLETED")
+                for i in range(rows)
+            ],
+        )
+
+def timed(session, query, repeat: int) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        count = query.with_session(session).count()
+    return (time.perf_counter() - started) / repeat, count
+
+def plan(engine, query) -> str:
+    sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+    with engine.connect() as connection:
+        return "; ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=500_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows)
+        session = sessionmaker(bind=engine)()
+
+        day = date(2020, 6, 15)
+        cases = {
+            "eq": (
+                session.query(Transaction).filter(func.date(Transaction.date) == day),
+                apply_filters(session.query(Transaction), Transaction, [FilterCondition(field="date", operator="eq", value=str(day), data_type="date")]),
+            ),
+            "ne": (
+                session.query(Transaction).filter(func.date(Transaction.date) != day),
+                apply_filters(session.query(Transaction), Transaction, [FilterCondition(field="date", operator="ne", value=str(day), data_type="date")]),
+            ),
+        }
+
+        print(f"{args.rows} rows, mean of {args.repeat} runs")
+        for name, (before, after) in cases.items():
+            before_time, before_count = timed(session, before, args.repeat)
+            after_time, after_count = timed(session, after, args.repeat)
+            assert before_count == after_count
+            print(f"date {name}: before {before_time * 1000:.2f} ms, after {after_time * 1000:.2f} ms ({before_count} rows)")
+            print(f"  before plan: {plan(engine, before)}")
+            print(f"  after plan:  {plan(engine, after)}")
+        session.close()
+
+if __name__ == "__main__":
+    main()
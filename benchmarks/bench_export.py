@@ -0,0 +1,52 @@
+"""Measure streaming export throughput and peak memory.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_export --rows 5000000 --format csv
+"""
+import argparse
+import os
+import resource
+import tempfile
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.transaction import EXPORT_COLUMNS, stream_transactions
+from app.db.models import Base
+from app.schemas.query import QueryParams
+from app.utils.export import iter_csv, iter_ndjson
+from benchmarks.bench_date_filters import populate
+
+def peak_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows)
+        session = sessionmaker(bind=engine)()
+        serialize = iter_ndjson if args.format == "ndjson" else iter_csv
+
+        baseline = peak_rss_mb()
+        started = time.perf_counter()
+        written = 0
+        batches = stream_transactions(session, QueryParams(), batch_size=args.batch_size)
+        for chunk in serialize(batches, EXPORT_COLUMNS):
+            written += len(chunk)
+        elapsed = time.perf_counter() - started
+        session.close()
+
+        print(f"{args.rows} rows as {args.format}: {elapsed:.2f} s ({args.rows / elapsed:,.0f} rows/s, {written / 1e6:.1f} MB)")
+        print(f"peak RSS: {baseline:.0f} MB after populating, {peak_rss_mb():.0f} MB after export")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Measure partitioned Parquet/Arrow export, incremental re-export and mapped reads.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_parquet_export --rows 1000000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import pyarrow.dataset as ds
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.transaction import EXPORT_COLUMNS, stream_transactions, stream_transactions_by_date
+from app.db.models import Base
+from app.schemas.query import QueryParams
+from app.utils import columnar
+from app.utils.export import iter_ndjson
+from benchmarks.bench_date_filters import populate
+
+def directory_mb(path: str) -> float:
+    return sum(os.path.getsize(os.path.join(root, name)) for root, _, names in os.walk(path) for name in names) / 1e6
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows)
+        session = sessionmaker(bind=engine)()
+
+        started = time.perf_counter()
+        written = sum(len(chunk) for chunk in iter_ndjson(stream_transactions(session, QueryParams(), args.batch_size), EXPORT_COLUMNS))
+        print(f"{'ndjson stream':>30}: {time.perf_counter() - started:6.2f} s  {written / 1e6:6.1f} MB")
+        session.rollback()
+
+        def export(output: str, label: str, **options):
+            started = time.perf_counter()
+            columns, batches = stream_transactions_by_date(session, args.batch_size)
+            result = columnar.export_partitions(batches, columns, output, **options)
+            session.rollback()
+            print(f"{label:>30}: {time.perf_counter() - started:6.2f} s  {directory_mb(output):6.1f} MB  "
+                  f"({result['written']} of {result['partitions']} partitions written)")
+
+        for format in columnar.FORMATS:
+            output = os.path.join(directory, format)
+            export(output, f"{format} full", format=format)
+            export(output, f"{format} incremental, unchanged", format=format, incremental=True)
+            with engine.begin() as connection:
+                connection.exec_driver_sql("UPDATE transactions SET amount = amount + 1 WHERE id = 1")
+            export(output, f"{format} incremental, 1 update", format=format, incremental=True)
+
+            dataset = columnar.open_export(output)
+            started = time.perf_counter()
+            table = dataset.to_table()
+            print(f"{format + ' read all (mmap)':>30}: {(time.perf_counter() - started) * 1000:6.0f} ms  {table.num_rows} rows")
+            started = time.perf_counter()
+            table = dataset.to_table(filter=(ds.field("year") == 2020) & (ds.field("month") == 6))
+            print(f"{format + ' read one month':>30}: {(time.perf_counter() - started) * 1000:6.1f} ms  {table.num_rows} rows")
+        session.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+"""Compare substring LIKE filters with FTS5 search on transaction descriptions.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_search --rows 1000000
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud.transaction import get_transaction_rows
+from app.db.models import Base
+from app.schemas.query import FilterCondition, QueryParams
+
+WORDS = (
+    "coffee grocery rent amazon uber lunch dinner gas station pharmacy target walmart "
+    "netflix spotify gym parking insurance electric water internet bakery hardware books"
+).split()
+
+def populate(engine, rows: int):
+    start = date(2015, 1, 1)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (date, amount, description, account_id, category_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (str(start + timedelta(days=random.randrange(3650))), -round(random.uniform(1, 200), 2),
+                 f"{' '.join(random.choices(WORDS, k=3))} #{i}", 1, 1, "COMPLETED")
+                for i in range(rows)
+            ],
+        )
+
+def timed(db, query_params: QueryParams, repeat: int) -> tuple[float, int]:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        _, rows, total, _ = get_transaction_rows(db, query_params)
+    return (time.perf_counter() - started) / repeat, total
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        started = time.perf_counter()
+        populate(engine, args.rows)
+        print(f"insert {args.rows} rows (FTS triggers on): {time.perf_counter() - started:.1f}s")
+        db = sessionmaker(bind=engine)()
+
+        for text in ("netflix gym", "#123456", "bakery"):
+            like = QueryParams(limit=50, total_mode="none", filters=[
+                FilterCondition(field="description", operator="like", value=word, data_type="string") for word in text.split()
+            ])
+            fts = QueryParams(limit=50, total_mode="none", filters=[
+                FilterCondition(field="description", operator="match", value=text, data_type="search"),
+            ])
+            like_time, _ = timed(db, like, args.repeat)
+            fts_time, _ = timed(db, fts, args.repeat)
+            print(f"{text!r:>14}: like {like_time * 1000:8.2f} ms  search {fts_time * 1000:8.2f} ms (ranked)")
+        db.close()
+
+if __name__ == "__main__":
+    main()
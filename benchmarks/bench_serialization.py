@@ -0,0 +1,71 @@
+"""Compare /transactions/query page serialization: response_model vs row tuples.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_serialization --limit 1000
+"""
+import argparse
+import json
+import os
+import tempfile
+import time
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import transaction as transaction_crud
+from app.db.models import Base
+from app.schemas.query import PaginatedResponse, QueryParams
+from app.schemas.transaction import Transaction
+from app.utils.serialization import dump_rows_page
+from benchmarks.bench_date_filters import populate
+
+def response_model_path(items: list, adapter: TypeAdapter) -> bytes:
+    # What the endpoint used to do: build the page, let FastAPI validate it
+    # against response_model again, then encode it with the stdlib
+    page = PaginatedResponse(items=items, total=len(items), page=1, size=len(items))
+    validated = adapter.validate_python(page, from_attributes=True)
+    return json.dumps(jsonable_encoder(adapter.dump_python(validated, mode="json"))).encode()
+
+def rows_path(rows: list) -> bytes:
+    return dump_rows_page(rows, transaction_crud.TRANSACTION_FIELDS, total=len(rows), page=1, size=len(rows), next_cursor=None)
+
+def timed(function, argument, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        function(*argument)
+    return (time.perf_counter() - started) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.limit)
+        db = sessionmaker(bind=engine)()
+        query_params = QueryParams(limit=args.limit, total_mode="none")
+
+        items, _, _ = transaction_crud.get_transactions(db, query_params)
+        _, rows, _, _ = transaction_crud.get_transaction_rows(db, query_params)
+        adapter = TypeAdapter(PaginatedResponse[Transaction])
+        assert json.loads(response_model_path(items, adapter))["items"] == json.loads(rows_path(rows))["items"]
+
+        before = timed(response_model_path, (items, adapter), args.repeat)
+        after = timed(rows_path, (rows,), args.repeat)
+        print(f"response_model: {before * 1000:8.2f} ms/page")
+        print(f"    row tuples: {after * 1000:8.2f} ms/page  ({before / after:.1f}x)")
+
+        # End to end, including the query itself
+        before = timed(lambda: response_model_path(transaction_crud.get_transactions(db, query_params)[0], adapter), (), args.repeat)
+        after = timed(lambda: rows_path(transaction_crud.get_transaction_rows(db, query_params)[1]), (), args.repeat)
+        print(f"with query:     {before * 1000:8.2f} ms -> {after * 1000:8.2f} ms  ({before / after:.1f}x)")
+        db.close()
+
+if __name__ == "__main__":
+    main()
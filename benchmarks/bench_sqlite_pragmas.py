@@ -0,0 +1,100 @@
+"""Measure SQLite write and read throughput under different PRAGMA profiles.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_sqlite_pragmas --rows 200000 --threads 8
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+from datetime import date, timedelta
+
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import apply_sqlite_pragmas, engine_options
+from app.db.models import Base, Transaction
+from benchmarks.bench_date_filters import populate
+
+PROFILES = {
+    # SQLite's own defaults: rollback journal, fsync on every commit, no lock wait
+    "default": {},
+    "wal": {"journal_mode": "WAL", "synchronous": "NORMAL"},
+    "wal+busy": {"journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000},
+    "tuned": {
+        "journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": 5000,
+        "mmap_size": 268435456, "cache_size": -64000, "temp_store": "MEMORY",
+    },
+}
+
+def concurrent_writes(SessionLocal, threads: int, per_thread: int) -> tuple[float, int]:
+    # Each thread commits one row at a time, like independent API requests
+    locked = []
+
+    def writer(offset: int):
+        for i in range(per_thread):
+            with SessionLocal() as db:
+                db.add(Transaction(date=date(2024, 1, 1), amount=-1.0, description=f"Write {offset}-{i}", account_id=1, category_id=1))
+                try:
+                    db.commit()
+                except OperationalError:
+                    db.rollback()
+                    locked.append(1)
+
+    workers = [threading.Thread(target=writer, args=(n,)) for n in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started, len(locked)
+
+def concurrent_reads(SessionLocal, threads: int, per_thread: int) -> float:
+    def reader():
+        for i in range(per_thread):
+            start = date(2015, 1, 1) + timedelta(days=(i * 37) % 3000)
+            with SessionLocal() as db:
+                db.execute(
+                    select(func.count(), func.sum(Transaction.amount))
+                    .where(Transaction.date >= start, Transaction.date < start + timedelta(days=90))
+                ).one()
+
+    workers = [threading.Thread(target=reader) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return time.perf_counter() - started
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200_000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--writes", type=int, default=200, help="commits per thread")
+    parser.add_argument("--reads", type=int, default=50, help="queries per thread")
+    args = parser.parse_args()
+
+    for name, pragmas in PROFILES.items():
+        with tempfile.TemporaryDirectory() as directory:
+            url = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+            engine = create_engine(url, connect_args={"check_same_thread": False}, **engine_options(url))
+            apply_sqlite_pragmas(engine, pragmas)
+            Base.metadata.create_all(bind=engine)
+            populate(engine, args.rows)
+            SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+            elapsed, locked = concurrent_writes(SessionLocal, args.threads, args.writes)
+            writes = args.threads * args.writes - locked
+            read_elapsed = concurrent_reads(SessionLocal, args.threads, args.reads)
+            print(
+                f"{name:>9}: writes {writes / elapsed:9.1f}/s ({locked} locked)  "
+                f"reads {args.threads * args.reads / read_elapsed:8.1f}/s"
+            )
+            engine.dispose()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""Measure store autocomplete build time and lookup latency.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_store_suggest --stores 50000
+"""
+import argparse
+import random
+import statistics
+import string
+import threading
+import time
+
+from app.utils.suggest import SuggestIndex
+
+PREFIXES = ["Green", "Blue", "Corner", "City", "Main Street", "Golden", "Lucky", "Sunset", "Harbor", "Village"]
+KINDS = ["Market", "Cafe", "Bakery", "Pharmacy", "Hardware", "Books", "Grill", "Deli", "Florist", "Liquors"]
+
+def store_names(count: int) -> list[str]:
+    names = set()
+    while len(names) < count:
+        suffix = "".join(random.choices(string.ascii_lowercase, k=random.randint(4, 8))).title()
+        names.add(f"{random.choice(PREFIXES)} {suffix} {random.choice(KINDS)}")
+    return sorted(names)
+
+def typo(word: str) -> str:
+    i = random.randrange(len(word) - 1)
+    return word[:i] + word[i + 1] + word[i] + word[i + 2:]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--stores", type=int, default=50_000)
+    parser.add_argument("--lookups", type=int, default=2000)
+    args = parser.parse_args()
+
+    names = store_names(args.stores)
+    entries = [(i, name, int(random.paretovariate(1.2))) for i, name in enumerate(names)]
+
+    started = time.perf_counter()
+    index = SuggestIndex(entries)
+    print(f"build {len(index)} stores: {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    samples = random.choices(names, k=args.lookups)
+    workloads = {
+        "1-char prefix": [name[:1] for name in samples],
+        "3-char prefix": [name.split()[-2][:3] for name in samples],
+        "two words": [" ".join(word[:4] for word in name.split()[:2]) for name in samples],
+        "typo": [typo(name.split()[-2]) for name in samples],
+    }
+    for label, queries in workloads.items():
+        timings = []
+        for query in queries:
+            started = time.perf_counter()
+            index.suggest(query, 10)
+            timings.append(time.perf_counter() - started)
+        timings.sort()
+        print(
+            f"{label:>14}: p50 {statistics.median(timings) * 1e6:7.1f} us  "
+            f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.1f} us"
+        )
+
+    # Lookups keep using the old index while StoreSuggestions builds the next one in
+    # a background thread; they only share the interpreter lock with the build
+    builder = threading.Thread(target=SuggestIndex, args=(entries,))
+    builder.start()
+    timings = []
+    while builder.is_alive():
+        started = time.perf_counter()
+        index.suggest(random.choice(workloads["3-char prefix"]), 10)
+        timings.append(time.perf_counter() - started)
+        time.sleep(0.001)
+    timings.sort()
+    print(
+        f"{'during rebuild':>14}: p50 {statistics.median(timings) * 1e6:7.1f} us  "
+        f"p99 {timings[int(len(timings) * 0.99)] * 1e6:7.1f} us"
+    )
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""Measure /reports/timeseries over multi-year ranges with hundreds of series.
+
+Run from the repository root:
+
+    python -m benchmarks.bench_timeseries --rows 1000000 --categories 300
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+from datetime import date, timedelta
+
+import orjson
+from sqlalchemy.orm import sessionmaker
+
+from app.crud import ledger
+from app.crud.report import _timeseries
+from app.db.database import create_configured_engine
+from app.db.models import Base
+
+def populate(engine, rows: int, categories: int, accounts: int):
+    start = date(2015, 1, 1)
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (date, amount, description, account_id, category_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+            [
+                (str(start + timedelta(days=random.randrange(3650))), -round(random.uniform(1, 200), 2), f"Row {i}",
+                 random.randint(1, accounts), random.randint(1, categories), "COMPLETED")
+                for i in range(rows)
+            ],
+        )
+
+def timed(function, repeat: int) -> float:
+    started = time.perf_counter()
+    for _ in range(repeat):
+        content = function()
+    return (time.perf_counter() - started) / repeat, content
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--categories", type=int, default=300)
+    parser.add_argument("--accounts", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_configured_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        Base.metadata.create_all(bind=engine)
+        populate(engine, args.rows, args.categories, args.accounts)
+        db = sessionmaker(bind=engine)()
+        ledger.rebuild_monthly_spend(db)
+        db.commit()
+
+        cases = [
+            ("month", "category_id"),
+            ("week", "category_id"),
+            ("month", "account_id"),
+            ("day", None),
+        ]
+        # Uncached: _timeseries is what a response cache miss runs
+        for years in (1, 10):
+            start, end = date(2025 - years, 1, 1), date(2024, 12, 31)
+            for interval, group_by in cases:
+                seconds, content = timed(lambda: _timeseries(db, interval, group_by, start, end, None, None), args.repeat)
+                data = orjson.loads(content)
+                points = len(data["buckets"]) * len(data["series"])
+                print(
+                    f"{years:>2}y {interval:>5} by {group_by or '-':<11}: {seconds * 1000:8.1f} ms  "
+                    f"{points:>7} points  {len(content) / 1e6:5.1f} MB"
+                )
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,9 @@
+import time
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.core.config import settings
 from app.db.database import get_db
 from app.db.models import Base
 from app.schemas.query import QueryParams, FilterCondition, SortOrder
@@ -117,6 +119,43 @@ def test_read_category():
     data = response.json()
     assert data["name"] == "Test Category 2"
 
+
+def test_conditional_get_category():
+    category = client.post("/api/v1/categories/", json={"name": "ETag Category", "type": "expense", "monthly_budget": 10.0}).json()
+
+    response = client.get(f"/api/v1/categories/{category['id']}")
+    etag = response.headers["etag"]
+    response = client.get(f"/api/v1/categories/{category['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.content == b""
+
+    # /query tags depend on the query body as well
+    query = {"filters": [{"field": "name", "operator": "eq", "value": "ETag Category", "data_type": "string"}]}
+    query_etag = client.post("/api/v1/categories/query", json=query).headers["etag"]
+    assert query_etag != etag
+    assert client.post("/api/v1/categories/query", json=query, headers={"If-None-Match": query_etag}).status_code == 304
+
+    client.put(f"/api/v1/categories/{category['id']}", json={"monthly_budget": 20.0})
+    response = client.get(f"/api/v1/categories/{category['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["monthly_budget"] == 20.0
+    assert response.headers["etag"] != etag
+    assert client.post("/api/v1/categories/query", json=query, headers={"If-None-Match": query_etag}).status_code == 200
+
+
+def test_etag_expires_after_ttl(monkeypatch):
+    # Another process's writes bump no generation here, so tags also age out
+    category = client.post("/api/v1/categories/", json={"name": "ETag TTL Category", "type": "expense", "monthly_budget": 10.0}).json()
+    etag = client.get(f"/api/v1/categories/{category['id']}").headers["etag"]
+    assert client.get(f"/api/v1/categories/{category['id']}", headers={"If-None-Match": etag}).status_code == 304
+
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + settings.etag_ttl)
+    response = client.get(f"/api/v1/categories/{category['id']}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
 def test_update_category():
     # First, create a category
     create_response = client.post(
@@ -149,4 +188,4 @@ def test_delete_category():
     
     # Try to get the deleted category
     get_response = client.get(f"/api/v1/categories/{create_data['id']}")
-    assert get_response.status_code == 404
\ No newline at end of file
+    assert get_response.status_code == 404
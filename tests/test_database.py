@@ -0,0 +1,22 @@
+from sqlalchemy import create_engine
+from app.db.database import apply_sqlite_pragmas, engine_options, sqlite_pragmas
+
+def test_engine_options():
+    options = engine_options("sqlite:///./test.db")
+    assert {"pool_size", "max_overflow", "pool_timeout", "pool_pre_ping", "pool_recycle"} <= options.keys()
+
+    # In-memory SQLite uses a per-thread pool that does not take sizing arguments
+    options = engine_options("sqlite://")
+    assert "pool_size" not in options
+    create_engine("sqlite://", **options).dispose()
+
+def test_sqlite_pragmas_applied_on_connect(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'pragmas.db'}", **engine_options("sqlite:///pragmas.db"))
+    apply_sqlite_pragmas(engine, {**sqlite_pragmas(), "journal_mode": "WAL", "synchronous": "NORMAL", "busy_timeout": "1234"})
+
+    with engine.connect() as connection:
+        assert connection.exec_driver_sql("PRAGMA journal_mode").scalar() == "wal"
+        # NORMAL is reported as 1
+        assert connection.exec_driver_sql("PRAGMA synchronous").scalar() == 1
+        assert connection.exec_driver_sql("PRAGMA busy_timeout").scalar() == 1234
+    engine.dispose()
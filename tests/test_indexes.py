@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.db.models import Base, Transaction
+from app.schemas.query import FilterCondition
+from app.utils.query import apply_filters
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+date_range = [
+    FilterCondition(field="date", operator="gt", value="2024-01-01", data_type="date"),
+    FilterCondition(field="date", operator="lt", value="2024-02-01", data_type="date"),
+]
+
+FILTER_SHAPES = {
+    "account_date_range": [
+        FilterCondition(field="account_id", operator="eq", value=1, data_type="number"),
+        *date_range,
+    ],
+    "category_date_range": [
+        FilterCondition(field="category_id", operator="eq", value=1, data_type="number"),
+        FilterCondition(field="date", operator="gt", value="2024-01-01", data_type="date"),
+    ],
+    "pending": [
+        FilterCondition(field="status", operator="eq", value="PENDING", data_type="enum"),
+    ],
+    "store": [
+        FilterCondition(field="store_id", operator="eq", value=1, data_type="number"),
+    ],
+    "date_range": date_range,
+    "date_between": [
+        FilterCondition(field="date", operator="between", value={"start": "2024-01-01", "end": "2024-01-31"}, data_type="date"),
+    ],
+    "date_eq": [
+        FilterCondition(field="date", operator="eq", value="2024-01-15", data_type="date"),
+    ],
+}
+
+def query_plan(filters):
+    db = TestingSessionLocal()
+    try:
+        query = apply_filters(db.query(Transaction), Transaction, filters)
+        sql = str(query.statement.compile(engine, compile_kwargs={"literal_binds": True}))
+        with engine.connect() as connection:
+            return [row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}")]
+    finally:
+        db.close()
+
+@pytest.mark.parametrize("shape", FILTER_SHAPES)
+def test_filter_shape_uses_index(shape):
+    plan = query_plan(FILTER_SHAPES[shape])
+    assert any("USING INDEX" in step or "USING COVERING INDEX" in step for step in plan), plan
@@ -1,5 +1,5 @@
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from app.main import app
 from app.db.database import get_db
@@ -128,4 +128,243 @@ def test_pagination():
     assert data["page"] == 2
     assert data["size"] == 1
 
-# Add more complex query tests as needed
\ No newline at end of file
+
+def test_cursor_pagination():
+    # Walk every transaction one row at a time and compare with a single offset page
+    sort = [SortOrder(field="amount", direction="desc")]
+    expected = client.post("/api/v1/transactions/query", json=QueryParams(sort=sort).model_dump()).json()["items"]
+
+    seen = []
+    query_params = QueryParams(sort=sort, limit=1, pagination="cursor")
+    while True:
+        response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(data["items"])
+        if data["next_cursor"] is None:
+            break
+        query_params = QueryParams(sort=sort, limit=1, cursor=data["next_cursor"])
+
+    assert [transaction["id"] for transaction in seen] == [transaction["id"] for transaction in expected]
+
+def test_cursor_pagination_with_date_sort():
+    query_params = QueryParams(sort=[SortOrder(field="date", direction="asc")], limit=2, pagination="cursor")
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    first_page = response.json()
+    assert len(first_page["items"]) == 2
+    assert first_page["next_cursor"] is not None
+
+    query_params = QueryParams(sort=[SortOrder(field="date", direction="asc")], limit=2, cursor=first_page["next_cursor"])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    second_page = response.json()
+    assert len(second_page["items"]) == 1
+    assert second_page["next_cursor"] is None
+    assert second_page["items"][0]["date"] >= first_page["items"][-1]["date"]
+
+def test_invalid_cursor():
+    query_params = QueryParams(cursor="not-a-cursor")
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 400
+
+def test_invalid_pagination_mode():
+    response = client.post("/api/v1/transactions/query", json={"pagination": "cursr"})
+    assert response.status_code == 422
+
+def test_total_modes():
+    filters = [FilterCondition(field="amount", operator="gt", value=75, data_type="number")]
+
+    # limit=1 leaves rows beyond the page so the total has to come from a count
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1).model_dump())
+    assert response.json()["total"] == 2
+
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1, total_mode="none").model_dump())
+    data = response.json()
+    assert data["total"] is None
+    assert len(data["items"]) == 1
+
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1, total_mode="estimate").model_dump())
+    assert response.json()["total"] == 2
+
+    # Exact totals see every write
+    existing = response.json()["items"][0]
+    created = client.post("/api/v1/transactions/", json={
+        "date": str(date.today()),
+        "amount": 500.0,
+        "description": "Count cache check",
+        "account_id": existing["account_id"],
+        "category_id": existing["category_id"],
+    }).json()
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1).model_dump())
+    assert response.json()["total"] == 3
+
+    client.delete(f"/api/v1/transactions/{created['id']}")
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1).model_dump())
+    assert response.json()["total"] == 2
+
+    # Including one made outside this process's sessions, as by another worker
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1, total_mode="estimate").model_dump())
+    assert response.json()["total"] == 2
+    with engine.begin() as connection:
+        connection.exec_driver_sql(
+            "INSERT INTO transactions (date, amount, description, account_id, category_id, status) VALUES (?, ?, ?, ?, ?, ?)",
+            (str(date.today()), 500.0, "Other worker", existing["account_id"], existing["category_id"], "PENDING"),
+        )
+    response = client.post("/api/v1/transactions/query", json=QueryParams(filters=filters, limit=1).model_dump())
+    assert response.json()["total"] == 3
+    with engine.begin() as connection:
+        connection.exec_driver_sql("DELETE FROM transactions WHERE description = 'Other worker'")
+
+    response = client.post("/api/v1/transactions/query", json={"total_mode": "exactly"})
+    assert response.status_code == 422
+
+def test_date_filter_operators():
+    def query_dates(operator, value):
+        query_params = QueryParams(filters=[FilterCondition(field="date", operator=operator, value=value, data_type="date")])
+        response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+        assert response.status_code == 200
+        return sorted(transaction["date"] for transaction in response.json()["items"])
+
+    five_days_ago = str(date.today() - timedelta(days=5))
+    three_days_ago = str(date.today() - timedelta(days=3))
+    yesterday = str(date.today() - timedelta(days=1))
+
+    assert query_dates("eq", three_days_ago) == [three_days_ago]
+    assert query_dates("ne", three_days_ago) == [five_days_ago, yesterday]
+    assert query_dates("ge", three_days_ago) == [three_days_ago, yesterday]
+    assert query_dates("le", three_days_ago) == [five_days_ago, three_days_ago]
+    assert query_dates("gt", three_days_ago) == [yesterday]
+    assert query_dates("lt", three_days_ago) == [five_days_ago]
+    assert query_dates("between", {"start": five_days_ago, "end": three_days_ago}) == [five_days_ago, three_days_ago]
+
+def test_invalid_date_filter():
+    query_params = QueryParams(filters=[FilterCondition(field="date", operator="eq", value="not a date", data_type="date")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 400
+
+def test_filter_plan_is_reused_across_values():
+    from app.db.models import Transaction
+    from app.utils.query import apply_filters
+
+    db = TestingSessionLocal()
+    try:
+        first = apply_filters(db.query(Transaction), Transaction, [FilterCondition(field="amount", operator="gt", value=75, data_type="number")])
+        second = apply_filters(db.query(Transaction), Transaction, [FilterCondition(field="amount", operator="gt", value=2000, data_type="number")])
+        assert str(first.statement) == str(second.statement)
+        assert first.count() == 2
+        assert second.count() == 1
+    finally:
+        db.close()
+
+def test_like_filter_treats_wildcards_literally():
+    query_params = QueryParams(filters=[FilterCondition(field="description", operator="like", value="%", data_type="string")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+
+    query_params = QueryParams(filters=[FilterCondition(field="description", operator="ilike", value="SALARY", data_type="string")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert [transaction["description"] for transaction in response.json()["items"]] == ["Monthly salary"]
+
+def test_unknown_filter_field_or_operator():
+    query_params = QueryParams(filters=[FilterCondition(field="not_a_column", operator="eq", value=1, data_type="number")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 400
+
+    query_params = QueryParams(filters=[FilterCondition(field="amount", operator="like", value=1, data_type="number")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 400
+
+    query_params = QueryParams(sort=[SortOrder(field="account")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 400
+
+def test_sparse_fieldsets():
+    query_params = QueryParams(fields=["date", "amount"], sort=[SortOrder(field="amount", direction="desc")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert items
+    assert all(set(item) == {"date", "amount"} for item in items)
+
+    # Keyset columns are selected for the cursor but not returned
+    query_params = QueryParams(fields=["amount"], sort=[SortOrder(field="date")], limit=2, pagination="cursor")
+    first_page = client.post("/api/v1/transactions/query", json=query_params.model_dump()).json()
+    assert [set(item) for item in first_page["items"]] == [{"amount"}, {"amount"}]
+    query_params = QueryParams(fields=["amount"], sort=[SortOrder(field="date")], limit=2, cursor=first_page["next_cursor"])
+    assert client.post("/api/v1/transactions/query", json=query_params.model_dump()).status_code == 200
+
+    response = client.post("/api/v1/accounts/query", json=QueryParams(fields=["name"]).model_dump())
+    assert response.status_code == 200
+    assert all(set(item) == {"name"} for item in response.json()["items"])
+
+def test_invalid_sparse_fieldsets():
+    for fields in (["not_a_column"], []):
+        query_params = QueryParams(fields=fields)
+        assert client.post("/api/v1/transactions/query", json=query_params.model_dump()).status_code == 400
+        assert client.post("/api/v1/categories/query", json=query_params.model_dump()).status_code == 400
+
+def test_full_text_search():
+    account = client.post("/api/v1/accounts/", json={"name": "Search Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Search Category", "type": "expense", "monthly_budget": 0.0}).json()
+    descriptions = ["Zephyr coffee beans from the corner shop downtown", "Zephyr coffee", "Weekly groceries", "50% off [zephyr] \"deal\""]
+    created = [
+        client.post("/api/v1/transactions/", json={
+            "date": "2023-05-01", "amount": -1.0, "description": description,
+            "account_id": account["id"], "category_id": category["id"],
+        }).json()
+        for description in descriptions
+    ]
+
+    def search(text, **params):
+        query_params = QueryParams(filters=[FilterCondition(field="description", operator="match", value=text, data_type="search")], **params)
+        return client.post("/api/v1/transactions/query", json=query_params.model_dump())
+
+    response = search("zephyr coffee")
+    assert response.status_code == 200
+    items = response.json()["items"]
+    # Best match first: bm25 favours the shorter description
+    assert [item["id"] for item in items] == [created[1]["id"], created[0]["id"]]
+    assert response.json()["total"] == 2
+
+    # The last word matches as a prefix and query syntax in user text is literal
+    assert {item["id"] for item in search("Zeph").json()["items"]} == {created[0]["id"], created[1]["id"], created[3]["id"]}
+    assert [item["id"] for item in search('"deal" OR').json()["items"]] == []
+    assert [item["id"] for item in search('[zephyr] "deal"').json()["items"]] == [created[3]["id"]]
+
+    # Triggers keep the index in sync with updates and deletes
+    client.put(f"/api/v1/transactions/{created[2]['id']}", json={"description": "Zephyr coffee grinder"})
+    client.delete(f"/api/v1/transactions/{created[0]['id']}")
+    assert {item["id"] for item in search("coffee", sort=[SortOrder(field="id")]).json()["items"]} == {created[1]["id"], created[2]["id"]}
+
+    client.post("/api/v1/stores/", json={"name": "Zephyr Roasters"})
+    response = client.post("/api/v1/stores/query", json=QueryParams(
+        filters=[FilterCondition(field="name", operator="match", value="roast", data_type="search")],
+    ).model_dump())
+    assert [store["name"] for store in response.json()["items"]] == ["Zephyr Roasters"]
+
+def test_bulk_inserts_are_searchable():
+    account = client.post("/api/v1/accounts/", json={"name": "Bulk Search Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Bulk Search Category", "type": "expense", "monthly_budget": 0.0}).json()
+    row = lambda description: {
+        "date": "2023-06-01", "amount": -1.0, "description": description, "account_id": account["id"], "category_id": category["id"],
+    }
+    ids = client.post("/api/v1/transactions/bulk", params={"chunk_size": 2}, json=[
+        row(f"Quokka bulk {i}") for i in range(5)
+    ]).json()["ids"]
+    # The insert trigger runs again once the bulk insert is over
+    ids.append(client.post("/api/v1/transactions/", json=row("Quokka single")).json()["id"])
+
+    query_params = QueryParams(filters=[FilterCondition(field="description", operator="match", value="quokka", data_type="search")])
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert sorted(item["id"] for item in response.json()["items"]) == ids
+    with engine.begin() as connection:
+        assert connection.execute(text("SELECT count(*) FROM search_index_paused")).scalar() == 0
+        # Each row indexed exactly once
+        connection.execute(text("INSERT INTO transactions_fts(transactions_fts, rank) VALUES ('integrity-check', 1)"))
+
+def test_invalid_search_filters():
+    for field, operator, value in [("amount", "match", "x"), ("description", "eq", "x"), ("description", "match", "!!")]:
+        query_params = QueryParams(filters=[FilterCondition(field=field, operator=operator, value=value, data_type="search")])
+        assert client.post("/api/v1/transactions/query", json=query_params.model_dump()).status_code == 400
+
+# Add more complex query tests as needed
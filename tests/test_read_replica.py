@@ -0,0 +1,75 @@
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.api.v1.endpoints import accounts
+from app.db import database
+from app.db.database import STICKY_COOKIE, RoutingSession
+from app.db.models import Base
+from app.utils.cache import response_cache
+
+# The "replica" is a separate SQLite file that never receives the primary's
+# writes, so which engine served a read is visible in the response.
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    primary = create_engine(f"sqlite:///{tmp_path / 'primary.db'}", connect_args={"check_same_thread": False})
+    replica = create_engine(f"sqlite:///{tmp_path / 'replica.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(bind=primary)
+    Base.metadata.create_all(bind=replica)
+    monkeypatch.setattr(database, "SessionLocal", sessionmaker(
+        class_=RoutingSession, autocommit=False, autoflush=False, bind=primary, replica=replica,
+    ))
+
+    app = FastAPI()
+    app.include_router(accounts.router, prefix="/api/v1/accounts")
+    response_cache.clear()
+    yield TestClient(app)
+    primary.dispose()
+    replica.dispose()
+
+def test_writes_go_to_primary_and_stick(client, monkeypatch):
+    # Without the response cache, so every read shows the engine that served it
+    monkeypatch.setattr(response_cache, "enabled", False)
+    response = client.post("/api/v1/accounts/", json={"name": "Replica Account", "type": "checking", "balance": 1.0})
+    assert response.status_code == 200
+    assert STICKY_COOKIE in response.cookies
+    account_id = response.json()["id"]
+
+    # Read-your-writes: the cookie keeps this client's reads on the primary
+    assert client.get(f"/api/v1/accounts/{account_id}").status_code == 200
+
+    # Without it, reads are served by the replica, which has not seen the write
+    client.cookies.clear()
+    assert client.get(f"/api/v1/accounts/{account_id}").status_code == 404
+    response = client.post("/api/v1/accounts/query", json={"total_mode": "none"})
+    assert response.status_code == 200
+    assert response.json()["items"] == []
+    assert STICKY_COOKIE not in response.cookies
+
+def test_expired_sticky_cookie_uses_replica(client, monkeypatch):
+    monkeypatch.setattr(response_cache, "enabled", False)
+    account_id = client.post("/api/v1/accounts/", json={"name": "Replica Account", "type": "checking", "balance": 1.0}).json()["id"]
+    client.cookies.set(STICKY_COOKIE, "0")
+    assert client.get(f"/api/v1/accounts/{account_id}").status_code == 404
+
+def test_replica_reads_do_not_fill_caches(client):
+    account_id = client.post("/api/v1/accounts/", json={"name": "Replica Account", "type": "checking", "balance": 1.0}).json()["id"]
+
+    # Another client reads before the replica has caught up with the write. Its
+    # answer is stale, so it is neither cached nor tagged with the new generation.
+    reader = TestClient(client.app)
+    response = reader.get(f"/api/v1/accounts/{account_id}")
+    assert response.status_code == 404
+    response = reader.post("/api/v1/accounts/query", json={})
+    assert response.json()["items"] == [] and "etag" not in response.headers
+
+    # The writer is still served the primary's rows, with a tag
+    response = client.get(f"/api/v1/accounts/{account_id}")
+    assert response.status_code == 200 and "etag" in response.headers
+    response = client.post("/api/v1/accounts/query", json={})
+    assert response.json()["total"] == 1
+
+    # Entries filled from the primary are current, so replica requests may use them
+    assert reader.get(f"/api/v1/accounts/{account_id}").status_code == 200
@@ -0,0 +1,120 @@
+import time
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.models import Base
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+def create_transaction(account, category, day, amount):
+    return client.post("/api/v1/transactions/", json={
+        "date": day, "amount": amount, "description": "Report", "account_id": account["id"], "category_id": category["id"],
+    }).json()
+
+def test_budget_report():
+    account = client.post("/api/v1/accounts/", json={"name": "Report Account", "type": "checking", "balance": 0.0}).json()
+    rent = client.post("/api/v1/categories/", json={"name": "Report Rent", "type": "expense", "monthly_budget": 900.0}).json()
+    fun = client.post("/api/v1/categories/", json={"name": "Report Fun", "type": "expense", "monthly_budget": 50.0}).json()
+
+    client.post("/api/v1/budget_allocations/", json={"year": 2022, "month": 6, "amount": 1000.0, "category_id": rent["id"]})
+    client.post("/api/v1/budget_allocations/", json={"year": 2022, "month": 6, "amount": 60.0, "category_id": fun["id"]})
+    client.post("/api/v1/budget_allocations/", json={"year": 2022, "month": 7, "amount": 5.0, "category_id": fun["id"]})
+    create_transaction(account, rent, "2022-06-01", -950.0)
+    create_transaction(account, fun, "2022-06-10", -20.0)
+    create_transaction(account, fun, "2022-06-11", -15.0)
+    create_transaction(account, fun, "2022-07-01", -99.0)
+
+    response = client.get("/api/v1/reports/budget", params={"year": 2022, "month": 6})
+    assert response.status_code == 200
+    lines = {line["category_id"]: line for line in response.json()["categories"]}
+    assert lines[rent["id"]] == {
+        "category_id": rent["id"], "name": "Report Rent", "type": "expense", "monthly_budget": 900.0,
+        "allocated": 1000.0, "spent": 950.0, "remaining": 50.0, "transaction_count": 1,
+    }
+    assert lines[fun["id"]]["allocated"] == 60.0
+    assert lines[fun["id"]]["spent"] == 35.0
+    assert lines[fun["id"]]["remaining"] == 25.0
+
+    # Writes to either table invalidate the cached report
+    create_transaction(account, fun, "2022-06-20", -5.0)
+    lines = {line["category_id"]: line for line in client.get("/api/v1/reports/budget", params={"year": 2022, "month": 6}).json()["categories"]}
+    assert lines[fun["id"]]["spent"] == 40.0
+
+    client.post("/api/v1/budget_allocations/", json={"year": 2022, "month": 6, "amount": 10.0, "category_id": fun["id"]})
+    lines = {line["category_id"]: line for line in client.get("/api/v1/reports/budget", params={"year": 2022, "month": 6}).json()["categories"]}
+    assert lines[fun["id"]]["allocated"] == 70.0
+    assert lines[fun["id"]]["remaining"] == 30.0
+
+def test_budget_report_expires_from_response_cache(monkeypatch):
+    params = {"year": 2022, "month": 6}
+    report = client.get("/api/v1/reports/budget", params=params).json()
+    before = client.get("/metrics/cache").json()
+    assert client.get("/api/v1/reports/budget", params=params).json() == report
+    assert client.get("/metrics/cache").json()["hits"] == before["hits"] + 1
+
+    # A rollup rebuild in another process bumps no generation here, so the
+    # cached report is only replaced once the response cache TTL runs out
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE category_monthly_spend SET total = total - 1 WHERE year = 2022 AND month = 6")
+    assert client.get("/api/v1/reports/budget", params=params).json() == report
+    now = time.monotonic()
+    monkeypatch.setattr(time, "monotonic", lambda: now + settings.response_cache_ttl + 1)
+    assert client.get("/api/v1/reports/budget", params=params).json()["spent"] > report["spent"]
+    with engine.begin() as connection:
+        connection.exec_driver_sql("UPDATE category_monthly_spend SET total = total + 1 WHERE year = 2022 AND month = 6")
+
+def test_budget_report_rejects_invalid_month():
+    response = client.get("/api/v1/reports/budget", params={"year": 2022, "month": 13})
+    assert response.status_code == 422
+
+def test_timeseries_report():
+    account = client.post("/api/v1/accounts/", json={"name": "Series Account", "type": "checking", "balance": 0.0}).json()
+    food = client.post("/api/v1/categories/", json={"name": "Series Food", "type": "expense", "monthly_budget": 0.0}).json()
+    fuel = client.post("/api/v1/categories/", json={"name": "Series Fuel", "type": "expense", "monthly_budget": 0.0}).json()
+    create_transaction(account, food, "2021-01-04", -10.0)
+    create_transaction(account, food, "2021-01-10", -5.0)
+    create_transaction(account, fuel, "2021-03-15", -40.0)
+
+    params = {"start": "2021-01-01", "end": "2021-03-31", "account_id": account["id"]}
+    response = client.get("/api/v1/reports/timeseries", params=params)
+    assert response.status_code == 200
+    assert response.json() == {
+        "interval": "month",
+        "group_by": None,
+        "buckets": ["2021-01-01", "2021-02-01", "2021-03-01"],
+        "series": [{"key": None, "total": [-15.0, 0.0, -40.0], "count": [2, 0, 1]}],
+    }
+
+    # Weeks start on Monday; 2021-01-04 and 2021-01-10 fall in the same week
+    response = client.get("/api/v1/reports/timeseries", params={**params, "end": "2021-01-17", "interval": "week", "group_by": "category_id"})
+    data = response.json()
+    assert data["buckets"] == ["2020-12-28", "2021-01-04", "2021-01-11"]
+    assert data["series"] == [{"key": food["id"], "total": [0.0, -15.0, 0.0], "count": [0, 2, 0]}]
+
+    # Monthly by category is served from the rollup table and agrees with the transactions
+    response = client.get("/api/v1/reports/timeseries", params={"start": "2021-01-01", "end": "2021-03-31", "group_by": "category_id"})
+    series = {line["key"]: line for line in response.json()["series"]}
+    assert series[food["id"]]["total"] == [-15.0, 0.0, 0.0]
+    assert series[fuel["id"]]["count"] == [0, 0, 1]
+
+    for bad in ({"interval": "year"}, {"group_by": "status"}, {"end": "2020-12-31"}):
+        assert client.get("/api/v1/reports/timeseries", params={**params, **bad}).status_code == 400
@@ -0,0 +1,148 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.config import settings
+from app.crud import analytics
+from app.db.database import get_db
+from app.db.models import Base
+from app.utils.cache import response_cache
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+def reports(account, category) -> list:
+    # The same reads answered from SQL or from the snapshot, bypassing the caches
+    response_cache.clear()
+    filters = [{"field": "account_id", "operator": "eq", "value": account["id"], "data_type": "number"}]
+    return [
+        client.post("/api/v1/transactions/aggregate", json={
+            "filters": filters, "group_by": ["category_id", "status", "month"], "metrics": ["sum", "count", "avg", "min", "max"],
+        }).json(),
+        client.post("/api/v1/transactions/aggregate", json={
+            "filters": filters + [{"field": "date", "operator": "between", "value": ["2024-02-01", "2024-03-31"], "data_type": "date"}],
+            "group_by": ["store_id"],
+        }).json(),
+        client.post("/api/v1/transactions/aggregate", json={"filters": filters + [
+            {"field": "description", "operator": "like", "value": "snap", "data_type": "string"},
+        ]}).json(),
+        client.get("/api/v1/reports/timeseries", params={
+            "start": "2024-01-01", "end": "2024-03-31", "interval": "week", "group_by": "category_id", "account_id": account["id"],
+        }).json(),
+        client.get("/api/v1/reports/budget", params={"year": 2024, "month": 2}).json()["categories"],
+    ]
+
+def test_snapshot_matches_sql():
+    account = client.post("/api/v1/accounts/", json={"name": "Snapshot Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Snapshot Category", "type": "expense", "monthly_budget": 0.0}).json()
+    store = client.post("/api/v1/stores/", json={"name": "Snapshot Store"}).json()
+    transaction = lambda day, amount, **extra: {
+        "date": day, "amount": amount, "description": "Snapshot", "account_id": account["id"], "category_id": category["id"], **extra,
+    }
+    client.post("/api/v1/transactions/", json=transaction("2024-01-15", -12.5, store_id=store["id"]))
+    client.post("/api/v1/transactions/", json=transaction("2024-02-03", -40.0, status="COMPLETED"))
+
+    settings.analytics_snapshot = True
+    try:
+        built = client.post("/api/v1/reports/analytics/rebuild").json()
+        assert built["loaded"] and built["rows"] >= 2
+
+        # Writes after the build reach the snapshot without another rebuild
+        created = client.post("/api/v1/transactions/", json=transaction("2024-02-20", -7.25, store_id=store["id"])).json()
+        client.post("/api/v1/transactions/bulk", json=[transaction("2024-03-01", -3.0), transaction("2024-03-02", 100.0)])
+        client.put(f"/api/v1/transactions/{created['id']}", json={"amount": -8.0})
+        client.put(f"/api/v1/transactions/{created['id']}/complete")
+        deleted = client.post("/api/v1/transactions/", json=transaction("2024-01-30", -1.0)).json()
+        client.delete(f"/api/v1/transactions/{deleted['id']}")
+        assert client.get("/metrics/analytics").json()["rows"] == built["rows"] + 3
+
+        from_snapshot = reports(account, category)
+    finally:
+        settings.analytics_snapshot = False
+        analytics.snapshot.clear()
+
+    assert from_snapshot == reports(account, category)
+    assert from_snapshot[0]["groups"][-1] == {
+        "category_id": category["id"], "status": "PENDING", "month": 3, "sum": 97.0, "count": 2, "avg": 48.5, "min": -3.0, "max": 100.0,
+    }
+
+def test_snapshot_sees_parent_deletes():
+    # Deleting an account or store sets the foreign key on its transactions to NULL
+    # in the unit of work; the snapshot has to pick that up like any other write
+    account = client.post("/api/v1/accounts/", json={"name": "Orphan Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Orphan Category", "type": "expense", "monthly_budget": 0.0}).json()
+    store = client.post("/api/v1/stores/", json={"name": "Orphan Store"}).json()
+    for amount in (-5.0, -6.0):
+        client.post("/api/v1/transactions/", json={
+            "date": "2024-05-01", "amount": amount, "description": "Orphan",
+            "account_id": account["id"], "category_id": category["id"], "store_id": store["id"],
+        })
+    aggregate = lambda: client.post("/api/v1/transactions/aggregate", json={
+        "filters": [{"field": "category_id", "operator": "eq", "value": category["id"], "data_type": "number"}],
+        "group_by": ["account_id", "store_id"],
+    }).json()
+
+    settings.analytics_snapshot = True
+    try:
+        client.post("/api/v1/reports/analytics/rebuild")
+        assert aggregate()["groups"][0]["store_id"] == store["id"]
+        client.delete(f"/api/v1/stores/{store['id']}")
+        client.delete(f"/api/v1/accounts/{account['id']}")
+        from_snapshot = aggregate()
+    finally:
+        settings.analytics_snapshot = False
+        analytics.snapshot.clear()
+
+    assert from_snapshot == aggregate()
+    assert from_snapshot["groups"] == [{"account_id": None, "store_id": None, "sum": -11.0, "count": 2}]
+
+def test_rebuild_requires_snapshot():
+    assert client.post("/api/v1/reports/analytics/rebuild").status_code == 400
+
+
+def test_rebuild_invalidates_cached_responses():
+    account = client.post("/api/v1/accounts/", json={"name": "Rebuild Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Rebuild Category", "type": "expense", "monthly_budget": 0.0}).json()
+    client.post("/api/v1/transactions/", json={
+        "date": "2024-06-01", "amount": -5.0, "description": "Rebuild",
+        "account_id": account["id"], "category_id": category["id"],
+    })
+    body = {"filters": [{"field": "category_id", "operator": "eq", "value": category["id"], "data_type": "number"}]}
+
+    settings.analytics_snapshot = True
+    try:
+        client.post("/api/v1/reports/analytics/rebuild")
+        cached = client.post("/api/v1/transactions/aggregate", json=body)
+        assert cached.json()["groups"] == [{"sum": -5.0, "count": 1}]
+
+        # A write the session listeners never see, as from another process
+        with engine.begin() as connection:
+            connection.execute(text(
+                "INSERT INTO transactions (date, amount, description, account_id, category_id, status) "
+                "VALUES ('2024-06-02', -7.0, 'Rebuild', :account, :category, 'PENDING')"
+            ), {"account": account["id"], "category": category["id"]})
+        assert client.post("/api/v1/transactions/aggregate", json=body).json() == cached.json()
+
+        client.post("/api/v1/reports/analytics/rebuild")
+        revalidated = client.post("/api/v1/transactions/aggregate", json=body, headers={"If-None-Match": cached.headers["etag"]})
+    finally:
+        settings.analytics_snapshot = False
+        analytics.snapshot.clear()
+
+    assert revalidated.status_code == 200
+    assert revalidated.json()["groups"] == [{"sum": -12.0, "count": 2}]
@@ -0,0 +1,156 @@
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.core.config import settings
+from app.db.database import get_db
+from app.db.models import Base
+from app.schemas.query import QueryParams, FilterCondition
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+CSV_STATEMENT = """Date,Description,Amount,Category
+2024-03-01,Corner Bakery,-4.50,Import Groceries
+03/02/2024,Corner Bakery,-4.50,
+2024-03-03,Payroll,2500.00,Unknown Category
+not a date,Broken,-1.00,
+"""
+
+SPLIT_CSV_STATEMENT = """Posted Date,Payee,Debit,Credit
+2024-04-01,Split Grocer,12.00,
+2024-04-02,Split Payroll,,900.00
+2024-04-03,Split Broken,twelve,
+2024-04-04,Split Pharmacy,(3.25),
+"""
+
+OFX_STATEMENT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240305120000[-5:EST]<TRNAMT>-12.34<FITID>1001<NAME>OFX Hardware</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240306<TRNAMT>100.00<FITID>1002<NAME>Refund<MEMO>Returned item</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+QIF_STATEMENT = """!Type:Bank
+D03/07/2024
+T-20.00
+PQIF Fuel
+^
+D3/08'24
+T-5.25
+PQIF Cafe
+MLatte
+^
+"""
+
+def setup_import_target():
+    account = client.post("/api/v1/accounts/", json={"name": "Import Account", "type": "checking", "balance": 0.0}).json()
+    default_category = client.post("/api/v1/categories/", json={"name": "Import Default", "type": "expense", "monthly_budget": 0.0}).json()
+    groceries = client.post("/api/v1/categories/", json={"name": "Import Groceries", "type": "expense", "monthly_budget": 0.0}).json()
+    return account, default_category, groceries
+
+def import_file(account, category, filename, content):
+    return client.post(
+        "/api/v1/imports/",
+        data={"account_id": account["id"], "category_id": category["id"]},
+        files={"file": (filename, content.encode(), "application/octet-stream")},
+    )
+
+def account_transactions(account):
+    query_params = QueryParams(filters=[FilterCondition(field="account_id", operator="eq", value=account["id"], data_type="number")])
+    return client.post("/api/v1/transactions/query", json=query_params.model_dump()).json()["items"]
+
+def test_import_csv_statement():
+    account, default_category, groceries = setup_import_target()
+
+    response = import_file(account, default_category, "statement.csv", CSV_STATEMENT)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["status"] == "completed"
+    assert data["rows_read"] == 4
+    assert data["imported"] == 3
+    assert data["error_count"] == 1
+    assert data["errors"][0]["line"] == 5
+    assert data["stores_created"] == 2
+    assert data["rows_per_second"] > 0
+
+    transactions = account_transactions(account)
+    assert sorted(transaction["amount"] for transaction in transactions) == [-4.5, -4.5, 2500.0]
+    bakery = [transaction for transaction in transactions if transaction["description"] == "Corner Bakery"]
+    assert {transaction["category_id"] for transaction in bakery} == {groceries["id"], default_category["id"]}
+    assert bakery[0]["store_id"] is not None and bakery[0]["store_id"] == bakery[1]["store_id"]
+
+    # Re-importing the same statement only finds duplicates
+    response = import_file(account, default_category, "statement.csv", CSV_STATEMENT)
+    data = response.json()
+    assert data["imported"] == 0
+    assert data["duplicates"] == 3
+    assert len(account_transactions(account)) == 3
+
+    response = client.get(f"/api/v1/imports/{data['id']}")
+    assert response.status_code == 200
+    assert response.json()["duplicates"] == 3
+
+def test_import_split_debit_credit_csv():
+    account, default_category, _ = setup_import_target()
+
+    response = import_file(account, default_category, "split.csv", SPLIT_CSV_STATEMENT)
+    assert response.status_code == 200
+    data = response.json()
+    # A bad debit cell fails its own row, like a bad amount, not the whole import
+    assert data["status"] == "completed"
+    assert data["imported"] == 3
+    assert data["errors"] == [{"line": 4, "detail": "Unrecognized amount: 'twelve'"}]
+
+    amounts = {transaction["description"]: transaction["amount"] for transaction in account_transactions(account)}
+    assert amounts == {"Split Grocer": -12.0, "Split Payroll": 900.0, "Split Pharmacy": -3.25}
+
+def test_import_keeps_repeats_across_batches(monkeypatch):
+    account, default_category, _ = setup_import_target()
+    row = "2024-05-01,Boundary Cafe,-3.00\n"
+    import_file(account, default_category, "first.csv", "Date,Description,Amount\n" + row)
+
+    # The ledger already has one of the two purchases; each lands in its own batch
+    monkeypatch.setattr(settings, "import_batch_size", 1)
+    response = import_file(account, default_category, "second.csv", "Date,Description,Amount\n" + row * 2)
+    data = response.json()
+    assert (data["duplicates"], data["imported"]) == (1, 1)
+    assert len(account_transactions(account)) == 2
+
+def test_import_ofx_and_qif_statements():
+    account, default_category, _ = setup_import_target()
+
+    response = import_file(account, default_category, "statement.ofx", OFX_STATEMENT)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+
+    response = import_file(account, default_category, "statement.qif", QIF_STATEMENT)
+    assert response.status_code == 200
+    assert response.json()["imported"] == 2
+
+    transactions = {transaction["description"]: transaction for transaction in account_transactions(account)}
+    assert transactions["OFX Hardware"]["amount"] == -12.34
+    assert transactions["OFX Hardware"]["date"] == "2024-03-05"
+    assert transactions["Refund"]["amount"] == 100.0
+    assert transactions["QIF Cafe"]["date"] == "2024-03-08"
+    assert transactions["QIF Fuel"]["amount"] == -20.0
+
+def test_import_rejects_unknown_format():
+    account, default_category, _ = setup_import_target()
+    response = import_file(account, default_category, "statement.txt", "hello")
+    assert response.status_code == 400
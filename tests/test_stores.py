@@ -2,6 +2,7 @@ from fastapi.testclient import TestClient
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from app.main import app
+from app.crud import store as store_crud
 from app.db.database import get_db
 from app.db.models import Base
 
@@ -85,3 +86,46 @@ def test_delete_store():
     # Try to get the deleted store
     get_response = client.get(f"/api/v1/stores/{create_data['id']}")
     assert get_response.status_code == 404
+
+def test_suggest_stores():
+    account = client.post("/api/v1/accounts/", json={"name": "Suggest Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Suggest Category", "type": "expense", "monthly_budget": 0.0}).json()
+    stores = {
+        name: client.post("/api/v1/stores/", json={"name": name}).json()
+        for name in ["Quokka Market", "Quokka Mart Express", "Quasar Books", "Café Quixote"]
+    }
+    for name, uses in [("Quokka Mart Express", 3), ("Quokka Market", 1)]:
+        for _ in range(uses):
+            client.post("/api/v1/transactions/", json={
+                "date": "2023-06-01", "amount": -1.0, "description": "Suggest",
+                "account_id": account["id"], "category_id": category["id"], "store_id": stores[name]["id"],
+            })
+
+    def suggest(q, **params):
+        response = client.get("/api/v1/stores/suggest", params={"q": q, **params})
+        assert response.status_code == 200
+        return [suggestion["name"] for suggestion in response.json()]
+
+    # Indexes after the first are built in the background; start one and wait for it
+    client.get("/api/v1/stores/suggest", params={"q": "quo"})
+    store_crud.store_suggestions.wait()
+
+    # Prefix matches on any word, most used first
+    assert suggest("quo") == ["Quokka Mart Express", "Quokka Market"]
+    names = suggest("q", limit=50)
+    assert names.index("Quokka Mart Express") < names.index("Quokka Market")
+    # Typo-tolerant matches only fill the page after the prefix matches
+    assert suggest("quokka ex") == ["Quokka Mart Express", "Quokka Market"]
+    assert suggest("quix")[0] == "Café Quixote"
+    assert "Café Quixote" in suggest("cafe")
+    assert suggest("quo", limit=1) == ["Quokka Mart Express"]
+    assert client.get("/api/v1/stores/suggest", params={"q": "quo"}).json()[0]["usage_count"] == 3
+
+    assert suggest("qasar books")[0] == "Quasar Books"
+
+    # Store writes refresh the index; until the new one is built the old one answers
+    client.put(f"/api/v1/stores/{stores['Quasar Books']['id']}", json={"name": "Quantum Books"})
+    assert suggest("quasar")[0] == "Quasar Books"
+    store_crud.store_suggestions.wait()
+    assert "Quasar Books" not in suggest("quasar")
+    assert suggest("quantum")[0] == "Quantum Books"
@@ -1,7 +1,13 @@
+import csv
+import io
+import json
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from app.main import app
+from app.core.config import settings
+from app.crud import transaction as transaction_crud
 from app.db.database import get_db
 from app.db.models import Base
 from app.schemas.query import QueryParams, FilterCondition, SortOrder
@@ -126,6 +132,15 @@ def test_query_transactions():
     data = response.json()
     assert data["items"][0]["amount"] >= data["items"][-1]["amount"]
 
+    # The row-tuple serializer matches the single-item representation
+    query_params = QueryParams(
+        filters=[FilterCondition(field="id", operator="eq", value=created_transactions[0]["id"], data_type="number")]
+    )
+    response = client.post("/api/v1/transactions/query", json=query_params.model_dump())
+    assert response.headers["content-type"] == "application/json"
+    assert "etag" in response.headers
+    assert response.json()["items"] == [client.get(f"/api/v1/transactions/{created_transactions[0]['id']}").json()]
+
     # Clean up
     for transaction in created_transactions:
         client.delete(f"/api/v1/transactions/{transaction['id']}")
@@ -196,4 +211,273 @@ def test_complete_transaction():
     response = client.put(f"/api/v1/transactions/{create_data['id']}/complete")
     assert response.status_code == 200
     data = response.json()
-    assert data["status"] == "COMPLETED"
\ No newline at end of file
+    assert data["status"] == "COMPLETED"
+
+
+def test_export_transactions(monkeypatch):
+    account_data = client.post(
+        "/api/v1/accounts/",
+        json={"name": "Export Account", "type": "checking", "balance": 0.0},
+    ).json()
+    category_data = client.post(
+        "/api/v1/categories/",
+        json={"name": "Export Category", "type": "expense", "monthly_budget": 100.0},
+    ).json()
+    created = [
+        client.post(
+            "/api/v1/transactions/",
+            json={
+                "date": str(date.today()),
+                "amount": amount,
+                "description": f"Export {amount}",
+                "account_id": account_data["id"],
+                "category_id": category_data["id"],
+            },
+        ).json()
+        for amount in (10.0, 20.0, 30.0)
+    ]
+
+    filters = json.dumps([{"field": "account_id", "operator": "eq", "value": account_data["id"], "data_type": "number"}])
+    sort = json.dumps([{"field": "amount", "direction": "desc"}])
+
+    response = client.get("/api/v1/transactions/export", params={"format": "ndjson", "filters": filters, "sort": sort})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    rows = [json.loads(line) for line in response.text.splitlines()]
+    assert [row["amount"] for row in rows] == [30.0, 20.0, 10.0]
+    assert rows[0]["date"] == str(date.today())
+    assert rows[0]["status"] == "PENDING"
+
+    response = client.get("/api/v1/transactions/export", params={"format": "csv", "filters": filters})
+    assert response.status_code == 200
+    rows = list(csv.DictReader(io.StringIO(response.text)))
+    assert [row["id"] for row in rows] == [str(transaction["id"]) for transaction in created]
+
+    # More rows than one batch: the export's session must stay open until the last
+    # batch is read, although get_db closes its session before the body streams
+    events = []
+    stream_transactions = transaction_crud.stream_transactions
+    close = Session.close
+
+    def spy(db, *args, **kwargs):
+        for batch in stream_transactions(db, *args, **kwargs):
+            events.append(("batch", db))
+            yield batch
+
+    monkeypatch.setattr(settings, "export_batch_size", 2)
+    monkeypatch.setattr(transaction_crud, "stream_transactions", spy)
+    monkeypatch.setattr(Session, "close", lambda db: (events.append(("close", db)), close(db)))
+    response = client.get("/api/v1/transactions/export", params={"format": "ndjson"})
+    assert response.status_code == 200
+    assert len(response.text.splitlines()) >= len(created)
+    batches = [index for index, (event, _) in enumerate(events) if event == "batch"]
+    export_db = events[batches[0]][1]
+    assert len(batches) >= 2
+    assert events.index(("close", export_db)) > batches[-1]
+    monkeypatch.undo()
+
+    response = client.get("/api/v1/transactions/export", params={"format": "xml"})
+    assert response.status_code == 400
+
+    response = client.get("/api/v1/transactions/export", params={"filters": "not json"})
+    assert response.status_code == 400
+
+def test_bulk_create_transactions():
+    account_data = client.post(
+        "/api/v1/accounts/",
+        json={"name": "Bulk Account", "type": "checking", "balance": 0.0},
+    ).json()
+    category_data = client.post(
+        "/api/v1/categories/",
+        json={"name": "Bulk Category", "type": "expense", "monthly_budget": 100.0},
+    ).json()
+    rows = [
+        {
+            "date": str(date.today()),
+            "amount": float(amount),
+            "description": f"Bulk {amount}",
+            "account_id": account_data["id"],
+            "category_id": category_data["id"],
+        }
+        for amount in range(5)
+    ]
+    rows[2] = {"date": "not a date", "amount": "abc", "description": "Broken row"}
+
+    response = client.post("/api/v1/transactions/bulk", params={"chunk_size": 2}, json=rows)
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["ids"]) == 5
+    assert data["ids"][2] is None
+    assert all(isinstance(data["ids"][i], int) for i in (0, 1, 3, 4))
+    assert [error["index"] for error in data["errors"]] == [2]
+
+    for i in (0, 1, 3, 4):
+        transaction = client.get(f"/api/v1/transactions/{data['ids'][i]}").json()
+        assert transaction["amount"] == rows[i]["amount"]
+        assert transaction["status"] == "PENDING"
+
+def test_account_balance_tracks_transactions():
+    def balances(account_id):
+        data = client.get(f"/api/v1/accounts/{account_id}").json()
+        return data["balance"], data["cleared_balance"], data["pending_balance"]
+
+    first = client.post("/api/v1/accounts/", json={"name": "Balance Account 1", "type": "checking", "balance": 100.0}).json()
+    second = client.post("/api/v1/accounts/", json={"name": "Balance Account 2", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Balance Category", "type": "expense", "monthly_budget": 0.0}).json()
+    assert balances(first["id"]) == (100.0, 0.0, 0.0)
+
+    created = client.post("/api/v1/transactions/", json={
+        "date": str(date.today()),
+        "amount": -30.0,
+        "description": "Balance purchase",
+        "account_id": first["id"],
+        "category_id": category["id"],
+    }).json()
+    assert balances(first["id"]) == (70.0, 0.0, -30.0)
+
+    client.put(f"/api/v1/transactions/{created['id']}/complete")
+    assert balances(first["id"]) == (70.0, -30.0, 0.0)
+
+    client.put(f"/api/v1/transactions/{created['id']}", json={"amount": -50.0})
+    assert balances(first["id"]) == (50.0, -50.0, 0.0)
+
+    client.put(f"/api/v1/transactions/{created['id']}", json={"account_id": second["id"], "status": "PENDING"})
+    assert balances(first["id"]) == (100.0, 0.0, 0.0)
+    assert balances(second["id"]) == (-50.0, 0.0, -50.0)
+
+    client.post("/api/v1/transactions/bulk", json=[
+        {"date": str(date.today()), "amount": amount, "description": "Balance bulk", "account_id": second["id"],
+         "category_id": category["id"], "status": "COMPLETED"}
+        for amount in (10.0, 15.0)
+    ])
+    assert balances(second["id"]) == (-25.0, 25.0, -50.0)
+
+    client.delete(f"/api/v1/transactions/{created['id']}")
+    assert balances(second["id"]) == (25.0, 25.0, 0.0)
+
+    response = client.post("/api/v1/accounts/recompute_balances")
+    assert response.status_code == 200
+    checks = {check["account_id"]: check for check in response.json()}
+    assert checks[first["id"]]["drift"] == 0.0
+    assert checks[second["id"]]["drift"] == 0.0
+    assert checks[second["id"]]["cleared_balance"] == 25.0
+
+def test_monthly_spend_rollups():
+    from app.crud import ledger
+    from app.db.models import CategoryMonthlySpend
+
+    def rollups(category_id):
+        db = TestingSessionLocal()
+        try:
+            rows = db.query(CategoryMonthlySpend).filter(CategoryMonthlySpend.category_id == category_id).all()
+            return {(row.year, row.month): (row.total, row.count) for row in rows if row.count}
+        finally:
+            db.close()
+
+    account = client.post("/api/v1/accounts/", json={"name": "Rollup Account", "type": "checking", "balance": 0.0}).json()
+    groceries = client.post("/api/v1/categories/", json={"name": "Rollup Groceries", "type": "expense", "monthly_budget": 0.0}).json()
+    dining = client.post("/api/v1/categories/", json={"name": "Rollup Dining", "type": "expense", "monthly_budget": 0.0}).json()
+
+    def create(day, amount, category):
+        return client.post("/api/v1/transactions/", json={
+            "date": day, "amount": amount, "description": "Rollup", "account_id": account["id"], "category_id": category["id"],
+        }).json()
+
+    create("2023-01-10", -20.0, groceries)
+    moved = create("2023-01-20", -5.0, groceries)
+    create("2023-02-01", -7.5, groceries)
+    client.post("/api/v1/transactions/bulk", json=[
+        {"date": "2023-02-15", "amount": -2.5, "description": "Rollup", "account_id": account["id"], "category_id": groceries["id"]},
+    ])
+    assert rollups(groceries["id"]) == {(2023, 1): (-25.0, 2), (2023, 2): (-10.0, 2)}
+
+    client.put(f"/api/v1/transactions/{moved['id']}", json={"category_id": dining["id"], "date": "2023-03-05"})
+    assert rollups(groceries["id"]) == {(2023, 1): (-20.0, 1), (2023, 2): (-10.0, 2)}
+    assert rollups(dining["id"]) == {(2023, 3): (-5.0, 1)}
+
+    client.delete(f"/api/v1/transactions/{moved['id']}")
+    assert rollups(dining["id"]) == {}
+
+    # A full rebuild agrees with the incrementally maintained rows
+    db = TestingSessionLocal()
+    try:
+        ledger.rebuild_monthly_spend(db)
+    finally:
+        db.close()
+    assert rollups(groceries["id"]) == {(2023, 1): (-20.0, 1), (2023, 2): (-10.0, 2)}
+    assert rollups(dining["id"]) == {}
+
+    # Deleting a category that has transactions takes its rollup rows with it
+    response = client.delete(f"/api/v1/categories/{groceries['id']}")
+    assert response.status_code == 200
+    db = TestingSessionLocal()
+    try:
+        assert db.query(CategoryMonthlySpend).filter(CategoryMonthlySpend.category_id == groceries["id"]).count() == 0
+    finally:
+        db.close()
+
+def test_query_transactions_with_related():
+    account = client.post("/api/v1/accounts/", json={"name": "Include Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Include Category", "type": "expense", "monthly_budget": 0.0}).json()
+    store = client.post("/api/v1/stores/", json={"name": "Include Store"}).json()
+    for i in range(5):
+        client.post("/api/v1/transactions/", json={
+            "date": "2023-04-01", "amount": -float(i), "description": "Include", "account_id": account["id"],
+            "category_id": category["id"], "store_id": store["id"] if i % 2 else None,
+        })
+    query_params = QueryParams(filters=[FilterCondition(field="account_id", operator="eq", value=account["id"], data_type="number")])
+
+    statements = []
+    count_statement = lambda *args: statements.append(args[2])
+    event.listen(Engine, "before_cursor_execute", count_statement)
+    try:
+        response = client.post("/api/v1/transactions/query?include=account,category,store", json=query_params.model_dump())
+    finally:
+        event.remove(Engine, "before_cursor_execute", count_statement)
+    assert response.status_code == 200
+    items = response.json()["items"]
+    assert len(items) == 5
+    assert all(item["account"]["name"] == "Include Account" and item["category"]["name"] == "Include Category" for item in items)
+    assert [item["store"] and item["store"]["name"] for item in items] == [None, "Include Store", None, "Include Store", None]
+    # The page and one SELECT ... IN per relation, independent of the row count
+    assert len(statements) == 4
+
+    response = client.post("/api/v1/transactions/query?include=store", json={**query_params.model_dump(), "fields": ["amount"]})
+    assert all(set(item) == {"amount", "store"} for item in response.json()["items"])
+
+    # Relations that were not requested are never read, so their raiseload does not fire
+    response = client.post("/api/v1/transactions/query?include=category", json=query_params.model_dump())
+    assert response.status_code == 200
+    assert all("account" not in item and item["category"]["name"] == "Include Category" for item in response.json()["items"])
+
+    response = client.post("/api/v1/transactions/query?include=owner", json=query_params.model_dump())
+    assert response.status_code == 400
+
+def test_aggregate_transactions(monkeypatch):
+    account = client.post("/api/v1/accounts/", json={"name": "Aggregate Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Aggregate Category", "type": "expense", "monthly_budget": 0.0}).json()
+    for day, amount in (("2023-01-05", -10.0), ("2023-01-20", -30.0), ("2023-02-03", -5.0)):
+        client.post("/api/v1/transactions/", json={
+            "date": day, "amount": amount, "description": "Aggregate", "account_id": account["id"], "category_id": category["id"],
+        })
+    filters = [FilterCondition(field="account_id", operator="eq", value=account["id"], data_type="number").model_dump()]
+
+    response = client.post("/api/v1/transactions/aggregate", json={
+        "filters": filters, "group_by": ["year", "month"], "metrics": ["sum", "count", "min", "max", "avg"],
+    })
+    assert response.status_code == 200
+    assert response.json()["groups"] == [
+        {"year": 2023, "month": 1, "sum": -40.0, "count": 2, "min": -30.0, "max": -10.0, "avg": -20.0},
+        {"year": 2023, "month": 2, "sum": -5.0, "count": 1, "min": -5.0, "max": -5.0, "avg": -5.0},
+    ]
+
+    # No group_by is a single overall row
+    response = client.post("/api/v1/transactions/aggregate", json={"filters": filters})
+    assert response.json()["groups"] == [{"sum": -45.0, "count": 3}]
+
+    for body in ({"group_by": ["description"]}, {"metrics": ["median"]}, {"metrics": []}):
+        assert client.post("/api/v1/transactions/aggregate", json=body).status_code == 400
+
+    monkeypatch.setattr(settings, "aggregate_max_groups", 1)
+    response = client.post("/api/v1/transactions/aggregate", json={"filters": filters, "group_by": ["month"]})
+    assert response.status_code == 400
@@ -0,0 +1,171 @@
+import pytest
+
+pytest.importorskip("aiosqlite")
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app as sync_app, invalid_query_handler
+from app.api.v1.endpoints import async_routes
+from app.db.database import get_db, get_async_db
+from app.db.models import Base
+from app.utils.query import InvalidQueryError
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+sync_app.dependency_overrides[get_db] = override_get_db
+
+async_engine = create_async_engine("sqlite+aiosqlite:///./test.db")
+TestingAsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+async def override_get_async_db():
+    async with TestingAsyncSessionLocal() as db:
+        yield db
+
+app = FastAPI()
+app.include_router(async_routes.router, prefix="/api/v1")
+app.dependency_overrides[get_async_db] = override_get_async_db
+app.add_exception_handler(InvalidQueryError, invalid_query_handler)
+
+client = TestClient(app)
+# Fixtures are created through the regular sync routes
+sync_client = TestClient(sync_app)
+
+def test_async_transaction_routes():
+    account = sync_client.post("/api/v1/accounts/", json={"name": "Async Account", "type": "checking", "balance": 10.0}).json()
+    category = sync_client.post("/api/v1/categories/", json={"name": "Async Category", "type": "expense", "monthly_budget": 0.0}).json()
+
+    response = client.post("/api/v1/transactions/", json={
+        "date": "2023-03-01", "amount": -4.0, "description": "Async", "account_id": account["id"], "category_id": category["id"],
+    })
+    assert response.status_code == 200, response.text
+    created = response.json()
+    assert created["description"] == "Async"
+
+    response = client.get(f"/api/v1/transactions/{created['id']}")
+    assert response.status_code == 200
+    assert response.json()["id"] == created["id"]
+    assert client.get("/api/v1/transactions/999999").status_code == 404
+
+    response = client.post("/api/v1/transactions/query", json={
+        "filters": [{"field": "account_id", "operator": "eq", "value": account["id"], "data_type": "number"}],
+    })
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert [item["id"] for item in data["items"]] == [created["id"]]
+
+    # The ledger is posted inside the async session as well
+    response = client.get(f"/api/v1/accounts/{account['id']}")
+    assert response.status_code == 200
+    assert response.json()["pending_balance"] == -4.0
+
+def test_async_transaction_writes_post_to_ledger():
+    account = sync_client.post("/api/v1/accounts/", json={"name": "Async Writes", "type": "checking", "balance": 0.0}).json()
+    other = sync_client.post("/api/v1/accounts/", json={"name": "Async Writes Other", "type": "checking", "balance": 0.0}).json()
+    category = sync_client.post("/api/v1/categories/", json={"name": "Async Writes", "type": "expense", "monthly_budget": 0.0}).json()
+    created = client.post("/api/v1/transactions/", json={
+        "date": "2023-04-01", "amount": -5.0, "description": "Async write", "account_id": account["id"], "category_id": category["id"],
+    }).json()
+
+    def balances(account_id):
+        data = client.get(f"/api/v1/accounts/{account_id}").json()
+        return data["cleared_balance"], data["pending_balance"]
+
+    response = client.put(f"/api/v1/transactions/{created['id']}", json={"amount": -7.0})
+    assert response.status_code == 200, response.text
+    assert response.json()["amount"] == -7.0
+    assert balances(account["id"]) == (0.0, -7.0)
+
+    response = client.put(f"/api/v1/transactions/{created['id']}/complete")
+    assert response.status_code == 200
+    assert response.json()["status"] == "COMPLETED"
+    assert balances(account["id"]) == (-7.0, 0.0)
+
+    # Moving it between accounts reverses the old account's posting
+    client.put(f"/api/v1/transactions/{created['id']}", json={"account_id": other["id"]})
+    assert balances(account["id"]) == (0.0, 0.0)
+    assert balances(other["id"]) == (-7.0, 0.0)
+
+    response = client.delete(f"/api/v1/transactions/{created['id']}")
+    assert response.status_code == 200
+    assert balances(other["id"]) == (0.0, 0.0)
+    assert client.get(f"/api/v1/transactions/{created['id']}").status_code == 404
+
+    assert client.put("/api/v1/transactions/999999", json={"amount": 1.0}).status_code == 404
+    assert client.delete("/api/v1/transactions/999999").status_code == 404
+    assert client.put("/api/v1/transactions/999999/complete").status_code == 404
+
+def test_async_query_fields():
+    account = sync_client.post("/api/v1/accounts/", json={"name": "Async Fields", "type": "checking", "balance": 0.0}).json()
+    category = sync_client.post("/api/v1/categories/", json={"name": "Async Fields", "type": "expense", "monthly_budget": 0.0}).json()
+    created = client.post("/api/v1/transactions/", json={
+        "date": "2023-05-01", "amount": -2.0, "description": "Async fields", "account_id": account["id"], "category_id": category["id"],
+    }).json()
+    filters = [{"field": "id", "operator": "eq", "value": created["id"], "data_type": "number"}]
+
+    # The async /query routes shadow the sync ones, so they honour the same options
+    response = client.post("/api/v1/transactions/query", json={"filters": filters, "fields": ["date", "amount"]})
+    assert response.status_code == 200
+    assert response.json()["items"] == [{"date": "2023-05-01", "amount": -2.0}]
+
+    response = client.post("/api/v1/accounts/query", json={"filters": [{"field": "id", "operator": "eq", "value": account["id"], "data_type": "number"}], "fields": ["name"]})
+    assert response.json()["items"] == [{"name": "Async Fields"}]
+
+    # The cursor page selects its keyset columns behind the requested fields
+    response = client.post("/api/v1/transactions/query", json={"fields": ["amount"], "pagination": "cursor", "limit": 1})
+    assert response.status_code == 200
+    assert list(response.json()["items"][0]) == ["amount"]
+    assert response.json()["next_cursor"]
+
+    assert client.post("/api/v1/transactions/query", json={"fields": ["not_a_column"]}).status_code == 400
+    assert client.post("/api/v1/categories/query", json={"fields": []}).status_code == 400
+
+def test_async_query_include():
+    account = sync_client.post("/api/v1/accounts/", json={"name": "Async Include", "type": "checking", "balance": 0.0}).json()
+    category = sync_client.post("/api/v1/categories/", json={"name": "Async Include", "type": "expense", "monthly_budget": 0.0}).json()
+    created = client.post("/api/v1/transactions/", json={
+        "date": "2023-05-02", "amount": -3.0, "description": "Async include", "account_id": account["id"], "category_id": category["id"],
+    }).json()
+    filters = [{"field": "id", "operator": "eq", "value": created["id"], "data_type": "number"}]
+
+    response = client.post("/api/v1/transactions/query", params={"include": "account,category"}, json={"filters": filters})
+    assert response.status_code == 200
+    item = response.json()["items"][0]
+    assert item["account"]["name"] == "Async Include"
+    assert item["category"]["id"] == category["id"]
+    assert "store" not in item
+
+    response = client.post("/api/v1/transactions/query", params={"include": "category"}, json={"filters": filters, "fields": ["amount"]})
+    assert response.json()["items"] == [{"amount": -3.0, "category": item["category"]}]
+
+    assert client.post("/api/v1/transactions/query", params={"include": "owner"}, json={}).status_code == 400
+
+def test_async_cursor_pagination():
+    sync_client.post("/api/v1/categories/", json={"name": "Async Page 1", "type": "expense", "monthly_budget": 0.0})
+    sync_client.post("/api/v1/categories/", json={"name": "Async Page 2", "type": "expense", "monthly_budget": 0.0})
+
+    response = client.post("/api/v1/categories/query", json={"pagination": "cursor", "limit": 1, "total_mode": "none"})
+    assert response.status_code == 200
+    first = response.json()
+    assert first["total"] is None
+    assert len(first["items"]) == 1
+    assert first["next_cursor"]
+
+    response = client.post("/api/v1/categories/query", json={"pagination": "cursor", "limit": 1, "cursor": first["next_cursor"]})
+    assert response.status_code == 200
+    assert response.json()["items"][0]["id"] != first["items"][0]["id"]
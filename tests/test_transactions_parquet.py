@@ -0,0 +1,84 @@
+import pytest
+
+pa = pytest.importorskip("pyarrow")
+
+import pyarrow.dataset as ds
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from app.main import app
+from app.crud import transaction as transaction_crud
+from app.db.database import get_db
+from app.db.models import Base
+from app.utils import columnar
+
+SQLALCHEMY_DATABASE_URL = "sqlite:///./test.db"
+
+engine = create_engine(SQLALCHEMY_DATABASE_URL, connect_args={"check_same_thread": False})
+TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+Base.metadata.create_all(bind=engine)
+
+def override_get_db():
+    try:
+        db = TestingSessionLocal()
+        yield db
+    finally:
+        db.close()
+
+app.dependency_overrides[get_db] = override_get_db
+
+client = TestClient(app)
+
+def export(directory, **options) -> dict:
+    db = TestingSessionLocal()
+    try:
+        # A small batch size so months span several batches
+        columns, batches = transaction_crud.stream_transactions_by_date(db, batch_size=2, with_names=options.pop("names", False))
+        return columnar.export_partitions(batches, columns, str(directory), **options)
+    finally:
+        db.close()
+
+def test_partitioned_export(tmp_path):
+    account = client.post("/api/v1/accounts/", json={"name": "Parquet Account", "type": "checking", "balance": 0.0}).json()
+    category = client.post("/api/v1/categories/", json={"name": "Parquet Category", "type": "expense", "monthly_budget": 0.0}).json()
+    created = [
+        client.post("/api/v1/transactions/", json={
+            "date": day, "amount": amount, "description": f"Parquet {amount}", "account_id": account["id"], "category_id": category["id"],
+        }).json()
+        for day, amount in (("1999-01-05", -1.0), ("1999-01-20", -2.0), ("1999-02-01", -3.0), ("1999-03-31", -4.0))
+    ]
+
+    result = export(tmp_path, names=True)
+    assert result["written"] == result["partitions"]
+    dataset = columnar.open_export(str(tmp_path))
+    rows = dataset.to_table(filter=ds.field("year") == 1999).sort_by("id").to_pylist()
+    assert [(row["month"], row["amount"]) for row in rows] == [(1, -1.0), (1, -2.0), (2, -3.0), (3, -4.0)]
+    assert rows[0]["category_name"] == "Parquet Category"
+    assert rows[0]["date"].isoformat() == "1999-01-05"
+    assert (tmp_path / "year=1999" / "month=2" / "part-0.parquet").exists()
+
+    # Nothing changed, so nothing is rewritten
+    assert export(tmp_path, names=True, incremental=True)["written"] == 0
+
+    client.put(f"/api/v1/transactions/{created[2]['id']}", json={"amount": -30.0})
+    client.delete(f"/api/v1/transactions/{created[3]['id']}")
+    result = export(tmp_path, names=True, incremental=True)
+    assert (result["written"], result["removed"]) == (1, 1)
+    assert not (tmp_path / "year=1999" / "month=3").exists()
+    rows = columnar.open_export(str(tmp_path)).to_table(filter=ds.field("year") == 1999).sort_by("id").to_pylist()
+    assert [row["amount"] for row in rows] == [-1.0, -2.0, -30.0]
+
+    # A different format replaces every file
+    result = export(tmp_path, format="arrow", incremental=True)
+    assert result["written"] == result["partitions"]
+    assert not list(tmp_path.rglob("*.parquet"))
+    assert columnar.open_export(str(tmp_path)).to_table(filter=ds.field("year") == 1999).num_rows == 3
+
+def test_arrow_stream_export():
+    response = client.get("/api/v1/transactions/export", params={"format": "arrow", "sort": '[{"field": "id", "direction": "asc"}]'})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/vnd.apache.arrow.stream"
+    table = pa.ipc.open_stream(response.content).read_all()
+    assert table.column_names == list(transaction_crud.EXPORT_COLUMNS)
+    assert table.num_rows == len(client.post("/api/v1/transactions/query", json={"limit": 1000}).json()["items"])